@@ -0,0 +1,269 @@
+from benchmarks.could_meet_benchmark import measure
+from benchmarks.synthetic_dump import SyntheticDump
+from date_parsing.date_export import DateExport
+from parsers.wiki_reader import MediaWikiDumpReader as DumpReader
+from parsers.infobox_parser import infobox_fields, lead_section
+from parsers.wiki_splitter import MediaWikiDumpSplitter
+from search.columnar_export import ColumnarExport
+from search.local_search import search_date_format
+from lxml import etree
+import numpy as np
+import datetime
+import getopt
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# Relative change of a metric which is reported as regression by --compare
+REGRESSION_THRESHOLD = 0.1
+
+MB = 1024 * 1024
+
+
+def best_of(repeat, run):
+    """
+    Runs run() repeat times
+
+    :return: Tuple of result of the last run and the shortest elapsed time in seconds
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def bench_reader(dump_path, export_path, repeat):
+    def run():
+        with open(dump_path, "rb") as in_xml:
+            reader = DumpReader(dump_path, in_xml, None, (True, export_path), quiet=True)
+            persons = sum(1 for _ in reader)
+        return reader.pages_read, persons
+
+    (pages, persons), elapsed = best_of(repeat, run)
+    size = os.path.getsize(dump_path)
+    return {"pages": pages, "persons": persons, "seconds": elapsed,
+            "pages_per_second": pages / elapsed, "mb_per_second": size / MB / elapsed}
+
+
+def page_inputs(dump_path):
+    """
+    :return: List of tuples of infobox fields, lead section and title of every page, found the same way the reader does
+    """
+    inputs = []
+    with open(dump_path, "rb") as in_xml:
+        for event, element in etree.iterparse(in_xml, events=("end",), tag=['{*}page']):
+            title = element.findtext('{*}title')
+            text = element.findtext('{*}revision/{*}text') or ""
+            text = text.lower()
+            inputs.append((infobox_fields(text), lead_section(text), title))
+
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    return inputs
+
+
+def bench_extractors(dump_path, repeat):
+    """
+    Time of every extractor over all pages, infobox extractors get infobox fields and text search gets lead section
+    """
+    inputs = page_inputs(dump_path)
+
+    results = {}
+    for name, source in (("extract_birth_date", 0), ("extract_death_date", 0), ("extract_fulltext_dates", 1)):
+        extract = getattr(DumpReader, name)
+
+        def run():
+            for page in inputs:
+                try:
+                    extract(page[source], page[2])
+                except:
+                    pass
+
+        _, elapsed = best_of(repeat, run)
+        results[name] = {"pages": len(inputs), "seconds": elapsed, "us_per_page": elapsed / max(1, len(inputs)) * 1e6}
+    return results
+
+
+def bench_splitter(dump_path, split_path, repeat):
+    def run():
+        # Goal size over the whole dump, so every page is split out
+        MediaWikiDumpSplitter(dump_path, split_path, os.path.getsize(dump_path) * 2).export_chunk()
+
+    _, elapsed = best_of(repeat, run)
+    return {"seconds": elapsed, "mb_per_second": os.path.getsize(dump_path) / MB / elapsed}
+
+
+def bench_export_loading(export_path, columnar_path, repeat):
+    columns, text_seconds = best_of(repeat, lambda: ColumnarExport.from_text_export(export_path))
+    _, save_seconds = best_of(repeat, lambda: columns.save(columnar_path))
+    _, load_seconds = best_of(repeat, lambda: ColumnarExport.load(columnar_path))
+    return columns, {"persons": len(columns), "text_parse_seconds": text_seconds,
+                     "columnar_save_seconds": save_seconds, "columnar_load_seconds": load_seconds}
+
+
+def bench_could_meet(columns, pair_count, repeat):
+    rng = np.random.default_rng(0)
+    first = rng.integers(0, len(columns), pair_count)
+    second = rng.integers(0, len(columns), pair_count)
+
+    date_pairs = [(columns.birth_date(i), columns.death_date(i), columns.birth_date(j), columns.death_date(j))
+                  for i, j in zip(first, second)]
+    string_pairs = [tuple(search_date_format(date) for date in pair) for pair in date_pairs]
+
+    _, strings = best_of(repeat, lambda: measure(string_pairs, DateExport.could_meet))
+    _, objects = best_of(repeat, lambda: measure(date_pairs, DateExport.could_meet))
+    _, batch = best_of(repeat, lambda: DateExport.could_meet_many(columns.birth[first], columns.death[first],
+                                                                 columns.birth[second], columns.death[second]))
+    return {"pairs": pair_count, "strings_per_second": pair_count / strings,
+            "objects_per_second": pair_count / objects, "batch_per_second": pair_count / batch}
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__),
+                                       stderr=subprocess.DEVNULL).decode("ascii").strip()
+    except:
+        return None
+
+
+def run_suite(parameters):
+    """
+    :return: Dictionary of benchmark results, every benchmark has a dictionary of metrics
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        dump_path = parameters["dump"]
+        if dump_path is None:
+            dump_path = os.path.join(directory, "synthetic.xml")
+            SyntheticDump(pages=parameters["pages"], person_ratio=parameters["person_ratio"],
+                          bc_ratio=parameters["bc_ratio"], seed=parameters["seed"]).write(dump_path)
+
+        export_path = os.path.join(directory, "export.txt")
+        repeat = parameters["repeat"]
+
+        results = {"reader": bench_reader(dump_path, export_path, repeat)}
+        print("Reader:", "%.0f pages/s, %.2f MB/s" % (results["reader"]["pages_per_second"], results["reader"]["mb_per_second"]))
+
+        results["extractors"] = bench_extractors(dump_path, repeat)
+        for name, metrics in results["extractors"].items():
+            print("%-24s %8.2f us/page" % (name + ":", metrics["us_per_page"]))
+
+        results["splitter"] = bench_splitter(dump_path, os.path.join(directory, "split.xml"), repeat)
+        print("Splitter:", "%.2f MB/s" % results["splitter"]["mb_per_second"])
+
+        columns, results["export_loading"] = bench_export_loading(export_path, os.path.join(directory, "columnar"), repeat)
+        print("Export loading:", "%.3f s text, %.3f s columnar save, %.4f s columnar load" % (
+            results["export_loading"]["text_parse_seconds"], results["export_loading"]["columnar_save_seconds"],
+            results["export_loading"]["columnar_load_seconds"]))
+
+        results["could_meet"] = bench_could_meet(columns, parameters["pairs"], repeat)
+        print("could_meet:", "%.0f strings/s, %.0f objects/s, %.0f batch/s" % (
+            results["could_meet"]["strings_per_second"], results["could_meet"]["objects_per_second"],
+            results["could_meet"]["batch_per_second"]))
+
+        # Columns are memory-mapped from temporary directory
+        del columns
+
+    return results
+
+
+def compare(previous, current):
+    """
+    Prints change of every metric against previous results. Metrics ending with _per_second are better when
+    higher, metrics ending with _seconds or _per_page when lower, other metrics are only counts
+
+    :return: List of names of regressed metrics
+    """
+    regressions = []
+    print("Compared with", previous.get("commit"), "from", previous.get("time"))
+    for benchmark, metrics in current["results"].items():
+        previous_metrics = previous["results"].get(benchmark, {})
+        for metric, value in metrics.items():
+            # Extractors have one more level of metrics
+            pairs = [(metric + "." + key, value[key], previous_metrics.get(metric, {}).get(key)) for key in value] \
+                if isinstance(value, dict) else [(metric, value, previous_metrics.get(metric))]
+
+            for name, value, old in pairs:
+                if not old:
+                    continue
+
+                change = (value - old) / old
+                if name.endswith("_per_second"):
+                    regressed = change < -REGRESSION_THRESHOLD
+                elif name.endswith("_seconds") or name.endswith("_per_page"):
+                    regressed = change > REGRESSION_THRESHOLD
+                else:
+                    regressed = False
+
+                print("%-52s %14.4f %14.4f %+8.1f%%%s" % (benchmark + "." + name, old, value, change * 100,
+                                                         "  REGRESSION" if regressed else ""))
+                if regressed:
+                    regressions.append(benchmark + "." + name)
+    return regressions
+
+
+def main(argv):
+    opts, args = getopt.getopt(argv, "", ["output=", "compare=", "dump=", "pages=", "person-ratio=", "bc-ratio=",
+                                          "seed=", "pairs=", "repeat="])
+
+    output_file = None
+    compare_file = None
+    parameters = {"dump": None, "pages": 20000, "person_ratio": 0.3, "bc_ratio": 0.1, "seed": 0, "pairs": 100000,
+                  "repeat": 3}
+
+    for o, a in opts:
+        if o == "--output":
+            output_file = a
+        elif o == "--compare":
+            compare_file = a
+        elif o == "--dump":
+            parameters["dump"] = a
+        elif o == "--pages":
+            parameters["pages"] = int(a)
+        elif o == "--person-ratio":
+            parameters["person_ratio"] = float(a)
+        elif o == "--bc-ratio":
+            parameters["bc_ratio"] = float(a)
+        elif o == "--seed":
+            parameters["seed"] = int(a)
+        elif o == "--pairs":
+            parameters["pairs"] = int(a)
+        elif o == "--repeat":
+            parameters["repeat"] = int(a)
+
+    if parameters["dump"] is not None and not os.path.exists(parameters["dump"]):
+        print("Dump", parameters["dump"], "does not exist.")
+        exit(1)
+
+    results = {
+        "commit": current_commit(),
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "parameters": parameters,
+        "results": run_suite(parameters)
+    }
+
+    if output_file is not None:
+        with open(output_file, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+        print("Results written to", output_file)
+
+    if compare_file is not None:
+        with open(compare_file, encoding="utf-8") as previous:
+            regressions = compare(json.load(previous), results)
+        if regressions:
+            print(len(regressions), "metrics regressed by more than", "%d%%." % (REGRESSION_THRESHOLD * 100))
+            exit(2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
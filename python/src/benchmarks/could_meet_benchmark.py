@@ -0,0 +1,92 @@
+from date_parsing.date_export import DateExport
+from search.columnar_export import ColumnarExport
+from search.local_search import search_date_format
+from utilities.runtime_constants import RuntimeConstants
+import numpy as np
+import getopt
+import os
+import re
+import sys
+import time
+
+
+def legacy_seconds(text):
+    """
+    Lifetime boundary in seconds, as could_meet computed it before dates were stored as day ordinals
+    """
+    if text == "alive":
+        year, month, day, bc = RuntimeConstants.CURRENT_YEAR, 12, 31, False
+    else:
+        parse = re.search(r"(.+?)\.(.+?)\.(\d+)\W?(BC)?", text)
+        year, month, day, bc = parse[3], 12 if parse[2] == "None" else parse[2], 31 if parse[1] == "None" else parse[1], parse[4] == "BC"
+
+    string = ("-" if bc else "") + "%04d-%02d-%02d" % (int(year), int(month), int(day))
+    return np.datetime64(string).astype('<M8[s]').astype(np.int64)
+
+
+def legacy_could_meet(b1, d1, b2, d2):
+    try:
+        delta = min(legacy_seconds(d1), legacy_seconds(d2)) - max(legacy_seconds(b1), legacy_seconds(b2))
+    except ValueError:
+        # Month without 31st day, legacy version failed on it
+        return False
+    return max(0, delta) > 0
+
+
+def measure(pairs, could_meet):
+    """
+    :return: Number of pairs which could meet and elapsed time in seconds
+    """
+    met = 0
+    start = time.perf_counter()
+    for b1, d1, b2, d2 in pairs:
+        if could_meet(b1, d1, b2, d2):
+            met += 1
+    return met, time.perf_counter() - start
+
+
+def main(argv):
+    opts, args = getopt.getopt(argv, "", ["input=", "pairs="])
+
+    current_directory = os.path.dirname(__file__)
+    input_file = os.path.join(os.path.split(current_directory)[0], '..', 'data', 'dump_export.txt')
+    pair_count = 20000
+
+    for o, a in opts:
+        if o == "--input":
+            input_file = a
+        elif o == "--pairs":
+            pair_count = int(a)
+
+    if not os.path.exists(input_file):
+        print("Input file", input_file, "does not exist. Use --input path/export.txt")
+        exit(1)
+
+    columns = ColumnarExport.from_text_export(input_file)
+    rng = np.random.default_rng(0)
+    first = rng.integers(0, len(columns), pair_count)
+    second = rng.integers(0, len(columns), pair_count)
+    print("Loaded", len(columns), "persons,", pair_count, "random pairs.")
+
+    date_pairs = [(columns.birth_date(i), columns.death_date(i), columns.birth_date(j), columns.death_date(j))
+                  for i, j in zip(first, second)]
+    string_pairs = [tuple(search_date_format(date) for date in pair) for pair in date_pairs]
+
+    met, legacy = measure(string_pairs[:2000], legacy_could_meet)
+    print("%-32s %8.3f us/pair" % ("legacy regex + datetime64", legacy / min(2000, pair_count) * 1e6))
+
+    met, elapsed = measure(string_pairs, DateExport.could_meet)
+    print("%-32s %8.3f us/pair  (%d could meet)" % ("could_meet on search strings", elapsed / pair_count * 1e6, met))
+
+    met, elapsed = measure(date_pairs, DateExport.could_meet)
+    print("%-32s %8.3f us/pair  (%d could meet)" % ("could_meet on DateExport", elapsed / pair_count * 1e6, met))
+
+    start = time.perf_counter()
+    met = DateExport.could_meet_many(columns.birth[first], columns.death[first],
+                                     columns.birth[second], columns.death[second]).sum()
+    elapsed = time.perf_counter() - start
+    print("%-32s %8.3f us/pair  (%d could meet)" % ("could_meet_many on columns", elapsed / pair_count * 1e6, met))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,103 @@
+from textwrap import wrap
+
+from lxml import etree
+from date_parsing.date_extractor import BIRTH_DATE_EXTRACTOR, DEATH_DATE_EXTRACTOR
+import getopt
+import os
+import re
+import sys
+import time
+
+
+def load_page_lines(xml_path, max_pages):
+    """
+    Reads pages from dump and cuts them into lowercase 5000 chars lines the same way the reader does
+
+    :return: List of pages, where every page is a list of lines
+    """
+    pages = []
+    with open(xml_path, "rb") as in_xml:
+        for event, element in etree.iterparse(in_xml, events=("end",), tag=['{*}page']):
+            text = element.findtext('{*}revision/{*}text') or ""
+            pages.append([line.strip().lower() for line in wrap(text, 5000)])
+
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+            if len(pages) >= max_pages:
+                break
+
+    return pages
+
+
+def legacy_extract(extractor, line):
+    """
+    Cascade of re.search calls with literal patterns, as extract_birth_date and extract_death_date
+    were implemented before the extractor bank
+    """
+    if any(key in line for key in extractor.keys) and "infobox" in line:
+        for rule in extractor.rules:
+            match = re.search(rule.pattern.pattern, line)
+            if match:
+                date = rule.build(match)
+                if date is not None:
+                    return True, date
+    return False, None
+
+
+def bank_extract(extractor, line):
+    return extractor.extract(line)
+
+
+def run_pages(pages, extract):
+    """
+    :return: Number of found dates and elapsed time in seconds
+    """
+    found = 0
+    start = time.perf_counter()
+    for lines in pages:
+        for extractor in (BIRTH_DATE_EXTRACTOR, DEATH_DATE_EXTRACTOR):
+            for line in lines:
+                try:
+                    if extract(extractor, line)[0]:
+                        found += 1
+                        break
+                except:
+                    break
+    return found, time.perf_counter() - start
+
+
+def main(argv):
+    opts, args = getopt.getopt(argv, "", ["input=", "pages=", "repeat="])
+
+    current_directory = os.path.dirname(__file__)
+    input_file = os.path.join(os.path.split(current_directory)[0], '..', 'data', 'dump_split.xml')
+    max_pages = 20000
+    repeat = 3
+
+    for o, a in opts:
+        if o == "--input":
+            input_file = a
+        elif o == "--pages":
+            max_pages = int(a)
+        elif o == "--repeat":
+            repeat = int(a)
+
+    if not os.path.exists(input_file):
+        print("Input file", input_file, "does not exist. Use --input path/dump_split.xml")
+        exit(1)
+
+    pages = load_page_lines(input_file, max_pages)
+    print("Loaded", len(pages), "pages.")
+
+    for name, extract in (("legacy re.search cascade", legacy_extract), ("precompiled extractor bank", bank_extract)):
+        best = None
+        for _ in range(repeat):
+            found, elapsed = run_pages(pages, extract)
+            best = elapsed if best is None else min(best, elapsed)
+        print("%-28s %8.2f us/page  (%d dates found)" % (name, best / max(1, len(pages)) * 1e6, found))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
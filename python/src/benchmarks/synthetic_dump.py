@@ -0,0 +1,226 @@
+from xml.sax.saxutils import escape
+import getopt
+import hashlib
+import random
+import sys
+
+
+MONTHS = ("January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+          "November", "December")
+
+FIRST_NAMES = ("Albert", "Marie", "Isaac", "Ada", "Nikola", "Rosalind", "Johann", "Hypatia", "Leonhard", "Emmy",
+               "Galileo", "Sofia", "Michael", "Lise", "Niels", "Grace", "Carl", "Dorothy", "Enrico", "Barbara")
+
+SURNAMES = ("Novak", "Horvath", "Kovac", "Smith", "Weber", "Lindqvist", "Moreau", "Rossi", "Silva", "Tanaka",
+            "Kowalski", "Fischer", "Dvorak", "Petrov", "Jensen", "Garcia", "Murphy", "Schmidt", "Varga", "Costa")
+
+FILLER_WORDS = ("lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit", "sed", "do",
+                "eiusmod", "tempor", "incididunt", "ut", "labore", "et", "dolore", "magna", "aliqua", "enim")
+
+# Formats of dates generated into pages, BC dates are generated only in formats supporting them. Lead sentence
+# circa dates are recognized by the reader only with BC era, so they are never generated for AD persons
+INFOBOX_FORMATS = ("template", "day_month_year", "month_day_year", "circa")
+FULLTEXT_FORMATS = ("full", "years", "circa")
+BC_FORMATS = {("infobox", "day_month_year"), ("infobox", "month_day_year"), ("infobox", "circa"), ("fulltext", "circa")}
+BC_ONLY_FORMATS = {("fulltext", "circa")}
+
+
+def date_repr(year, month, day, bc):
+    """
+    Date as written to export by DateExport
+    """
+    return "{0}.{1}.{2} (BC: {3})".format(day, month, year, bc)
+
+
+class SyntheticDump:
+
+    def __init__(self, pages=1000, person_ratio=0.3, redirect_ratio=0.05, other_namespace_ratio=0.05, bc_ratio=0.1,
+                 fulltext_ratio=0.3, alive_ratio=0.1, infobox_formats=INFOBOX_FORMATS,
+                 fulltext_formats=FULLTEXT_FORMATS, filler_words=300, seed=0):
+        """
+        Deterministic generator of MediaWiki XML dumps for tests and benchmarks. Person pages have birth and
+        death dates in infobox or in the lead sentence, other pages are articles without persons, redirects and
+        pages outside of article namespace. Expected export record of every person is remembered, so output of
+        the reader can be compared with it
+
+        :param pages: Number of generated pages
+        :param person_ratio: Share of person pages
+        :param redirect_ratio: Share of redirect pages
+        :param other_namespace_ratio: Share of talk pages with person categories, which must be skipped
+        :param bc_ratio: Share of persons living BC
+        :param fulltext_ratio: Share of persons with dates in lead sentence instead of infobox
+        :param alive_ratio: Share of persons without death date born recently enough to be exported as alive
+        :param infobox_formats: Generated infobox date formats, subset of INFOBOX_FORMATS
+        :param fulltext_formats: Generated lead sentence date formats, subset of FULLTEXT_FORMATS
+        :param filler_words: Average number of words of text around dates
+        :param seed: Seed of random generator, the same seed always gives the same dump
+        """
+        self.pages = pages
+        self.person_ratio = person_ratio
+        self.redirect_ratio = redirect_ratio
+        self.other_namespace_ratio = other_namespace_ratio
+        self.bc_ratio = bc_ratio
+        self.fulltext_ratio = fulltext_ratio
+        self.alive_ratio = alive_ratio
+        self.infobox_formats = infobox_formats
+        self.fulltext_formats = fulltext_formats
+        self.filler_words = filler_words
+        self.seed = seed
+        self.expected_records = []
+        self.bytes_written = 0
+
+    def write(self, path):
+        """
+        Writes dump to path and fills expected_records with export lines of persons in dump order
+
+        :return: self
+        """
+        rng = random.Random(self.seed)
+        self.expected_records = []
+        self.bytes_written = 0
+
+        with open(path, "w", encoding="utf-8") as dump:
+            self._write(dump, '<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/" version="0.10" xml:lang="en">\n'
+                              '  <siteinfo>\n    <sitename>Wikipedia</sitename>\n  </siteinfo>\n')
+
+            for page_id in range(1, self.pages + 1):
+                kind = rng.random()
+                if kind < self.person_ratio:
+                    title, text = self.person_page(rng, page_id)
+                    self._write(dump, self.page_xml(title, 0, page_id, text))
+                elif kind < self.person_ratio + self.redirect_ratio:
+                    target = "Topic %d" % rng.randint(1, self.pages)
+                    self._write(dump, self.page_xml("Redirect %d" % page_id, 0, page_id, "#REDIRECT [[%s]]" % target, target))
+                elif kind < self.person_ratio + self.redirect_ratio + self.other_namespace_ratio:
+                    text = "Discussion. " + self.filler(rng) + "\n[[Category:1900 births]]"
+                    self._write(dump, self.page_xml("Talk:Topic %d" % page_id, 1, page_id, text))
+                else:
+                    text = "'''Topic %d''' is a place. " % page_id + self.filler(rng) + "\n[[Category:Geography]]"
+                    self._write(dump, self.page_xml("Topic %d" % page_id, 0, page_id, text))
+
+            self._write(dump, "</mediawiki>\n")
+
+        return self
+
+    def _write(self, dump, text):
+        dump.write(text)
+        self.bytes_written += len(text.encode("utf-8"))
+
+    def filler(self, rng):
+        count = rng.randint(self.filler_words // 2, self.filler_words * 3 // 2)
+        return " ".join(rng.choice(FILLER_WORDS) for _ in range(count))
+
+    @staticmethod
+    def page_xml(title, namespace, page_id, text, redirect=None):
+        redirect = '\n    <redirect title="%s" />' % escape(redirect, {'"': "&quot;"}) if redirect else ""
+        sha1 = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return ('  <page>\n    <title>%s</title>\n    <ns>%d</ns>\n    <id>%d</id>%s\n    <revision>\n'
+                '      <id>%d</id>\n      <text bytes="%d" xml:space="preserve">%s</text>\n      <sha1>%s</sha1>\n'
+                '    </revision>\n  </page>\n') % (escape(title), namespace, page_id, redirect, page_id + 1000000,
+                                                 len(text.encode("utf-8")), escape(text), sha1)
+
+    def person_page(self, rng, page_id):
+        """
+        :return: Tuple of title and wikitext of person page, expected export record is remembered
+        """
+        title = "%s %s %d" % (rng.choice(FIRST_NAMES), rng.choice(SURNAMES), page_id)
+        fulltext = self.fulltext_formats and (not self.infobox_formats or rng.random() < self.fulltext_ratio)
+        source = "fulltext" if fulltext else "infobox"
+        formats = self.fulltext_formats if fulltext else self.infobox_formats
+
+        bc_formats = [form for form in formats if (source, form) in BC_FORMATS]
+        ad_formats = [form for form in formats if (source, form) not in BC_ONLY_FORMATS]
+        bc = bool(bc_formats) and (not ad_formats or rng.random() < self.bc_ratio)
+        form = rng.choice(bc_formats if bc else ad_formats)
+        alive = not bc and source == "infobox" and form == "template" and rng.random() < self.alive_ratio
+
+        # Age is always in range accepted by DateExport.is_correct_age
+        if bc:
+            birth_year = rng.randint(120, 900)
+            death_year = birth_year - rng.randint(20, 90)
+        elif alive:
+            birth_year = rng.randint(1935, 2000)
+        else:
+            birth_year = rng.randint(1000, 1900)
+            death_year = birth_year + rng.randint(20, 90)
+
+        birth_month, birth_day = rng.randint(1, 12), rng.randint(1, 28)
+        death_month, death_day = rng.randint(1, 12), rng.randint(1, 28)
+        bc_suffix = " BC" if bc else ""
+        lead = "'''%s''' was a scientist. " % title
+
+        if alive:
+            dates = "{{Infobox scientist\n| name = %s\n| birth_date = {{birth date and age|%d|%d|%d}}\n}}\n" % (
+                title, birth_year, birth_month, birth_day)
+            record = (date_repr(birth_year, birth_month, birth_day, False), "'alive'")
+        elif source == "infobox":
+            if form == "template":
+                birth = "{{birth date|%d|%d|%d}}" % (birth_year, birth_month, birth_day)
+                death = "{{death date and age|%d|%d|%d|%d|%d|%d}}" % (death_year, death_month, death_day,
+                                                                      birth_year, birth_month, birth_day)
+            elif form == "day_month_year":
+                birth = "%d %s %d%s" % (birth_day, MONTHS[birth_month - 1], birth_year, bc_suffix)
+                death = "%d %s %d%s" % (death_day, MONTHS[death_month - 1], death_year, bc_suffix)
+            elif form == "month_day_year":
+                birth = "%s %d, %d%s" % (MONTHS[birth_month - 1], birth_day, birth_year, bc_suffix)
+                death = "%s %d, %d%s" % (MONTHS[death_month - 1], death_day, death_year, bc_suffix)
+            else:
+                birth = "c. %d%s" % (birth_year, bc_suffix)
+                death = "c. %d%s" % (death_year, bc_suffix)
+
+            dates = "{{Infobox scientist\n| name = %s\n| birth_date = %s\n| death_date = %s\n| occupation = Scientist\n}}\n" % (
+                title, birth, death)
+            if form == "circa":
+                record = (date_repr(birth_year, None, None, bc), date_repr(death_year, None, None, bc))
+            else:
+                record = (date_repr(birth_year, birth_month, birth_day, bc), date_repr(death_year, death_month, death_day, bc))
+        else:
+            if form == "full":
+                lead = "'''%s''' (%d %s %d &ndash; %d %s %d) was a scientist. " % (
+                    title, birth_day, MONTHS[birth_month - 1], birth_year, death_day, MONTHS[death_month - 1], death_year)
+                record = (date_repr(birth_year, birth_month, birth_day, False), date_repr(death_year, death_month, death_day, False))
+            elif form == "years":
+                lead = "'''%s''' (%d&ndash;%d) was a scientist. " % (title, birth_year, death_year)
+                record = (date_repr(birth_year, None, None, False), date_repr(death_year, None, None, False))
+            else:
+                lead = "'''%s''' (c. %d &ndash; c. %d%s) was a scientist. " % (title, birth_year, death_year, bc_suffix)
+                record = (date_repr(birth_year, None, None, bc), date_repr(death_year, None, None, bc))
+            dates = ""
+
+        category = "%d%s births" % (birth_year, bc_suffix)
+        self.expected_records.append(title + "," + record[0] + "," + record[1])
+        return title, dates + lead + self.filler(rng) + "\n[[Category:%s]]\n[[Category:Physicists]]" % category
+
+
+def main(argv):
+    opts, args = getopt.getopt(argv, "", ["output=", "pages=", "person-ratio=", "bc-ratio=", "fulltext-ratio=",
+                                          "redirect-ratio=", "seed="])
+
+    output_file = None
+    options = {}
+    for o, a in opts:
+        if o == "--output":
+            output_file = a
+        elif o == "--pages":
+            options["pages"] = int(a)
+        elif o == "--person-ratio":
+            options["person_ratio"] = float(a)
+        elif o == "--bc-ratio":
+            options["bc_ratio"] = float(a)
+        elif o == "--fulltext-ratio":
+            options["fulltext_ratio"] = float(a)
+        elif o == "--redirect-ratio":
+            options["redirect_ratio"] = float(a)
+        elif o == "--seed":
+            options["seed"] = int(a)
+
+    if output_file is None:
+        print("Use --output path/synthetic.xml")
+        exit(1)
+
+    dump = SyntheticDump(**options).write(output_file)
+    print("Written", dump.pages, "pages with", len(dump.expected_records), "persons,", dump.bytes_written, "bytes.")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
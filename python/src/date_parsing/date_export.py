@@ -1,30 +1,67 @@
-from utilities import attr_type_constraint, utils
+from utilities import utils
 from utilities.runtime_constants import RuntimeConstants
 import re
 from date_parsing.date_format import DateFormat
+from date_parsing.date_ordinal import date_to_ordinal, ordinal_to_date, days_from_civil, overlap_days
 from datetime import datetime
-from collections import namedtuple
+from functools import lru_cache
 import numpy as np
 
-@attr_type_constraint.auto_attr_check
+# Date string as returned by person search, e.g. "14.3.1879 " or "20.7.356 BC"
+SEARCH_DATE_REGEX = re.compile(r"(.+?)\.(.+?)\.(\d+)\W?(BC)?")
+
+# Ordinal of 1 January of year 0, every earlier day is BC
+FIRST_AD_ORDINAL = days_from_civil(0, 1, 1)
+
+
 class DateExport:
 
+    # Date is stored as signed day ordinal (BC years are negative) and precision, see date_ordinal
+    __slots__ = ("ordinal", "precision")
+
     def __init__(self, year, month, day, bc = False):
         """
-        Initialize DateExport with year month and day values
+        Initialize DateExport with year month and day values. Missing month or day ("None" or None)
+        lowers precision of the date, out of range month or day raises ValueError
+        """
+        month = None if month == "None" or month is None else int(month)
+        day = None if day == "None" or day is None else int(day)
+        self.ordinal, self.precision = date_to_ordinal(int(year), month, day, bc)
+
+    @classmethod
+    def from_ordinal(cls, ordinal, precision):
+        date = cls.__new__(cls)
+        date.ordinal = int(ordinal)
+        date.precision = int(precision)
+        return date
+
+    def date_tuple(self):
+        """
+        :return: Tuple of year, month (or None), day (or None) and BC flag
         """
-        if month == "None" or month is None:
-            self.month = None
-        else:
-            self.month = month
+        return ordinal_to_date(self.ordinal, self.precision)
 
-        if day == "None" or day is None:
-            self.day = None
-        else:
-            self.day = day
+    @property
+    def year(self):
+        return self.date_tuple()[0]
 
-        self.year = year
-        self.BC = bc
+    @property
+    def month(self):
+        return self.date_tuple()[1]
+
+    @property
+    def day(self):
+        return self.date_tuple()[2]
+
+    @property
+    def BC(self):
+        return self.ordinal < FIRST_AD_ORDINAL
+
+    @BC.setter
+    def BC(self, bc):
+        year, month, day, old_bc = self.date_tuple()
+        if bc != old_bc:
+            self.ordinal, self.precision = date_to_ordinal(year, month, day, bc)
 
     @classmethod
     def from_format(cls, text, form = DateFormat):
@@ -44,6 +81,31 @@ class DateExport:
             (year, month, day) = cls.parse_as_txtmonth_full_format(cls, text)
             return cls(year, month, day)
 
+    @classmethod
+    def from_repr(cls, text):
+        """
+        Initialize DateExport from its exported representation, e.g. "12.2.1809 (BC: False)".
+        Exported 'alive' death date is returned as "alive"
+        """
+        if text == "'alive'" or text == "alive":
+            return "alive"
+
+        match = re.match(r"(\w+)\.(\w+)\.(\d+) \(BC: (True|False)\)", text)
+        return cls(int(match[3]),
+                   None if match[2] == "None" else int(match[2]),
+                   None if match[1] == "None" else int(match[1]),
+                   match[4] == "True")
+
+    @staticmethod
+    def parse_export_record(line):
+        """
+        Splits one line of export into name, birth date and death date. Name may contain commas
+
+        :return: Tuple of name, DateExport and DateExport or "alive"
+        """
+        name, birth, death = line.rstrip("\n").rsplit(",", 2)
+        return name, DateExport.from_repr(birth), DateExport.from_repr(death)
+
     @staticmethod
     def parse_as_yearonly_format(self, text):
         # 1874
@@ -115,51 +177,50 @@ class DateExport:
 
         return False
 
+    @staticmethod
+    def interval_ordinal(date):
+        """
+        Day ordinal of a lifetime boundary. Accepts DateExport, "alive" or date string as returned by person search
+        """
+        if isinstance(date, DateExport):
+            return date.ordinal
+        if date == "alive":
+            return days_from_civil(RuntimeConstants.CURRENT_YEAR, 12, 31)
+        return DateExport._search_date_ordinal(date)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _search_date_ordinal(text):
+        parse = SEARCH_DATE_REGEX.match(text)
+        return date_to_ordinal(int(parse[3]), None if parse[2] == "None" else int(parse[2]),
+                               None if parse[1] == "None" else int(parse[1]), parse[4] == "BC")[0]
+
     @staticmethod
     def could_meet(b1,d1,b2,d2):
+        """
+        Whether two lifetimes overlap by at least one day. Dates may be DateExport objects, "alive" or date strings
+        as returned by person search. Missing month or day is the end of the year or month
+        """
+        latest_start = max(DateExport.interval_ordinal(b1), DateExport.interval_ordinal(b2))
+        earliest_end = min(DateExport.interval_ordinal(d1), DateExport.interval_ordinal(d2))
+        return earliest_end - latest_start > 0
+
+    @staticmethod
+    def could_meet_many(start1, end1, start2, end2):
+        """
+        Vectorized could_meet over numpy arrays (or numbers) of day ordinals, e.g. columns of ColumnarExport
+
+        :return: numpy bool array
+        """
+        return overlap_days(np.asarray(start1, dtype=np.int64), np.asarray(end1, dtype=np.int64),
+                            np.asarray(start2, dtype=np.int64), np.asarray(end2, dtype=np.int64)) > 0
 
-        parse = re.search(r"(.+?)\.(.+?)\.(\d+)\W?(BC)?", b1)
-        b1_date = DateExport(parse[3], 12 if parse[2] == "None" else parse[2], 31 if parse[1] == "None" else parse[1], parse[4] == "BC")
-
-        if d1 == "alive":
-            d1_date = DateExport(RuntimeConstants.CURRENT_YEAR, 12, 31)
-        else:
-            parse = re.search(r"(.+?)\.(.+?)\.(\d+)\W?(BC)?", d1)
-            d1_date = DateExport(parse[3], 12 if parse[2] == "None" else parse[2], 31 if parse[1] == "None" else parse[1], parse[4] == "BC")
-
-        parse = re.search(r"(.+?)\.(.+?)\.(\d+)\W?(BC)?", b2)
-        b2_date = DateExport(parse[3], 12 if parse[2] == "None" else parse[2], 31 if parse[1] == "None" else parse[1], parse[4] == "BC")
-
-        if d2 == "alive":
-            d2_date = DateExport(RuntimeConstants.CURRENT_YEAR, 12, 31)
-        else:
-            parse = re.search(r"(.+?)\.(.+?)\.(\d+)\W?(BC)?", d2)
-            d2_date = DateExport(parse[3], 12 if parse[2] == "None" else parse[2], 31 if parse[1] == "None" else parse[1], parse[4] == "BC")
-
-        Range = namedtuple('Range', ['start', 'end'])
-        r1 = Range(start=b1_date.__iso8601_str__(), end=d1_date.__iso8601_str__())
-        r2 = Range(start=b2_date.__iso8601_str__(), end=d2_date.__iso8601_str__())
-
-        latest_start = max(r1.start, r2.start)
-        earliest_end = min(r1.end, r2.end)
-        delta = (earliest_end - latest_start)
-        overlap = max(0, delta)
-
-        return overlap > 0
-
-    def __iso8601_str__(self):
-        string = ("-" if self.BC else "+") + "%04d-%02d-%02dT00:00:00Z" % (int(self.year), int(self.month), int(self.day))
-        date_str = string.strip()
-        if date_str[0] == '+':
-            date_str = date_str[1:]
-        date_str = date_str.split('-00', maxsplit=1)[0]
-        dt = np.datetime64(date_str)
-        return dt.astype('<M8[s]').astype(np.int64)
     def __sub__(self, o):
         return DateExport(self.year - o.year, self.month - o.month, self.day - o.day)
 
     def __repr__(self):
-        return "{self.day}.{self.month}.{self.year} (BC: {self.BC})".format(self=self)
+        year, month, day, bc = self.date_tuple()
+        return "{0}.{1}.{2} (BC: {3})".format(day, month, year, bc)
 
     def __str__(self):
         return self.__repr__()
@@ -0,0 +1,249 @@
+from date_parsing.date_export import DateExport
+from date_parsing.date_format import DateFormat
+import re
+
+
+class ExtractorRule:
+
+    def __init__(self, name, pattern, build, year_and_age=False):
+        """
+        Single infobox format recognized by InfoboxDateExtractor
+
+        :param name: Name of the format, used to report which rule matched
+        :param pattern: Regex pattern of the format
+        :param build: Function creating DateExport from the match. Returning None or raising ValueError means
+                      the rule did not produce a date and next rule is tried
+        :param year_and_age: Rule is anchored on "<field> year and age" key instead of "<field> date" key
+        """
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.build = build
+        self.year_and_age = year_and_age
+
+
+def build_year_month_day(match):
+    return DateExport(int(match[1]), int(match[2]), int(match[3]))
+
+
+def build_day_month_year(match):
+    try:
+        date = DateExport.from_format(match[1] + " " + match[2] + " " + match[3], DateFormat.TXTMONTH_FULL)
+    except:
+        return None
+
+    if match[4] and "bc" in match[4]:
+        date.BC = True
+    return date
+
+
+def build_month_day_year(match):
+    try:
+        date = DateExport.from_format(match[2] + " " + match[1] + " " + match[3], DateFormat.TXTMONTH_FULL)
+    except:
+        return None
+
+    if match[4] and "bc" in match[4]:
+        date.BC = True
+    return date
+
+
+def build_year_bc(match):
+    date = DateExport.from_format(match[1], DateFormat.YEAR_ONLY)
+    date.BC = True
+    return date
+
+
+def build_year(match):
+    return DateExport.from_format(match[1], DateFormat.YEAR_ONLY)
+
+
+def build_month_year(match):
+    return DateExport.from_format(match[1] + " " + match[2], DateFormat.TXTMONTH_AND_YEAR)
+
+
+class InfoboxDateExtractor:
+
+    def __init__(self, field, rules):
+        """
+        Bank of precompiled infobox date formats for one field. Position of the field key is found once
+        and every rule is matched only against text following the key
+
+        :param field: "birth" or "death"
+        :param rules: List of ExtractorRule in order of priority
+        """
+        self.keys = (field + " date", field + "-date", field + "_date")
+        self.field_key = field + " date"
+        self.year_and_age_key = field + " year and age"
+        self.rules = rules
+        self.last_rule = None
+
+    def key_position(self, line):
+        """
+        :return: Position of the first date key in line or -1 when line does not contain any
+        """
+        position = -1
+        for key in self.keys:
+            found = line.find(key)
+            if found != -1 and (position == -1 or found < position):
+                position = found
+        return position
+
+    def extract(self, line):
+        """
+        Matches a date from line using the first rule that recognizes it
+
+        :param line: Lowercase string with wikipedia text
+        :return: Tuple of bool telling whether date was found and DateExport
+        """
+        self.last_rule = None
+        key_position = self.key_position(line)
+        if key_position == -1 or "infobox" not in line:
+            return False, None
+        return self.match_rules(line, key_position)
+
+    def extract_fields(self, fields):
+        """
+        Matches a date from infobox fields. Value of "<field> date" is tried first, then values of other fields
+        holding a date template, e.g. "born = {{birth date|1809|2|12}}"
+
+        :param fields: Dictionary of field names and values returned by infobox_fields
+        :return: Tuple of bool telling whether date was found and DateExport
+        """
+        self.last_rule = None
+        value = fields.get(self.field_key)
+        if value:
+            found, date = self.extract_value(value)
+            if found:
+                return found, date
+
+        for name, value in fields.items():
+            if name != self.field_key and self.key_position(value) != -1:
+                found, date = self.extract_value(value)
+                if found:
+                    return found, date
+        return False, None
+
+    def extract_value(self, value):
+        """
+        Matches a date from value of single infobox field
+        """
+        # Value is put behind its key and followed by separator of the next field, as rules expect
+        return self.match_rules(self.keys[2] + " = " + value + " |", 0)
+
+    def match_rules(self, line, key_position):
+        """
+        :return: Tuple of bool and DateExport of the first rule matching line after key_position
+        """
+        self.last_rule = None
+        year_and_age_position = None
+        for rule in self.rules:
+            if rule.year_and_age:
+                if year_and_age_position is None:
+                    year_and_age_position = line.find(self.year_and_age_key)
+                if year_and_age_position == -1:
+                    continue
+                match = rule.pattern.search(line, year_and_age_position)
+            else:
+                match = rule.pattern.search(line, key_position)
+
+            if match:
+                # Invalid date, e.g. 30 February, is not a date and next rule is tried
+                try:
+                    date = rule.build(match)
+                except ValueError:
+                    date = None
+                if date is not None:
+                    self.last_rule = rule.name
+                    return True, date
+
+        return False, None
+
+
+_FLAGS = r"\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n)|\s+)?"
+_FLAGS_NO_SPACE = r"\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n))?"
+
+
+def birth_date_rules():
+    return [
+        # birth date|1809|2|12
+        ExtractorRule("year_month_day",
+                      r"(?:birth date|birth date and age|birth-date|birth_date)" + _FLAGS + r"\|([0-9]{1,4})\|([0-9]{1,2})\|([0-9]{1,2})",
+                      build_year_month_day),
+        # birth-date|23 September 1996  or  birth-date = 6 November AD 19
+        ExtractorRule("day_month_year",
+                      r"(?:birth date|birth-date|birth_date)" + _FLAGS + r"\W+(\d{1,2})(?: or?\W+\d{1,2})?\W+([a-zA-Z]+)\W*?(?:ad)?\W*?(\d{1,4})\s*(bc)?",
+                      build_day_month_year),
+        # birth-date|September 23, 1996
+        ExtractorRule("month_day_year",
+                      r"(?:birth date|birth-date|birth_date)" + _FLAGS + r"\W+([a-zA-Z]+)\W+(\d{1,2})(?: or?\W+\d{1,2})?\W+(\d{1,4})\s*(bc)?",
+                      build_month_day_year),
+        # birth-date = {{circa 650}} BC
+        ExtractorRule("circa_template_bc",
+                      r"(?:birth-date|birth_date|birth date)" + _FLAGS + r"\|?(?:c\.|circa\W*)?([0-9]{1,4}).+?\}\}.*?(bc)",
+                      build_year_bc),
+        # birth-date = circa 650 BC
+        ExtractorRule("circa_bc",
+                      r"(?:birth-date|birth_date|birth date)\W*(?:c\.|circa\W*) ([0-9]{1,4}) (bc)",
+                      build_year_bc),
+        # birth-date = circa 650
+        ExtractorRule("circa",
+                      r"(?:birth-date|birth_date|birth date)\W*(?:c\.|circa\W*) ([0-9]{1,4})[a-zA-Z0-9\W]*?\|",
+                      build_year),
+        # birth-date|c. 1750  or  birth-date|1950
+        ExtractorRule("year",
+                      r"(?:birth-date|birth_date|birth date)" + _FLAGS + r"\|(?:c.\W*)?([0-9]{1,4})",
+                      build_year),
+        # birth-date|May, 1920
+        ExtractorRule("month_year",
+                      r"(?:birth-date|birth_date|birth date)" + _FLAGS_NO_SPACE + r"\|([a-zA-Z]+)(?:\W+|,)([0-9]{1,4})",
+                      build_month_year),
+        # birth year and age|1750
+        ExtractorRule("year_and_age",
+                      r"birth year and age\W*?\|(\d{1,4})",
+                      build_year, year_and_age=True),
+    ]
+
+
+def death_date_rules():
+    return [
+        # death-date|1875|12|1|
+        ExtractorRule("year_month_day",
+                      r"(?:death date|death date and age|death-date|death_date)" + _FLAGS + r"\|([0-9]{1,4})\|([0-9]{1,2})\|([0-9]{1,2})\s*\|",
+                      build_year_month_day),
+        # death-date|23 September 1996
+        ExtractorRule("day_month_year",
+                      r"(?:death date|death-date|death_date)" + _FLAGS + r"\W+(\d{1,2})(?: or?\W+\d{1,2})?\W+([a-zA-Z]+)\W*?(?:ad)?\W*?(\d{1,4})\s*(bc)?",
+                      build_day_month_year),
+        # death-date = {{circa 650}} BC
+        ExtractorRule("circa_template_bc",
+                      r"(?:death-date|death_date|death date)" + _FLAGS + r"\|?(?:c\.|circa\W*)?([0-9]{1,4}).+?\}\}.*?(bc)",
+                      build_year_bc),
+        # death-date = circa 650 BC
+        ExtractorRule("circa_bc",
+                      r"(?:death-date|death_date|death date).*(?:c\.|circa\W*) ([0-9]{1,4}) (bc)",
+                      build_year_bc),
+        # death-date = circa 650
+        ExtractorRule("circa",
+                      r"(?:death-date|death_date|death date)\W*(?:c\.|circa\W*) ([0-9]{1,4})[a-zA-Z0-9\W]*?\|",
+                      build_year),
+        # death-date|September 23, 1996
+        ExtractorRule("month_day_year",
+                      r"(?:death date|death-date|death_date)" + _FLAGS + r"\W+([a-zA-Z]+)\W+(\d{1,2})(?: or?\W+\d{1,2})?\W+(\d{1,4})\s*(bc)?",
+                      build_month_day_year),
+        # death-date|1940  or  death date|mf=n|904
+        ExtractorRule("year",
+                      r"(?:death-date|death_date|death date)" + _FLAGS + r"\|(?:c.\W*)?([0-9]{1,4})",
+                      build_year),
+        # death-date|May, 1920  or  death_date|mf=yes|January,1205
+        ExtractorRule("month_year",
+                      r"(?:death-date|death_date|death date)" + _FLAGS_NO_SPACE + r"\|([a-zA-Z]+)(?:\W+|,)([0-9]{1,4})",
+                      build_month_year),
+        # death year and age|1750
+        ExtractorRule("year_and_age",
+                      r"death year and age\W*?\|(\d{1,4})",
+                      build_year, year_and_age=True),
+    ]
+
+
+BIRTH_DATE_EXTRACTOR = InfoboxDateExtractor("birth", birth_date_rules())
+DEATH_DATE_EXTRACTOR = InfoboxDateExtractor("death", death_date_rules())
@@ -0,0 +1,101 @@
+import numpy as np
+
+# Precision of a date stored as day ordinal. Missing parts are filled with the end of the period
+# (last day of month, December), the same way could_meet always treated them
+PRECISION_DAY = 0
+PRECISION_MONTH = 1
+PRECISION_YEAR = 2
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def is_leap_year(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def days_in_month(year, month):
+    if month == 2 and is_leap_year(year):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+
+def days_from_civil(year, month, day):
+    """
+    Converts proleptic gregorian date to number of days since 1970-01-01 (the same value as numpy datetime64[D]).
+    Year uses astronomical numbering, so BC year N is passed as -N, as in ISO 8601 export of DateExport
+
+    source: http://howardhinnant.github.io/date_algorithms.html
+    """
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def civil_from_days(days):
+    """
+    Inverse of days_from_civil
+
+    :return: Tuple of astronomical year, month and day
+    """
+    days += 719468
+    era = days // 146097
+    day_of_era = days - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    month_prime = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * month_prime + 2) // 5 + 1
+    month = month_prime + (3 if month_prime < 10 else -9)
+    return year_of_era + era * 400 + (month <= 2), month, day
+
+
+def date_to_ordinal(year, month, day, bc):
+    """
+    Converts possibly incomplete date to day ordinal and precision. Missing month is December, missing day
+    is the last day of month. Out of range month or day and year 0 BC, which has no astronomical number
+    of its own, are rejected with ValueError
+
+    :return: Tuple of day ordinal and precision
+    """
+    if bc and year == 0:
+        raise ValueError("Year 0 BC does not exist.")
+
+    year = -year if bc else year
+    if month is None:
+        return days_from_civil(year, 12, 31), PRECISION_YEAR
+
+    if not 1 <= month <= 12:
+        raise ValueError("Month {0} is out of range.".format(month))
+    last_day = days_in_month(year, month)
+    if day is None:
+        return days_from_civil(year, month, last_day), PRECISION_MONTH
+
+    if not 1 <= day <= last_day:
+        raise ValueError("Day {0} is out of range of month {1}.".format(day, month))
+    return days_from_civil(year, month, day), PRECISION_DAY
+
+
+def ordinal_to_date(ordinal, precision):
+    """
+    Inverse of date_to_ordinal
+
+    :return: Tuple of year, month (or None), day (or None) and BC flag
+    """
+    year, month, day = civil_from_days(int(ordinal))
+    bc = year < 0
+    year = -year if bc else year
+
+    if precision == PRECISION_YEAR:
+        return year, None, None, bc
+    if precision == PRECISION_MONTH:
+        return year, month, None, bc
+    return year, month, day, bc
+
+
+def overlap_days(start1, end1, start2, end2):
+    """
+    Number of days two lifetimes overlap, works with numbers and numpy arrays of day ordinals
+    """
+    return np.maximum(0, np.minimum(end1, end2) - np.maximum(start1, start2))
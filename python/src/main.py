@@ -1,13 +1,31 @@
 from parsers.wiki_reader import MediaWikiDumpReader as DumpReader
 from parsers.wiki_splitter import MediaWikiDumpSplitter
+from parsers.mmap_splitter import MmapDumpSplitter
+from parsers.page_index import PageIndex
+from parsers.wiki_sharder import MediaWikiDumpSharder
+from parsers.multistream import open_dump, is_bz2_dump
+from parsers.checkpoint import ParseCheckpoint
+from parsers.revision_table import RevisionTable
+from parsers.parser_stats import ParserStats
 from utilities.runtime_constants import RuntimeConstants as Constants
 from utilities.utils import get_smart_file_size
 from search.export_search import ExportSearch
+from search.columnar_export import ColumnarExport
+from search.local_search import LocalSearch
+from search.lookup_cache import LookupCache
+from search.pair_batch import PairBatch
+from search.group_overlaps import GroupOverlaps
+from search.query_service import QueryService
+from search.interval_index import LifetimeIndex
+from search.meeting_chain import MeetingChain
 from date_parsing.date_export import DateExport
+from lxml import etree
+import numpy as np
 import os.path
 import signal
 import sys, getopt
 import re
+import time
 
 def load_gazetteer(gazetteer_path):
     file = open(gazetteer_path, "r")
@@ -19,15 +37,127 @@ def signal_handler(sig, frame):
     print('\nApplication interrupted.')
     sys.exit(0)
 
-def run_indexer(file, bulk_size):
-    file = "../data/whole_wiki_parsed.txt"
+def export_binary(export_file, binary_directory):
+    columns = ColumnarExport.from_text_export(export_file)
+    columns.save(binary_directory)
+    print("Binary export of", len(columns), "persons saved to", binary_directory)
+
+def run_local_indexer(export_path, index_directory):
+    search = LocalSearch.open(export_path)
+    search.save(index_directory)
+    print("Local index of", len(search.columns), "persons saved to", index_directory)
+
+def print_overlaps(export_path, name, limit):
+    search = LocalSearch.open(export_path)
+    person_id = search.lookup(name)
+    if person_id is None:
+        search.find(name)
+        exit(1)
+
+    index = LifetimeIndex.build(search.columns)
+    person_ids, days = index.overlaps_person(search.columns, person_id)
+
+    person_name, birth, death = search.person(person_id)
+    print(person_name, birth.replace("None.None.", ""), "-", death.replace("None.None.", ""))
+    print(len(person_ids), "people could meet", person_name)
+
+    # The longest overlaps first
+    for i in np.argsort(-days, kind="stable")[:limit]:
+        other_name, other_birth, other_death = search.person(person_ids[i])
+        print(" - %s %s - %s (%.1f years)" % (other_name, other_birth.replace("None.None.", ""),
+                                              other_death.replace("None.None.", ""), days[i] / 365.2425))
+
+def print_chain(export_path, first_name, second_name):
+    search = LocalSearch.open(export_path)
+    person_ids = []
+    for name in (first_name, second_name):
+        person_id = search.lookup(name)
+        if person_id is None:
+            search.find(name)
+            exit(1)
+        person_ids.append(person_id)
+
+    chain_search = MeetingChain.build(search.columns)
+    chain = chain_search.find(person_ids[0], person_ids[1])
+    if chain is None:
+        print("There is no chain of people who could meet between", first_name, "and", second_name)
+        return
+
+    print(len(chain) - 1, "hops from", first_name, "to", second_name)
+    name, birth, death = search.person(chain[0])
+    print(name, birth.replace("None.None.", ""), "-", death.replace("None.None.", ""))
+    for first, second, days in chain_search.hops(chain):
+        name, birth, death = search.person(second)
+        print(" -> %s %s - %s (met for %.1f years)" % (name, birth.replace("None.None.", ""),
+                                                     death.replace("None.None.", ""), days / 365.2425))
+
+def answer_pairs(pairs_path, output_path, backend, index_path, cache_path):
+    cache = None
+    if backend == "local":
+        search = LocalSearch.open(index_path)
+    else:
+        cache = LookupCache(path=cache_path)
+        search = ExportSearch("people", cache=cache)
+
+    PairBatch(search).run(pairs_path, output_path)
+
+    if cache is not None:
+        cache.save()
+        print(cache.report())
+
+def group_overlaps(names_path, output_path, backend, index_path, cache_path, limit):
+    cache = None
+    if backend == "local":
+        search = LocalSearch.open(index_path)
+    else:
+        cache = LookupCache(path=cache_path)
+        search = ExportSearch("people", cache=cache)
+
+    group = GroupOverlaps(search)
+    group.resolve(group.read_names(names_path))
+    for name in group.unknown_names:
+        print("There is no person with name", name)
+
+    first, second, days = group.pairs()
+    print(len(first), "pairs of", len(group.names), "people could meet.")
+
+    if output_path is not None:
+        group.save(output_path, first, second, days)
+        print("Overlap matrix saved to", output_path)
+    else:
+        # The longest overlaps first
+        for i in np.argsort(-days, kind="stable")[:limit]:
+            print(" - %s and %s (%.1f years)" % (group.names[first[i]], group.names[second[i]], days[i] / 365.2425))
+
+    if cache is not None:
+        cache.save()
+        print(cache.report())
+
+def run_service(host, port, backend, index_path, cache_path):
+    if backend == "local":
+        search = LocalSearch.open(index_path)
+    else:
+        search = ExportSearch("people", cache=LookupCache(path=cache_path))
+
+    QueryService(search).serve(host, port)
+
+def run_indexer(file, bulk_size, threads):
+    if file is None:
+        file = "../data/whole_wiki_parsed.txt"
     search = ExportSearch("people")
     search.prepare_elasticsearch()
-    search.insert_data(file, bulk_size)
+    search.insert_data(file, bulk_size, threads)
     print("Indexing is complete.")
 
-def search_person():
-    search = ExportSearch("people")
+def search_person(backend="elasticsearch", index_path=None, cache_path=None):
+    cache = None
+    if backend == "local":
+        # Local index, columnar export or text export, no Elasticsearch server is needed
+        search = LocalSearch.open(index_path)
+    else:
+        # Names resolved in previous sessions are not searched again
+        cache = LookupCache(path=cache_path)
+        search = ExportSearch("people", cache=cache)
 
     # To create index and build types
     #search.prepare_elasticsearch()
@@ -64,22 +194,131 @@ def search_person():
     else:
         print("These people could not meet!")
 
+    if cache is not None:
+        cache.save()
+        print(cache.report())
+
+def build_page_index(input_file, index_path):
+    start = time.perf_counter()
+    try:
+        index = PageIndex.build(input_file)
+    except ValueError as ex:
+        print(ex)
+        exit(1)
+    index.save(index_path)
+    print("Indexed", len(index), "pages in %.2f s." % (time.perf_counter() - start))
+    return index
+
+def show_page(input_file, index_path, title):
+    """
+    Prints page of given title and dates extracted from it, pages are read using page index, which is built
+    when it does not exist yet
+    """
+    index = PageIndex.load(index_path) if PageIndex.is_index(index_path) else build_page_index(input_file, index_path)
+    entry = index.entry(title)
+    if entry is None:
+        print("There is no page with this title.")
+        exit(1)
+
+    start = time.perf_counter()
+    try:
+        page = etree.fromstring(index.read_page(input_file, title))
+    except ValueError as ex:
+        print(ex)
+        exit(1)
+    text = page.findtext('{*}revision/{*}text') or ""
+    print(etree.tostring(page, encoding="unicode"))
+
+    reader = DumpReader(input_file, None, None, (False, ""), quiet=True)
+    entity = reader.extract_person(title, text)
+    elapsed = time.perf_counter() - start
+
+    print("Page", entry[2], "at offset", entry[0], "with", entry[1], "bytes.")
+    if entity is None:
+        reason = "dates were not found" if reader.stats.counters["dates_not_found"] else "age is not correct"
+        print("Person was not exported,", reason + ".")
+    else:
+        print("Exported:", entity["name"] + "," + entity["birth_date"].__repr__() + "," + entity["death_date"].__repr__())
+    for field, rules in reader.stats.to_dict()["rules"].items():
+        print("Matched", field, "rule:", ", ".join(rules))
+    print("Read and extracted in %.2f ms." % (elapsed * 1000))
+
+def split_dump(input_file, output_file, shards, size, threads):
+    if is_bz2_dump(input_file):
+        print("Dump must be unzipped to be split into shards. Compressed multistream dump can be parsed with --workers.")
+        exit(1)
+
+    start = time.perf_counter()
+    paths = MmapDumpSplitter(input_file, output_file, threads).split(shards, size)
+    elapsed = time.perf_counter() - start
+
+    total = sum(os.path.getsize(path) for path in paths)
+    print("Written", len(paths), "shards,", get_smart_file_size(total), "in %.2f s." % elapsed)
+    for path in paths:
+        print(path)
+
 def main(argv):
     # Options and their arguments
-    opts, args = getopt.getopt(sys.argv[1:], "", ["input=", "output=", "verbose", "splitter=", "search", "search-indexer", "bulk="])
+    opts, args = getopt.getopt(sys.argv[1:], "", ["input=", "output=", "verbose", "splitter=", "search", "search-indexer", "bulk=", "workers=", "index=", "resume", "incremental=", "binary-export=", "backend=", "overlaps=", "limit=", "chain=", "to=", "threads=", "cache=", "pairs=", "group=", "serve=", "host=", "stats=", "split-shards=", "split-every=", "page-index=", "show-page=", "pipeline=", "queue-depth="])
 
     output_file = None
     input_file = None
+    index_file = None
     verbose = False
     run_split = False
     split_size = 0
     search = False
     search_indexer = False
     bulk_size = 5000
+    threads = 4
+    cache_path = None
+    pairs = None
+    group = None
+    serve_port = None
+    host = "127.0.0.1"
+    stats_path = None
+    split_shards = None
+    split_every = None
+    page_index = None
+    show_title = None
+    workers = 1
+    pipeline_workers = 0
+    queue_depth = 8
+    resume = False
+    previous_export = None
+    binary_export = None
+    backend = "elasticsearch"
+    overlaps = None
+    chain = None
+    chain_to = None
+    limit = 20
 
     for o, a in opts:
         if o == "--verbose":
             verbose = True
+        elif o == "--resume":
+            resume = True
+        elif o == "--incremental":
+            previous_export = a
+        elif o == "--binary-export":
+            binary_export = a
+        elif o == "--backend":
+            if a not in ("elasticsearch", "local"):
+                print("Backend must be elasticsearch or local.")
+                exit(1)
+            backend = a
+        elif o == "--overlaps":
+            overlaps = a
+        elif o == "--chain":
+            chain = a
+        elif o == "--to":
+            chain_to = a
+        elif o == "--limit":
+            try:
+                limit = int(a)
+            except:
+                print("Limit is not in correct format.")
+                exit(1)
         elif o == "--search":
             search = True
         elif o == "--search-indexer":
@@ -88,12 +327,70 @@ def main(argv):
             output_file = a
         elif o == "--input":
             input_file = a
+        elif o == "--index":
+            index_file = a
         elif o == "--bulk":
             try:
                 bulk_size = int(a)
             except:
                 print("Bulk size is not in correct format.")
                 exit(1)
+        elif o == "--serve":
+            try:
+                serve_port = int(a)
+            except:
+                print("Port is not in correct format.")
+                exit(1)
+        elif o == "--host":
+            host = a
+        elif o == "--stats":
+            stats_path = a
+        elif o == "--group":
+            group = a
+        elif o == "--pairs":
+            pairs = a
+        elif o == "--cache":
+            cache_path = a
+        elif o == "--threads":
+            try:
+                threads = int(a)
+            except:
+                print("Number of threads is not in correct format.")
+                exit(1)
+        elif o == "--workers":
+            try:
+                workers = int(a)
+            except:
+                print("Number of workers is not in correct format.")
+                exit(1)
+        elif o == "--pipeline":
+            try:
+                pipeline_workers = int(a)
+            except:
+                print("Number of pipeline workers is not in correct format.")
+                exit(1)
+        elif o == "--queue-depth":
+            try:
+                queue_depth = int(a)
+            except:
+                print("Queue depth is not in correct format.")
+                exit(1)
+        elif o == "--page-index":
+            page_index = a
+        elif o == "--show-page":
+            show_title = a
+        elif o == "--split-shards":
+            try:
+                split_shards = int(a)
+            except:
+                print("Number of shards is not in correct format.")
+                exit(1)
+        elif o == "--split-every":
+            try:
+                split_every = int(a)
+            except:
+                print("Split size is not in correct format.")
+                exit(1)
         elif o == "--splitter":
             run_split = True
             try:
@@ -102,12 +399,72 @@ def main(argv):
                 print("Split size is not in correct format.")
                 exit(1)
 
+    if backend == "local" and (search or search_indexer) and input_file is None:
+        print("Local backend needs --input with index, binary export or text export.")
+        exit(1)
+
+    if page_index is not None:
+        if input_file is None:
+            print("Page index needs --input with unzipped dump.")
+            exit(1)
+        if show_title is None:
+            build_page_index(input_file, page_index)
+        else:
+            show_page(input_file, page_index, show_title)
+        exit(0)
+
+    if overlaps is not None:
+        if input_file is None:
+            print("Overlaps need --input with index, binary export or text export.")
+            exit(1)
+        print_overlaps(input_file, overlaps, limit)
+        exit(0)
+
+    if chain is not None:
+        if input_file is None or chain_to is None:
+            print("Chain needs --to with second name and --input with index, binary export or text export.")
+            exit(1)
+        print_chain(input_file, chain, chain_to)
+        exit(0)
+
+    if serve_port is not None:
+        if backend == "local" and input_file is None:
+            print("Local backend needs --input with index, binary export or text export.")
+            exit(1)
+        run_service(host, serve_port, backend, input_file, cache_path)
+        exit(0)
+
+    if group is not None:
+        if backend == "local" and input_file is None:
+            print("Local backend needs --input with index, binary export or text export.")
+            exit(1)
+        group_overlaps(group, output_file, backend, input_file, cache_path, limit)
+        exit(0)
+
+    if pairs is not None:
+        if output_file is None or (backend == "local" and input_file is None):
+            print("Pairs need --output and local backend needs --input with index, binary export or text export.")
+            exit(1)
+        answer_pairs(pairs, output_file, backend, input_file, cache_path)
+        exit(0)
+
     if search:
-        search_person()
+        search_person(backend, input_file, cache_path)
         exit(0)
 
     if search_indexer:
-        run_indexer(input_file,bulk_size)
+        if backend == "local":
+            if output_file is None:
+                print("Local indexer needs --output directory.")
+                exit(1)
+            run_local_indexer(input_file, output_file)
+        else:
+            run_indexer(input_file, bulk_size, threads)
+        exit(0)
+
+    # Only convert existing text export into binary columnar export
+    if binary_export is not None and input_file is not None and output_file is None:
+        export_binary(input_file, binary_export)
         exit(0)
 
     # If running from PyCharm
@@ -122,25 +479,57 @@ def main(argv):
             print("No input and output files were provided. Fallback /data/ folder did not find any files. Interrupting...")
             exit(1)
 
+    if split_shards is not None or split_every is not None:
+        split_dump(input_file, output_file, split_shards, split_every, threads)
+        exit(0)
+
     # RUN_SPLIT for PyCharm development and run_split if called from console
     if Constants.RUN_SPLIT or run_split:
         if split_size == 0:
             # If PyCharm is currently running app, use Constants
             split_size = Constants.SPLIT_SIZE
 
-        if verbose:
-            print("Sorry, splitter is not able to track progress currently.")
-
-        splitter = MediaWikiDumpSplitter(input_file, output_file, split_size)
+        splitter = MediaWikiDumpSplitter(input_file, output_file, split_size, index_file, verbose)
         print("Splitter started export. Goal size is", get_smart_file_size(split_size))
         splitter.export_chunk()
         exit(0)
 
-    with open(input_file, 'rb') as in_xml:
-        for record in DumpReader(input_file, in_xml, None, (True, output_file), verbose):
+    if workers > 1:
+        if resume or previous_export:
+            print("Resume and incremental export are not supported with multiple workers.")
+            exit(1)
+
+        sharder = MediaWikiDumpSharder(input_file, output_file, workers, verbose, index_file)
+        sharder.run()
+        if stats_path is not None:
+            sharder.stats.save(stats_path)
+        if binary_export is not None:
+            export_binary(output_file, binary_export)
+        exit(0)
+
+    # Multistream bz2 dump is decompressed in parallel by all available cores
+    previous_revisions = None
+    if previous_export is not None:
+        previous_revisions = RevisionTable.path_for(previous_export)
+        if not os.path.exists(previous_revisions):
+            print("Previous export does not have revision side table", previous_revisions)
+            exit(1)
+
+    stats = ParserStats()
+    with open_dump(input_file, index_file, os.cpu_count()) as in_xml:
+        checkpoint = ParseCheckpoint.default_path(output_file)
+        for record in DumpReader(input_file, in_xml, None, (True, output_file), verbose, checkpoint=checkpoint,
+                                 resume=resume, previous_revisions=previous_revisions, stats=stats,
+                                 pipeline_workers=pipeline_workers, queue_depth=queue_depth):
             #print("record:{}".format(record))
             pass
 
+    if stats_path is not None:
+        stats.save(stats_path)
+
+    if binary_export is not None:
+        export_binary(output_file, binary_export)
+
 if __name__ == "__main__":
     signal.signal(signal.SIGINT, signal_handler)
     main(sys.argv[1:])
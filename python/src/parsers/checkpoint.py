@@ -0,0 +1,75 @@
+import json
+import os
+
+
+class ParseCheckpoint:
+
+    def __init__(self, path):
+        """
+        Checkpoint of a long dump parse. It stores input byte offset of the first page which was not
+        processed yet, id of the last processed page and sizes of export and its revision side table
+        written up to that page
+
+        :param path: String path to checkpoint file, usually export path with .checkpoint suffix
+        """
+        self.path = path
+
+    @staticmethod
+    def default_path(export_path):
+        return export_path + ".checkpoint"
+
+    def save(self, input_path, input_offset, last_page_id, export_position, pages_read, revisions_position=0):
+        state = {
+            "input_path": os.path.abspath(input_path),
+            "input_offset": input_offset,
+            "last_page_id": last_page_id,
+            "export_position": export_position,
+            "revisions_position": revisions_position,
+            "pages_read": pages_read
+        }
+
+        # Write whole checkpoint aside and replace the old one, so a crash never leaves broken checkpoint
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+
+    def load(self, input_path):
+        """
+        :return: Dictionary with checkpoint state or None when there is no checkpoint
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, encoding="utf-8") as file:
+            state = json.load(file)
+
+        if state["input_path"] != os.path.abspath(input_path):
+            raise ValueError("Checkpoint {0} was created for different input {1}.".format(self.path, state["input_path"]))
+
+        return state
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def skip_bytes(stream, count, block_size=1 << 20):
+    """
+    Moves stream forward by count bytes. Seekable files are seeked, other streams are read and discarded
+    """
+    if count <= 0:
+        return
+
+    seekable = getattr(stream, "seekable", None)
+    if seekable is not None and seekable():
+        stream.seek(count, os.SEEK_CUR)
+        return
+
+    while count > 0:
+        block = stream.read(min(block_size, count))
+        if not block:
+            break
+        count -= len(block)
@@ -0,0 +1,96 @@
+import re
+
+
+# Start of infobox template, e.g. "{{infobox person" or "{{ infobox_royalty". Reader passes lowercased text
+INFOBOX_START = re.compile(r"\{\{\s*infobox[\s_|}]")
+
+# Tokens changing nesting of a template or separating its fields
+TEMPLATE_TOKEN = re.compile(r"\{\{|\}\}|\[\[|\]\]|\||<!--")
+
+COMMENT = re.compile(r"<!--.*?(?:-->|$)", re.S)
+SECTION_HEADING = re.compile(r"^==", re.M)
+
+
+def field_name(name):
+    """
+    Normalizes name of template field, so "birth_date" and " birth  date " are the same key
+    """
+    return " ".join(name.replace("_", " ").split())
+
+
+def _add_field(fields, text, start, end):
+    name, separator, value = text[start:end].partition("=")
+    # Positional parameters have no name
+    if not separator:
+        return
+    if "<!--" in value:
+        value = COMMENT.sub("", value)
+    fields.setdefault(field_name(name), value.strip())
+
+
+def template_fields(text, start):
+    """
+    Splits template into named fields in one pass. Only tokens are visited, braces of nested templates and
+    brackets of links are balanced, so "|" inside them does not end a field, and comments are skipped
+
+    :param text: Wikitext
+    :param start: Position of "{{" opening the template
+    :return: Dictionary of field name and raw value. Unclosed template ends with the text
+    """
+    fields = {}
+    depth = 0
+    links = 0
+    field_start = None
+    position = start
+
+    while True:
+        match = TEMPLATE_TOKEN.search(text, position)
+        if match is None:
+            if field_start is not None:
+                _add_field(fields, text, field_start, len(text))
+            return fields
+
+        token = match.group()
+        position = match.end()
+        if token == "{{":
+            depth += 1
+        elif token == "}}":
+            depth -= 1
+            if depth == 0:
+                if field_start is not None:
+                    _add_field(fields, text, field_start, match.start())
+                return fields
+        elif token == "[[":
+            links += 1
+        elif token == "]]":
+            links = max(0, links - 1)
+        elif token == "<!--":
+            close = text.find("-->", position)
+            position = len(text) if close == -1 else close + 3
+        elif depth == 1 and links == 0:
+            if field_start is not None:
+                _add_field(fields, text, field_start, match.start())
+            field_start = position
+
+
+def infobox_fields(text):
+    """
+    Fields of all infoboxes of page, including infoboxes nested in a field of another one,
+    e.g. "| module = {{infobox military person ...}}"
+
+    :param text: Lowercased wikitext of page
+    :return: Dictionary of field name and raw value. When more infoboxes have the same field, the first one is kept
+    """
+    fields = {}
+    for match in INFOBOX_START.finditer(text):
+        for name, value in template_fields(text, match.start()).items():
+            fields.setdefault(name, value)
+    return fields
+
+
+def lead_section(text):
+    """
+    :return: Text before the first section heading with whitespace collapsed to single spaces
+    """
+    heading = SECTION_HEADING.search(text)
+    return " ".join((text if heading is None else text[:heading.start()]).split())
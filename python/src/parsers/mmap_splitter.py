@@ -0,0 +1,118 @@
+from multiprocessing.pool import ThreadPool
+import mmap
+import os
+
+
+PAGE_START = b"<page>"
+PAGE_END = b"</page>"
+COPY_BLOCK_SIZE = 64 << 20
+
+
+class MmapDumpSplitter:
+
+    def __init__(self, file_in, file_out, threads=4):
+        """
+        Splits uncompressed dump into well-formed shards without parsing xml. Input is memory-mapped, shard
+        boundaries are found by searching raw bytes for <page> and </page> and shards are copied from the map
+        in parallel threads. Every shard starts with the header of the dump (everything before the first page,
+        e.g. <mediawiki> with <siteinfo>) and ends with its tail, so it can be parsed by the reader on its own
+
+        :param file_in: String path to unzipped xml dump
+        :param file_out: String path of output, shards are named path.0000.xml, path.0001.xml, ...
+        :param threads: Number of shards written at once
+        """
+        self.file_in = file_in
+        self.file_out = file_out
+        self.threads = threads
+
+    def shard_path(self, shard_index):
+        base, extension = os.path.splitext(self.file_out)
+        return "{0}.{1:04d}{2}".format(base, shard_index, extension or ".xml")
+
+    @staticmethod
+    def page_span(view):
+        """
+        :return: Tuple of offset of the first <page> and offset after the last </page>, None for dump without pages
+        """
+        first_page = view.find(PAGE_START)
+        last_page_end = view.rfind(PAGE_END)
+        if first_page == -1 or last_page_end < first_page:
+            return None
+        return first_page, last_page_end + len(PAGE_END)
+
+    @classmethod
+    def ranges_by_count(cls, view, parts):
+        """
+        Byte ranges of parts shards of similar size, aligned on <page> boundaries. Less ranges are returned
+        when dump has less pages than parts
+        """
+        span = cls.page_span(view)
+        if span is None:
+            return []
+
+        first_page, last_page_end = span
+        starts = [first_page]
+        for i in range(1, parts):
+            start = view.find(PAGE_START, first_page + (last_page_end - first_page) * i // parts, last_page_end)
+            if start > starts[-1]:
+                starts.append(start)
+
+        return list(zip(starts, starts[1:] + [last_page_end]))
+
+    @classmethod
+    def ranges_by_size(cls, view, size):
+        """
+        Byte ranges of consecutive shards of at most size bytes of pages. Page larger than size has its own shard
+        """
+        span = cls.page_span(view)
+        if span is None:
+            return []
+
+        first_page, last_page_end = span
+        ranges = []
+        start = first_page
+        while start < last_page_end:
+            end = view.rfind(PAGE_END, start, min(start + size, last_page_end))
+            if end == -1:
+                end = view.find(PAGE_END, start, last_page_end)
+            end += len(PAGE_END)
+            ranges.append((start, end))
+
+            start = view.find(PAGE_START, end, last_page_end)
+            if start == -1:
+                break
+
+        return ranges
+
+    def split(self, parts=None, size=None):
+        """
+        Writes parts shards of similar size or consecutive shards of at most size bytes
+
+        :return: List of paths of written shards
+        """
+        with open(self.file_in, "rb") as dump:
+            if os.fstat(dump.fileno()).st_size == 0:
+                return []
+
+            with mmap.mmap(dump.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                ranges = self.ranges_by_count(view, parts) if parts is not None else self.ranges_by_size(view, size)
+                if not ranges:
+                    return []
+
+                header = view[:ranges[0][0]]
+                tail = view[ranges[-1][1]:]
+                tasks = [(self.shard_path(i), start, end) for i, (start, end) in enumerate(ranges)]
+
+                with ThreadPool(max(1, min(self.threads, len(tasks)))) as pool:
+                    pool.starmap(lambda path, start, end: self.write_shard(view, path, header, start, end, tail), tasks)
+
+        return [path for path, _, _ in tasks]
+
+    @staticmethod
+    def write_shard(view, path, header, start, end, tail):
+        # Slices of memoryview are not copied and writing them releases GIL, so threads write in parallel
+        with open(path, "wb") as shard, memoryview(view) as data:
+            shard.write(header)
+            for block_start in range(start, end, COPY_BLOCK_SIZE):
+                shard.write(data[block_start:min(end, block_start + COPY_BLOCK_SIZE)])
+            shard.write(tail)
@@ -0,0 +1,233 @@
+from collections import deque
+from multiprocessing import Pool
+import bz2
+import os
+
+
+MULTISTREAM_DUMP_SUFFIX = ".xml.bz2"
+MULTISTREAM_INDEX_SUFFIX = "-index.txt.bz2"
+
+
+def is_bz2_dump(file_path):
+    return file_path.endswith(".bz2")
+
+
+def default_index_path(file_path):
+    """
+    Finds index of multistream dump using wikipedia naming, e.g. for
+    enwiki-latest-pages-articles-multistream.xml.bz2 it is enwiki-latest-pages-articles-multistream-index.txt.bz2
+
+    :return: Path to index or None when index does not exist
+    """
+    if not file_path.endswith(MULTISTREAM_DUMP_SUFFIX):
+        return None
+
+    index_path = file_path[:-len(MULTISTREAM_DUMP_SUFFIX)] + MULTISTREAM_INDEX_SUFFIX
+    if os.path.exists(index_path):
+        return index_path
+    return None
+
+
+def read_stream_offsets(index_path):
+    """
+    Reads offsets of bz2 streams from multistream index. Every line of index is "offset:page_id:title"
+    and all pages of one stream share the same offset
+
+    :param index_path: Path to index file, either bz2 compressed or plain text
+    :return: Sorted list of unique stream offsets
+    """
+    opener = bz2.open if is_bz2_dump(index_path) else open
+    offsets = []
+    with opener(index_path, "rb") as index:
+        for line in index:
+            offset = int(line.split(b":", 1)[0])
+            if not offsets or offsets[-1] != offset:
+                offsets.append(offset)
+
+    return sorted(set(offsets))
+
+
+def page_stream_ranges(file_path, index_path):
+    """
+    :return: List of (start, end) compressed byte ranges of streams containing pages. The last range
+             reaches end of file, so it may also contain the stream closing </mediawiki>
+    """
+    offsets = read_stream_offsets(index_path)
+    ends = offsets[1:] + [os.path.getsize(file_path)]
+    return list(zip(offsets, ends))
+
+
+def _decompress_range(args):
+    """
+    Worker process entry. Decompresses one compressed byte range of dump
+
+    :param args: Tuple of file path, start, end and flag telling whether only the first bz2 stream of the
+                 range should be decompressed
+    """
+    file_path, start, end, first_stream_only = args
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    if first_stream_only:
+        return bz2.BZ2Decompressor().decompress(data)
+    return bz2.decompress(data)
+
+
+class MultistreamDumpStream:
+
+    def __init__(self, file_path, ranges, workers=0, prefix=b"", suffix=b"", first_stream_only=False, prefetch=2):
+        """
+        File-like object reading bz2 multistream dump. Independent streams are decompressed in parallel
+        by a process pool and returned in stream order, so nothing is decompressed to disk
+
+        :param file_path: String path to pages-articles-multistream.xml.bz2
+        :param ranges: List of (start, end) compressed byte ranges to read, in order
+        :param workers: Number of decompression processes. With less than 2 workers ranges are
+                        decompressed in current process
+        :param prefix: Bytes returned before decompressed data
+        :param suffix: Bytes returned after decompressed data
+        :param first_stream_only: Decompress only the first bz2 stream of every range
+        :param prefetch: Number of ranges decompressed ahead per worker. Bounds memory use when
+                         parser is slower than decompression
+        """
+        self.file_path = file_path
+        self._tasks = deque((file_path, start, end, first_stream_only) for start, end in ranges)
+        self._pool = Pool(workers) if workers > 1 else None
+        self._window = max(1, workers * prefetch)
+        self._pending = deque()
+        self._buffer = prefix
+        self._buffer_position = 0
+        self._suffix = suffix
+        self._position = ranges[0][0] if ranges else 0
+
+    @classmethod
+    def open_dump(cls, file_path, index_path=None, workers=0):
+        """
+        Opens whole multistream dump as one xml document, including siteinfo header
+        """
+        ranges = page_stream_ranges(file_path, index_path)
+        if ranges and ranges[0][0] > 0:
+            ranges.insert(0, (0, ranges[0][0]))
+        return cls(file_path, ranges, workers)
+
+    def _fill_window(self):
+        while self._tasks and len(self._pending) < self._window:
+            task = self._tasks.popleft()
+            if self._pool is None:
+                self._pending.append((task, None))
+            else:
+                self._pending.append((task, self._pool.apply_async(_decompress_range, (task,))))
+
+    def _next_chunk(self):
+        self._fill_window()
+        if not self._pending:
+            data, self._suffix = self._suffix, b""
+            return data
+
+        task, result = self._pending.popleft()
+        self._position = task[1]
+        data = _decompress_range(task) if result is None else result.get()
+        self._fill_window()
+        return data
+
+    def read(self, size=-1):
+        chunks = []
+        remaining = size if size is not None and size >= 0 else None
+
+        while remaining is None or remaining > 0:
+            if self._buffer_position >= len(self._buffer):
+                self._buffer = self._next_chunk()
+                self._buffer_position = 0
+                if not self._buffer:
+                    break
+
+            end = len(self._buffer) if remaining is None else min(len(self._buffer), self._buffer_position + remaining)
+            chunks.append(self._buffer[self._buffer_position:end])
+            if remaining is not None:
+                remaining -= end - self._buffer_position
+            self._buffer_position = end
+
+        return b"".join(chunks)
+
+    def tell(self):
+        """
+        :return: Compressed offset of the stream currently being read
+        """
+        return self._position
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        self._pending.clear()
+        self._tasks.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SerialBz2Stream(bz2.BZ2File):
+
+    def __init__(self, file_path):
+        """
+        bz2 dump without index, decompressed serially. Compressed file is kept, so progress can be reported
+        against size of the dump
+
+        :param file_path: String path to bz2 dump
+        """
+        self.compressed_file = open(file_path, "rb")
+        super().__init__(self.compressed_file, "rb")
+
+    def compressed_position(self):
+        return self.compressed_file.tell()
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.compressed_file.close()
+
+
+def open_dump(file_path, index_path=None, workers=0):
+    """
+    Opens dump for reading. Plain xml is opened as a file, bz2 multistream dump with index is decompressed
+    in parallel and bz2 dump without index is decompressed serially
+
+    :param file_path: String path to xml or bz2 dump
+    :param index_path: Path to multistream index. Found next to the dump if not provided
+    :param workers: Number of decompression processes for multistream dump
+    """
+    if not is_bz2_dump(file_path):
+        return open(file_path, "rb")
+
+    if index_path is None:
+        index_path = default_index_path(file_path)
+
+    if index_path is None:
+        print("Multistream index was not found, bz2 dump will be decompressed serially.")
+        return SerialBz2Stream(file_path)
+
+    return MultistreamDumpStream.open_dump(file_path, index_path, workers)
+
+
+def input_position(stream):
+    """
+    Position of stream in the dump file, used to report progress against size of the file
+
+    :return: Compressed offset for bz2 dumps, offset in file for xml dumps, None when stream can not tell it
+    """
+    if isinstance(stream, SerialBz2Stream):
+        # Decompressed position of serially read bz2 dump would overrun size of the file
+        return stream.compressed_position()
+
+    tell = getattr(stream, "tell", None)
+    if tell is None:
+        return None
+    try:
+        return tell()
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,126 @@
+from parsers.page_scanner import RawPageScanner
+from parsers.multistream import is_bz2_dump
+from utilities.string_table import StringTable, SortedView
+import numpy as np
+import html
+import json
+import mmap
+import os
+import re
+
+
+TITLE_REGEX = re.compile(rb"<title>(.*?)</title>", re.S)
+ID_REGEX = re.compile(rb"<id>(\d+)</id>")
+
+
+class PageIndex:
+
+    def __init__(self, titles, title_order, offsets, lengths, page_ids, dump_size):
+        """
+        Index of pages of uncompressed dump for random access by title. Titles, byte offsets, lengths and ids
+        of pages are stored in dump order in StringTable and numpy arrays, title_order permutation sorts them
+        by title for binary search. Everything is memory-mapped when index is loaded
+
+        :param titles: StringTable of page titles in dump order
+        :param title_order: numpy array of indices into titles sorted by title
+        :param offsets: numpy int64 array of offsets of <page> in dump
+        :param lengths: numpy int64 array of lengths of pages in bytes, including </page>
+        :param page_ids: numpy int64 array of page ids
+        :param dump_size: Size of indexed dump, used to detect that index does not belong to the dump
+        """
+        self.titles = titles
+        self.title_order = title_order
+        self.offsets = offsets
+        self.lengths = lengths
+        self.page_ids = page_ids
+        self.dump_size = dump_size
+        self._titles_view = SortedView(titles, title_order)
+
+    def __len__(self):
+        return len(self.titles)
+
+    @classmethod
+    def build(cls, dump_path):
+        """
+        Scans raw bytes of dump, pages are not parsed by lxml
+        """
+        if is_bz2_dump(dump_path):
+            raise ValueError("Page index needs unzipped dump, pages of bz2 dump can not be read at random.")
+
+        titles, offsets, lengths, page_ids = [], [], [], []
+        with open(dump_path, "rb") as dump:
+            for offset, page in RawPageScanner(dump):
+                title = TITLE_REGEX.search(page)
+                page_id = ID_REGEX.search(page)
+                titles.append(html.unescape(title[1].decode("utf-8")) if title else "")
+                offsets.append(offset)
+                lengths.append(len(page))
+                page_ids.append(int(page_id[1]) if page_id else -1)
+
+        title_order = np.array(sorted(range(len(titles)), key=titles.__getitem__), dtype=np.int64)
+        return cls(StringTable.from_strings(titles), title_order, np.array(offsets, dtype=np.int64),
+                   np.array(lengths, dtype=np.int64), np.array(page_ids, dtype=np.int64), os.path.getsize(dump_path))
+
+    @staticmethod
+    def is_index(path):
+        return os.path.isdir(path) and os.path.exists(os.path.join(path, "page_index.json"))
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.titles.save(directory, "titles")
+        for column in ("title_order", "offsets", "lengths", "page_ids"):
+            np.save(os.path.join(directory, column + ".npy"), getattr(self, column))
+
+        with open(os.path.join(directory, "page_index.json"), "w", encoding="utf-8") as meta:
+            json.dump({"pages": len(self), "dump_size": self.dump_size}, meta)
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, "page_index.json"), encoding="utf-8") as meta:
+            dump_size = json.load(meta)["dump_size"]
+
+        columns = [np.load(os.path.join(directory, column + ".npy"), mmap_mode="r")
+                   for column in ("title_order", "offsets", "lengths", "page_ids")]
+        return cls(StringTable.load(directory, "titles"), *columns, dump_size)
+
+    def find(self, title):
+        """
+        :return: Position of page in dump order or None when there is no page with the title
+        """
+        lo, hi = self._titles_view.equal_range(title)
+        return int(self.title_order[lo]) if lo < hi else None
+
+    def entry(self, title):
+        """
+        :return: Tuple of byte offset, length and page id or None
+        """
+        i = self.find(title)
+        if i is None:
+            return None
+        return int(self.offsets[i]), int(self.lengths[i]), int(self.page_ids[i])
+
+    def pages(self, dump_path, titles):
+        """
+        Reads pages of given titles from memory-mapped dump in dump order, titles without page are skipped
+
+        :return: Generator of (title, raw bytes of <page> element) tuples
+        """
+        if os.path.getsize(dump_path) != self.dump_size:
+            raise ValueError("Page index was built for another dump.")
+
+        positions = sorted({i for i in map(self.find, titles) if i is not None})
+        if not positions:
+            return
+
+        with open(dump_path, "rb") as dump, mmap.mmap(dump.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            for i in positions:
+                offset = int(self.offsets[i])
+                yield self.titles[i], view[offset:offset + int(self.lengths[i])]
+
+    def read_page(self, dump_path, title):
+        """
+        :return: Raw bytes of <page> element or None
+        """
+        for _, page in self.pages(dump_path, [title]):
+            return page
+        return None
@@ -0,0 +1,102 @@
+import re
+
+
+PAGE_START = b"<page>"
+PAGE_END = b"</page>"
+
+# Categories used to recognize a person. Shared by byte pre-filter and reader's check on wikitext
+PERSON_CATEGORY_PATTERN = r"\[\[Category:.*?(births|actors|actor|painters|citizens|painter|lutherans|woman|women|singers|singer|politician|deaths|photographers|artists|wrestlers|emigrants|[pP]hysicists|theorists|recipients).*?\]\]"
+
+
+class RawPageScanner:
+
+    def __init__(self, stream, block_size=1 << 20, start_offset=0):
+        """
+        Cuts raw bytes of dump into <page> elements without parsing xml
+
+        :param stream: Any object with read(size) returning bytes, e.g. open() stream or MultistreamDumpStream
+        :param block_size: Number of bytes read from stream at once
+        :param start_offset: Offset of current stream position in dump, used when parsing is resumed
+        """
+        self.stream = stream
+        self.block_size = block_size
+        self.offset = start_offset
+
+    def __iter__(self):
+        """
+        :return: Generator of (offset, bytes) tuples, where offset is position of <page> in stream
+        """
+        buffer = b""
+        buffer_offset = self.offset
+        position = 0
+        eof = False
+
+        while True:
+            start = buffer.find(PAGE_START, position)
+            end = -1 if start == -1 else buffer.find(PAGE_END, start)
+
+            if end == -1:
+                if eof:
+                    break
+
+                # Keep only unfinished page (or a possibly cut "<page>" tag) and read more data
+                keep_from = start if start != -1 else max(position, len(buffer) - len(PAGE_START) + 1)
+                buffer_offset += keep_from
+                buffer = buffer[keep_from:]
+                position = 0
+
+                block = self.stream.read(self.block_size)
+                if not block:
+                    eof = True
+                buffer += block
+                continue
+
+            end += len(PAGE_END)
+            self.offset = buffer_offset + end
+            yield buffer_offset + start, buffer[start:end]
+            position = end
+
+
+class PagePrefilter:
+
+    def __init__(self):
+        """
+        Rejects raw pages that can not be exported before they are parsed by lxml. Page passes only when it
+        is in article namespace, is not a redirect and contains a person category marker. Infobox keys are
+        not required, because dates of persons without infobox are found in text
+        """
+        self.person_pattern = re.compile(PERSON_CATEGORY_PATTERN.encode())
+        self.pages_seen = 0
+        self.pages_rejected = 0
+        # Why the last page was rejected, named like skip counters of MediaWikiDumpReader
+        self.last_reason = None
+
+    def accept(self, page):
+        """
+        :param page: Raw bytes of <page> element
+        :return: True if page should be handed to full extraction, otherwise reason is in last_reason
+        """
+        self.pages_seen += 1
+        self.last_reason = None
+
+        namespace = page.find(b"<ns>")
+        if namespace != -1 and not page.startswith(b"<ns>0</ns>", namespace):
+            self.last_reason = "other_namespace"
+        elif b"<redirect" in page:
+            self.last_reason = "redirects"
+        elif not self.person_pattern.search(page):
+            self.last_reason = "non_persons"
+        else:
+            return True
+
+        self.pages_rejected += 1
+        return False
+
+    def rejection_rate(self):
+        if self.pages_seen == 0:
+            return 0.0
+        return self.pages_rejected / self.pages_seen
+
+    def report(self):
+        return "Pre-filter rejected {0} of {1} pages ({2:.2f}%).".format(
+            self.pages_rejected, self.pages_seen, self.rejection_rate() * 100)
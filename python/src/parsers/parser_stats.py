@@ -0,0 +1,122 @@
+from collections import defaultdict
+import json
+import threading
+import time
+
+
+class ParserStats:
+
+    # Stages of page processing in the order they run
+    STAGES = ("scan", "lxml", "category", "infobox", "birth_date", "death_date", "fulltext", "write")
+
+    def __init__(self):
+        """
+        Counters and cumulative stage timers of MediaWikiDumpReader. Stage time is measured as time since the end
+        of previous stage, so one page needs only one clock read per stage, and counters are plain dictionary
+        increments. Stats of sharded parsing are merged from dictionaries returned by workers. Updates are
+        guarded by a lock, because stages of ExtractionPipeline update the same stats from different threads
+        """
+        self.lock = threading.Lock()
+        self.counters = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self.rules = defaultdict(int)
+        self.start_time = time.perf_counter()
+        self.last_summary = self.start_time
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def add_time(self, stage, started):
+        """
+        Adds time since started to stage
+
+        :return: Current time, which is start of the next stage
+        """
+        now = time.perf_counter()
+        with self.lock:
+            self.seconds[stage] += now - started
+        return now
+
+    def rule(self, field, name):
+        """
+        Counts extractor rule which matched date of field ("birth", "death" or "fulltext")
+        """
+        with self.lock:
+            self.rules[field + ":" + str(name)] += 1
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def merge(self, stats):
+        """
+        Adds stats of a shard
+
+        :param stats: Dictionary returned by to_dict
+        """
+        with self.lock:
+            for name, value in stats["counters"].items():
+                self.counters[name] += value
+            for stage, seconds in stats["seconds"].items():
+                self.seconds[stage] += seconds
+            for field, rules in stats["rules"].items():
+                for name, count in rules.items():
+                    self.rules[field + ":" + name] += count
+
+    def snapshot(self):
+        """
+        :return: Copies of counters, stage seconds and rules taken at once
+        """
+        with self.lock:
+            return defaultdict(int, self.counters), dict(self.seconds), dict(self.rules)
+
+    def to_dict(self):
+        counters, seconds, rule_counts = self.snapshot()
+        rules = defaultdict(dict)
+        for key, count in sorted(rule_counts.items()):
+            field, _, name = key.partition(":")
+            rules[field][name] = count
+
+        elapsed = self.elapsed()
+        measured = sum(seconds.values())
+        stages = self.stages(seconds)
+        return {
+            "elapsed_seconds": elapsed,
+            "pages_per_second": counters["pages_seen"] / elapsed if elapsed > 0 else 0.0,
+            "counters": dict(counters),
+            "seconds": {stage: seconds[stage] for stage in stages},
+            "stage_shares": {stage: seconds[stage] / measured if measured else 0.0 for stage in stages},
+            "rules": dict(rules)
+        }
+
+    def stages(self, seconds=None):
+        seconds = self.seconds if seconds is None else seconds
+        return [stage for stage in self.STAGES if stage in seconds] + \
+               sorted(stage for stage in seconds if stage not in self.STAGES)
+
+    def summary(self):
+        """
+        :return: One line with throughput and the slowest stages
+        """
+        counters, seconds, _ = self.snapshot()
+        elapsed = self.elapsed()
+        measured = sum(seconds.values())
+        slowest = sorted(seconds.items(), key=lambda item: -item[1])[:3]
+        stages = ", ".join("{0} {1:.0f}%".format(stage, stage_seconds / measured * 100) for stage, stage_seconds in slowest) if measured else "-"
+        return "{0} pages ({1:.0f} pages/s), {2} persons, {3} errors recovered, time in {4}".format(
+            counters["pages_seen"], counters["pages_seen"] / elapsed if elapsed > 0 else 0,
+            counters["persons_exported"], counters["errors_recovered"], stages)
+
+    def periodic_summary(self, interval):
+        """
+        :return: Summary when at least interval seconds passed since the last one, otherwise None
+        """
+        now = time.perf_counter()
+        if now - self.last_summary < interval:
+            return None
+        self.last_summary = now
+        return self.summary()
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as stats_file:
+            json.dump(self.to_dict(), stats_file, indent=2)
@@ -0,0 +1,212 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from parsers.parser_stats import ParserStats
+from utilities.runtime_constants import RuntimeConstants as Constants
+import queue
+import signal
+import threading
+import time
+
+
+BATCH_SIZE = 64
+PUT_TIMEOUT = 0.1
+
+# Marks the end of a queue
+_DONE = None
+
+# Reader of worker process, created once by _init_worker
+_worker_reader = None
+
+
+class PipelineStopped(Exception):
+    pass
+
+
+def _init_worker(file_path):
+    global _worker_reader
+    # Only parent handles interrupts and saves the checkpoint
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Imported here, reader module imports this one
+    from parsers.wiki_reader import MediaWikiDumpReader
+    _worker_reader = MediaWikiDumpReader(file_path, None, None, (False, ""), quiet=True)
+
+
+def _worker_ready():
+    return True
+
+
+def _process_batch(items):
+    """
+    Worker process entry. Extracts dates from a batch of page items
+
+    :return: Tuple of list of (record, entity) tuples and stats of the batch
+    """
+    _worker_reader.stats = ParserStats()
+    results = [_worker_reader.process_item(item) for item in items]
+    return results, _worker_reader.stats.to_dict()
+
+
+class ExtractionPipeline:
+
+    def __init__(self, reader, workers, queue_depth=8, batch_size=BATCH_SIZE):
+        """
+        Runs MediaWikiDumpReader in three stages connected by bounded queues. Parser thread scans and parses
+        pages and groups person pages into batches, process pool extracts dates from batches and writer thread
+        writes records of finished batches and saves checkpoints. Batches are finished in dump order, so export
+        is the same as of sequential reading. Full queue blocks the previous stage, so memory is bounded by
+        queue_depth batches in every stage regardless of size of the dump
+
+        :param reader: MediaWikiDumpReader with opened export
+        :param workers: Number of extraction processes
+        :param queue_depth: Number of batches waiting in every queue and extracted at once
+        :param batch_size: Number of person pages in a batch
+        """
+        self.reader = reader
+        self.workers = workers
+        self.queue_depth = max(1, queue_depth)
+        self.batch_size = batch_size
+        self.pages = queue.Queue(self.queue_depth)
+        self.records = queue.Queue(self.queue_depth)
+        self.stop = threading.Event()
+        self.writer_error = None
+        self.written_state = None
+
+    def _put(self, target, item, consumer=None):
+        """
+        Puts item into bounded queue. Gives up when pipeline is stopped or, when consumer thread is given,
+        only when the consumer died, so everything handed to writer is written. Error of dead writer is raised
+        instead of PipelineStopped, so it reaches reader of the pipeline
+        """
+        while True:
+            try:
+                target.put(item, timeout=PUT_TIMEOUT)
+                return
+            except queue.Full:
+                if not consumer.is_alive() if consumer is not None else self.stop.is_set():
+                    if consumer is not None and self.writer_error is not None:
+                        raise self.writer_error
+                    raise PipelineStopped()
+
+    def _parse(self):
+        """
+        Parser stage. Batches carry state of input after their last page, which is saved as checkpoint
+        once the batch is written
+        """
+        reader = self.reader
+        batch = []
+        try:
+            for offset, elem in reader._start_parse(checkpoints=False):
+                item = reader.page_item(elem)
+                if item is None:
+                    continue
+
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self._put(self.pages, (batch, (reader.scanner.offset, item[1], reader.pages_read)))
+                    batch = []
+
+            if batch:
+                self._put(self.pages, (batch, (reader.scanner.offset, batch[-1][1], reader.pages_read)))
+            self._put(self.pages, _DONE)
+        except PipelineStopped:
+            pass
+        except BaseException as ex:
+            try:
+                self._put(self.pages, ex)
+            except PipelineStopped:
+                pass
+
+    def _write(self):
+        reader = self.reader
+        last_checkpoint = time.monotonic()
+        try:
+            while True:
+                batch = self.records.get()
+                if batch is _DONE:
+                    break
+
+                records, (offset, last_page_id, pages_read) = batch
+                started = time.perf_counter()
+                for page_id, revision_id, sha1, record in records:
+                    reader._write_record(page_id, revision_id, sha1, record)
+                reader.stats.add_time("write", started)
+
+                self.written_state = (offset, last_page_id, reader.export_position, reader.revisions_position, pages_read)
+                if reader.checkpoint is not None and time.monotonic() - last_checkpoint >= Constants.CHECKPOINT_INTERVAL:
+                    reader._save_checkpoint(self.written_state)
+                    last_checkpoint = time.monotonic()
+        except BaseException as ex:
+            self.writer_error = ex
+
+    def _finish(self, items, state, future, writer):
+        """
+        Waits for extraction of the oldest batch and hands its records to writer
+
+        :return: Generator of exported entities of the batch
+        """
+        results, stats = future.result()
+        self.reader.stats.merge(stats)
+        if self.writer_error is not None:
+            raise self.writer_error
+        records = [(item[1], item[2], item[3], record) for item, (record, entity) in zip(items, results)]
+        self._put(self.records, (records, state), writer)
+        for record, entity in results:
+            if entity:
+                yield entity
+
+    def run(self):
+        """
+        :return: Generator of exported entities in dump order
+        """
+        # Workers are forked before parser and writer threads start, so they are never forked in the middle
+        # of parsing or printing progress. Only executor's own manager thread exists at that time
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.reader.file_path,))
+        try:
+            for future in [pool.submit(_worker_ready) for _ in range(self.workers)]:
+                future.result()
+        except:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+
+        parser = threading.Thread(target=self._parse, name="pipeline-parser", daemon=True)
+        writer = threading.Thread(target=self._write, name="pipeline-writer", daemon=True)
+        parser.start()
+        writer.start()
+
+        pending = deque()
+        completed = False
+        try:
+            while True:
+                batch = self.pages.get()
+                if batch is _DONE:
+                    break
+                if isinstance(batch, BaseException):
+                    raise batch
+
+                items, state = batch
+                pending.append((items, state, pool.submit(_process_batch, items)))
+                self.reader.report_stats()
+
+                # Batches in process pool are bounded as well, the oldest one is finished first to keep order
+                if len(pending) >= self.queue_depth:
+                    yield from self._finish(*pending.popleft(), writer)
+
+            while pending:
+                yield from self._finish(*pending.popleft(), writer)
+            completed = True
+        finally:
+            self.stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+            try:
+                self._put(self.records, _DONE, writer)
+            except PipelineStopped:
+                pass
+            writer.join()
+            parser.join()
+
+            # Interrupted parse continues after the last written batch
+            if not completed and self.reader.checkpoint is not None and self.written_state is not None:
+                self.reader._save_checkpoint(self.written_state)
+
+        if self.writer_error is not None:
+            raise self.writer_error
@@ -0,0 +1,49 @@
+class RevisionTable:
+
+    def __init__(self, rows):
+        """
+        Side table of export, which remembers revision of every page that was a person candidate and its
+        exported record. Newer dump can then skip extraction of pages that did not change since the export
+
+        :param rows: Dictionary of page id to tuple of revision id, sha1 and exported record (empty string
+                     when page was not exported)
+        """
+        self.rows = rows
+
+    @staticmethod
+    def path_for(export_path):
+        return export_path + ".revisions"
+
+    @staticmethod
+    def format_row(page_id, revision_id, sha1, record):
+        return "{0}\t{1}\t{2}\t{3}\n".format(page_id, revision_id or "", sha1 or "", record)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads side table written next to previous export
+
+        :param path: String path to .revisions file
+        """
+        rows = {}
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                page_id, revision_id, sha1, record = line.rstrip("\n").split("\t", 3)
+                rows[page_id] = (revision_id, sha1, record)
+
+        return cls(rows)
+
+    def unchanged_record(self, page_id, revision_id, sha1):
+        """
+        :return: Previously exported record (possibly empty) when page did not change, otherwise None
+        """
+        row = self.rows.get(page_id)
+        if row is None:
+            return None
+
+        previous_revision_id, previous_sha1, record = row
+        if sha1 and previous_sha1:
+            return record if sha1 == previous_sha1 else None
+        if revision_id and revision_id == previous_revision_id:
+            return record
+        return None
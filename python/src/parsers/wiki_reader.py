@@ -1,372 +1,512 @@
-from textwrap import wrap
-
 from lxml import etree
 from date_parsing.date_export import DateExport
 from date_parsing.date_format import DateFormat
+from date_parsing.date_extractor import BIRTH_DATE_EXTRACTOR, DEATH_DATE_EXTRACTOR
+from parsers.infobox_parser import infobox_fields, lead_section
+from parsers.page_scanner import RawPageScanner, PagePrefilter, PERSON_CATEGORY_PATTERN
+from parsers.checkpoint import ParseCheckpoint, skip_bytes
+from parsers.multistream import input_position
+from parsers.revision_table import RevisionTable
+from parsers.parser_stats import ParserStats
+from parsers.reader_pipeline import ExtractionPipeline
 from utilities import utils
+from utilities.progress_tracker import ProgressTracker
 from utilities.runtime_constants import RuntimeConstants as Constants
 from utilities.attr_type_constraint import auto_attr_check
 import re
-import html
 import os
-import sys
+import time
+
+
+PERSON_CATEGORY_REGEX = re.compile(PERSON_CATEGORY_PATTERN)
+
+# Special chars replaced in lead section, so we can reduce amount of cases in regex
+FULLTEXT_REPLACEMENTS = (("&ndash;", "-"), ("\u2013", "-"), ("&nbsp;", " "), ("{{snd}}", "-"))
+
+# Lead sentence formats, matched right after the title
+# FORMAT: Name Surname (DD Month YYYY {{snd}} DD Month YYYY)
+FULLTEXT_DAY_MONTH_YEAR = re.compile(r"\W+\((\d{1,2})\W+([a-zA-Z]+)\W+?(\d+)\W*?(?:-| |to)\W*?(\d{1,2})\W+?([a-zA-Z]+)\W+(\d+).*?\)")
+# FORMAT: Name Surname (YYYY-YYYY)
+FULLTEXT_YEARS = re.compile(r"\W+\(?([0-9]+).*?([0-9]+)\)")
+# FORMAT: Name Surname (texttext c. YYYY - c. YYYY texttext)
+FULLTEXT_CIRCA = re.compile(r"\W*\(.*(?:c.|circa)\W*(\d+)\W*(?:c.|circa)\W*(\d+)\W+(bc)?.*\)")
 
 
 @auto_attr_check
 class MediaWikiDumpReader:
 
-    def __init__(self, file_path=str, xml_stream = str, gazetteers=(str, list), export_info=(bool, str), verbose = False):
+    # Name of the format matched by the last extract_fulltext_dates call, like last_rule of infobox extractors
+    last_fulltext_rule = None
+
+    def __init__(self, file_path=str, xml_stream = str, gazetteers=(str, list), export_info=(bool, str), verbose = False, quiet = False, prefilter = True, checkpoint = None, resume = False, previous_revisions = None, stats = None, pipeline_workers = 0, queue_depth = 8):
         """
        Initialize dump reader to correctly read dump and use additional required information
 
        :param file_path: String path to unzipped xml dump file from wikipedia
-       :param xml_stream: open() stream to xml file
+       :param xml_stream: open() stream to xml file or any other stream of dump bytes
        :param gazetteers: Gazetteers containing keywords for "firstnames" and "surnames"
        :param export_info: Info used to export found persons in wikipedia dump. This is a tuple of
                            bool and str telling whether to export to file and path to this file
+       :param quiet: Do not print start and pre-filter messages. Used by worker processes of sharded parsing
+       :param prefilter: Reject pages that can not contain a person on raw bytes, before they are parsed
+       :param checkpoint: String path to checkpoint file, which is periodically updated during parsing
+       :param resume: Continue from checkpoint and append to existing export
+       :param previous_revisions: String path to revision side table of previous export. Pages which did not
+                                  change since then are not extracted again, their previous records are copied
+       :param stats: ParserStats collecting counters and stage timers, new one is created when not given
+       :param pipeline_workers: Number of processes extracting dates in ExtractionPipeline, 0 reads sequentially
+       :param queue_depth: Number of batches of pages waiting between stages of ExtractionPipeline
        """
-        self.context = etree.iterparse(xml_stream, events=("end",), tag=['{*}page'])
+        self.xml_stream = xml_stream
+        self.prefilter = PagePrefilter() if prefilter else None
         self.gazetteers = gazetteers
         self.export_info = export_info
         self.size = os.path.getsize(file_path)
         self.verbose = verbose
+        self.quiet = quiet
+        self.pages_read = 0
+        self.file_path = file_path
+        self.checkpoint = ParseCheckpoint(checkpoint) if checkpoint else None
+        self.resume = resume
+        self.start_offset = 0
+        self.export_position = 0
+        self.revisions_position = 0
+        self.previous_revisions = RevisionTable.load(previous_revisions) if previous_revisions else None
+        self.pages_copied = 0
+        self.pages_extracted = 0
+        self.stats = stats if stats is not None else ParserStats()
+        self.progress = None
+        self.pipeline_workers = pipeline_workers
+        self.queue_depth = queue_depth
+        self.scanner = None
 
     def __del__(self):
+        write_file = getattr(self, "write_file", None)
+        if write_file is not None and not write_file.closed:
+            write_file.close()
+
+    def _start_parse(self, checkpoints=True):
+        """
+        :param checkpoints: Save checkpoints of handed out pages. Pipeline saves them itself after records are written
+        """
+        # State is replaced as a whole before a page is handed out, so it always describes pages which
+        # were completely processed, even when parsing is interrupted at any moment
+        checkpoint = self.checkpoint if checkpoints else None
+        state = (self.start_offset, None, self.export_position, self.revisions_position, self.pages_read)
+        last_page_id = None
+        last_checkpoint = time.monotonic()
+        completed = False
+        stats = self.stats
+        started = time.perf_counter()
+
+        try:
+            self.scanner = RawPageScanner(self.xml_stream, start_offset=self.start_offset)
+            for offset, page in self.scanner:
+                self.pages_read += 1
+                stats.count("pages_seen")
+                if self.progress is not None:
+                    self.progress.tick()
+                if self.prefilter is not None and not self.prefilter.accept(page):
+                    stats.count("prefilter_rejected")
+                    stats.count(self.prefilter.last_reason)
+                    started = stats.add_time("scan", started)
+                    continue
+
+                if checkpoint is not None:
+                    state = (offset, last_page_id, self.export_position, self.revisions_position, self.pages_read - 1)
+                    if time.monotonic() - last_checkpoint >= Constants.CHECKPOINT_INTERVAL:
+                        self._save_checkpoint(state)
+                        last_checkpoint = time.monotonic()
+
+                started = stats.add_time("scan", started)
+                elem = etree.fromstring(page)
+                stats.add_time("lxml", started)
+                yield offset, elem
+                last_page_id = elem.findtext('{*}id')
+                started = time.perf_counter()
+
+            completed = True
+        finally:
+            if checkpoint is not None and not completed:
+                self._save_checkpoint(state)
+
+    def _save_checkpoint(self, state):
         if self.export_info[0] and not self.write_file.closed:
-            self.write_file.close()
+            self.write_file.flush()
+            self.revisions_file.flush()
+        offset, last_page_id, export_position, revisions_position, pages_read = state
+        self.checkpoint.save(self.file_path, offset, last_page_id, export_position, pages_read, revisions_position)
+
+    def _export_matches(self, state):
+        """
+        :return: True when export and its revision side table exist and contain everything written before checkpoint
+        """
+        revisions_path = RevisionTable.path_for(self.export_info[1])
+        for path, position in ((self.export_info[1], state["export_position"]), (revisions_path, state["revisions_position"])):
+            if not os.path.isfile(path) or os.path.getsize(path) < position:
+                return False
+        return True
+
+    def _open_export(self):
+        """
+        Opens export file. When resuming, records written after the checkpoint are cut off and input
+        stream is moved to the first unprocessed page
+        """
+        state = self.checkpoint.load(self.file_path) if self.resume and self.checkpoint is not None else None
+
+        if state is None and self.resume and not self.quiet:
+            print("No checkpoint found, parsing from the beginning.")
+        elif state is not None and self.export_info[0] and not self._export_matches(state):
+            if not self.quiet:
+                print("Export is missing or shorter than its checkpoint, parsing from the beginning.")
+            state = None
+
+        if state is None:
+            if self.export_info[0]:
+                self.write_file = open(self.export_info[1], "w", encoding="utf-8")
+                self.revisions_file = open(RevisionTable.path_for(self.export_info[1]), "w", encoding="utf-8")
+            return
+
+        self.start_offset = state["input_offset"]
+        self.export_position = state["export_position"]
+        self.revisions_position = state["revisions_position"]
+        self.pages_read = state["pages_read"]
+        skip_bytes(self.xml_stream, self.start_offset)
 
-    def _start_parse(self):
-        for event, element in self.context:
-            yield event, element
+        if self.export_info[0]:
+            revisions_path = RevisionTable.path_for(self.export_info[1])
+            for path, position in ((self.export_info[1], self.export_position), (revisions_path, self.revisions_position)):
+                with open(path, "r+b") as export:
+                    export.truncate(position)
+            self.write_file = open(self.export_info[1], "a", encoding="utf-8")
+            self.revisions_file = open(revisions_path, "a", encoding="utf-8")
 
-            element.clear()
-            while element.getprevious() is not None:
-                del element.getparent()[0]
+        if not self.quiet:
+            print("Resuming after page", state["last_page_id"], "at", utils.get_smart_file_size(self.start_offset), "of input.")
 
     def __iter__(self):
 
-        if self.export_info[0]:
-            self.write_file = open(self.export_info[1], "w", encoding="utf-8")
+        self._open_export()
 
-        progress = 0
-        print("Parser started on", utils.get_smart_file_size(self.size), "of data.")
+        if not self.quiet:
+            print("Parser started on", utils.get_smart_file_size(self.size), "of data.")
 
         if self.verbose:
-            utils.update_progress(0)
-
-        for event, elem in self._start_parse():
-            entity = {}
-            export_flag = True
+            self.progress = ProgressTracker(self.size, lambda: input_position(self.xml_stream))
+            self.progress.tick(0)
 
-            # Get inner text
-            inner_page = etree.tostring(elem).decode("UTF-8")
+        if self.pipeline_workers > 0:
+            entities = ExtractionPipeline(self, self.pipeline_workers, self.queue_depth).run()
+        else:
+            entities = self._read_sequential()
 
-            # Report progress
-            if self.verbose:
-                progress += sys.getsizeof(inner_page) / self.size
-                utils.update_progress(utils.max_clamp(progress, 0.9999))
+        for entity in entities:
+            yield entity
 
-            # Check if this page is a redirect to another page, therefore, processing will be skipped
-            redirect_match = re.search("<redirect title=\"(.*)\"\/>", inner_page)
-            if redirect_match:
-                continue
+        if self.export_info[0]:
+            self.write_file.close()
+            self.revisions_file.close()
 
-            # Get title of this page
-            exported_title = html.unescape(re.search("<title>([\s\S]*?)<\/title>", inner_page)[1])
-            entity["name"] = exported_title
+        if self.checkpoint is not None:
+            self.checkpoint.remove()
 
-            birth_date_found = False
-            death_date_found = False
-            correct_age = False
+        if self.progress is not None:
+            self.progress.finish()
 
-            # Check if it is a person
-            person_check = re.search(
-                r"\[\[Category:.*?(births|actors|actor|painters|citizens|painter|lutherans|woman|women|singers|singer|politician|deaths|photographers|artists|wrestlers|emigrants|[pP]hysicists|theorists|recipients).*?\]\]",
-                inner_page)
+        if self.prefilter is not None and not self.quiet:
+            print(self.prefilter.report())
 
-            is_person = False
-            if person_check:
-                for p in person_check.groups():
-                    if p != "":
-                        is_person = True
-                        break
+        if self.previous_revisions is not None and not self.quiet:
+            print("Copied", self.pages_copied, "unchanged pages and extracted", self.pages_extracted, "new or changed pages.")
 
-            if not is_person:
+        if self.verbose:
+            print(self.stats.summary())
+
+    def _read_sequential(self):
+        stats = self.stats
+        for offset, elem in self._start_parse():
+            self.report_stats()
+            item = self.page_item(elem)
+            if item is None:
                 continue
 
-            # Go line by line
-            for line in wrap(html.unescape(inner_page), 5000):
-                line = line.strip().lower()
-                try:
-                    # Try to find birth and death dates in current line
-                    if not birth_date_found:
-                        (birth_date_found, birth_date) = self.extract_birth_date(line, exported_title)
-                    if not death_date_found:
-                        (death_date_found, death_date) = self.extract_death_date(line, exported_title)
-
-                    # If nothing was found, do text search
-                    if not birth_date_found and not death_date_found:
-                        (birth_date_found, birth_date, death_date_found, death_date) = self.extract_fulltext_dates(line, exported_title)
-
-                    # Set entity fields if dates were found. If death date not found, do
-                    # additional statistical check whether person is still alive
-                    if birth_date_found:
-                        entity["birth_date"] = birth_date
-
-                    if death_date_found:
-                        entity["death_date"] = death_date
-                    elif birth_date_found:
-                        # Person that does not have death date might be alive
-                        if Constants.CURRENT_YEAR - birth_date.year <= Constants.MAXIMUM_ALLOWED_AGE:
-                            entity["death_date"] = "alive"
-                            death_date = "alive"
-                            death_date_found = True
-
-                    # Update export_flag. We wont have to search for more, if both dates were found
-                    export_flag = birth_date_found and death_date_found
-                    if export_flag:
-                        correct_age = DateExport.is_correct_age(birth_date, death_date)
-                        break
-                except:
-                    # Any error during export
-                    if self.verbose:
-                        print("\nRecovering from export error caused at", exported_title, "...")
-
-                    export_flag = False
-
-            if export_flag and correct_age:
-                if self.export_info[0]:
-                    write_str = entity["name"] + "," + entity["birth_date"].__repr__() + "," + entity["death_date"].__repr__() + "\n"
-                    self.write_file.write(write_str)
-                yield entity
+            record, entity = self.process_item(item)
 
-        if self.export_info[0]:
-            self.write_file.close()
+            started = time.perf_counter()
+            self._write_record(item[1], item[2], item[3], record)
+            stats.add_time("write", started)
 
+            if entity:
+                yield entity
+
+    def report_stats(self):
+        """
+        Prints summary of stats periodically in verbose mode
+        """
         if self.verbose:
-            utils.update_progress(1)
+            summary = self.stats.periodic_summary(Constants.STATS_INTERVAL)
+            if summary is not None:
+                print("\n" + summary)
+
+    def page_item(self, elem):
+        """
+        Decides what to do with parsed page
+
+        :return: None when page is skipped, ("copy", page_id, revision_id, sha1, record) for page which did not
+                 change since previous export or ("extract", page_id, revision_id, sha1, title, text)
+        """
+        stats = self.stats
+        started = time.perf_counter()
+
+        # Skip pages outside of article namespace and redirects before any text is touched
+        namespace = elem.findtext('{*}ns')
+        if namespace is not None and namespace != "0":
+            stats.count("other_namespace")
+            return None
+
+        if elem.find('{*}redirect') is not None:
+            stats.count("redirects")
+            return None
+
+        # Get title and wikitext of this page. Parser already decoded XML entities, so the text is
+        # the same as unescaped serialized page, e.g. "&ndash;" in wikitext stays "&ndash;"
+        exported_title = elem.findtext('{*}title')
+        text = elem.findtext('{*}revision/{*}text') or ""
+
+        # Check if it is a person
+        person_check = PERSON_CATEGORY_REGEX.search(text)
+
+        is_person = False
+        if person_check:
+            for p in person_check.groups():
+                if p != "":
+                    is_person = True
+                    break
+
+        stats.add_time("category", started)
+        if not is_person:
+            stats.count("non_persons")
+            return None
+
+        page_id = elem.findtext('{*}id')
+        revision_id = elem.findtext('{*}revision/{*}id')
+        sha1 = elem.findtext('{*}revision/{*}sha1')
+
+        # Page did not change since previous export, so its previous record is copied without extraction
+        if self.previous_revisions is not None:
+            record = self.previous_revisions.unchanged_record(page_id, revision_id, sha1)
+            if record is not None:
+                self.pages_copied += 1
+                stats.count("pages_copied")
+                return "copy", page_id, revision_id, sha1, record
+
+        self.pages_extracted += 1
+        stats.count("pages_extracted")
+        return "extract", page_id, revision_id, sha1, exported_title, text
+
+    def process_item(self, item):
+        """
+        :param item: Page item returned by page_item
+        :return: Tuple of export record (empty when person is not exported) and entity or None
+        """
+        if item[0] == "copy":
+            record = item[4]
+            if not record:
+                return record, None
+            name, birth_date, death_date = DateExport.parse_export_record(record)
+            return record, {"name": name, "birth_date": birth_date, "death_date": death_date}
+
+        entity = self.extract_person(item[4], item[5])
+        if entity is None:
+            return "", None
+        return entity["name"] + "," + entity["birth_date"].__repr__() + "," + entity["death_date"].__repr__(), entity
+
+    def extract_person(self, exported_title, text, started=None):
+        """
+        Extracts birth and death dates of a person from wikitext of the page
+
+        :param exported_title: Title of the page, which is name of the person
+        :param text: Wikitext of the page
+        :param started: Time when processing of the page started, used by stage timers
+        :return: Entity with name, birth_date and death_date or None when person can not be exported
+        """
+        stats = self.stats
+        started = started if started is not None else time.perf_counter()
+        entity = {"name": exported_title}
+        export_flag = True
+        birth_date_found = False
+        death_date_found = False
+        correct_age = False
+
+        # Page is lowercased once and its infobox fields are found in one pass, dates are matched only
+        # against values of the fields. Text search looks only at the lead section
+        text = text.lower()
+        fields = infobox_fields(text)
+        started = stats.add_time("infobox", started)
+        if fields:
+            stats.count("infoboxes")
+
+        try:
+            (birth_date_found, birth_date) = self.extract_birth_date(fields, exported_title)
+            started = stats.add_time("birth_date", started)
+            if birth_date_found:
+                stats.rule("birth", BIRTH_DATE_EXTRACTOR.last_rule)
+
+            (death_date_found, death_date) = self.extract_death_date(fields, exported_title)
+            started = stats.add_time("death_date", started)
+            if death_date_found:
+                stats.rule("death", DEATH_DATE_EXTRACTOR.last_rule)
+
+            # If nothing was found, do text search
+            if not birth_date_found and not death_date_found:
+                (birth_date_found, birth_date, death_date_found, death_date) = self.extract_fulltext_dates(lead_section(text), exported_title)
+                started = stats.add_time("fulltext", started)
+                if birth_date_found:
+                    stats.rule("fulltext", MediaWikiDumpReader.last_fulltext_rule)
+
+            # Set entity fields if dates were found. If death date not found, do
+            # additional statistical check whether person is still alive
+            if birth_date_found:
+                entity["birth_date"] = birth_date
+
+            if death_date_found:
+                entity["death_date"] = death_date
+            elif birth_date_found:
+                # Person that does not have death date might be alive
+                if Constants.CURRENT_YEAR - birth_date.year <= Constants.MAXIMUM_ALLOWED_AGE:
+                    entity["death_date"] = "alive"
+                    death_date = "alive"
+                    death_date_found = True
+                    stats.count("alive")
+
+            export_flag = birth_date_found and death_date_found
+            if export_flag:
+                correct_age = DateExport.is_correct_age(birth_date, death_date)
+        except:
+            # Any error during export
+            stats.count("errors_recovered")
+            if self.verbose:
+                print("\nRecovering from export error caused at", exported_title, "...")
+
+            export_flag = False
+
+        exported = export_flag and correct_age
+        if exported:
+            stats.count("persons_exported")
+        elif export_flag:
+            stats.count("incorrect_age")
+        else:
+            stats.count("dates_not_found")
+
+        return entity if exported else None
+
+
+    def _write_record(self, page_id, revision_id, sha1, record):
+        """
+        Writes record to export (when not empty) and revision of its page to side table
+        """
+        if not self.export_info[0]:
+            return
+
+        if record:
+            write_str = record + "\n"
+            self.write_file.write(write_str)
+            self.export_position += len(write_str.encode("utf-8"))
+
+        row = RevisionTable.format_row(page_id, revision_id, sha1, record)
+        self.revisions_file.write(row)
+        self.revisions_position += len(row.encode("utf-8"))
 
     @staticmethod
-    def extract_birth_date(line, title):
+    def extract_birth_date(fields, title):
         """
-        Matches a birth date from line using regex
+        Matches a birth date from infobox fields using precompiled infobox formats
 
         :param title: Name of entity
-        :param line: String with wikipedia text from which birth date will be exported, if present
+        :param fields: Dictionary of infobox fields of the page returned by infobox_fields
         """
-        if ("birth date" in line or "birth_date" in line or "birth-date" in line) and "infobox" in line:
-            # birth is in format [1]year [2]month [3]day
-            birth_date_match = re.search(
-                r"(?:birth date|birth date and age|birth-date|birth_date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n)|\s+)?\|([0-9]{1,4})\|([0-9]{1,2})\|([0-9]{1,2})",
-                line)
-            if birth_date_match:
-                return True, DateExport(int(birth_date_match[1]), int(birth_date_match[2]), int(birth_date_match[3]))
-
-            # another format in infobox: birth-date|23 September 1996  or  birth-date = 6 November AD 19
-            birth_date_match = re.search(
-                r"(?:birth date|birth-date|birth_date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n)|\s+)?\W+(\d{1,2})(?: or?\W+\d{1,2})?\W+([a-zA-Z]+)\W*?(?:ad)?\W*?(\d{1,4})\s*(bc)?",
-                line)
-            if birth_date_match:
-                try:
-                    date = DateExport.from_format(
-                        birth_date_match[1] + " " + birth_date_match[2] + " " + birth_date_match[3],
-                        DateFormat.TXTMONTH_FULL)
-                except:
-                    pass
-                else:
-                    if birth_date_match[4] and "bc" in birth_date_match[4]:
-                        date.BC = True
-                    return True, date
-
-            # another format in infobox: birth-date|September 23, 1996
-            birth_date_match = re.search(
-                r"(?:birth date|birth-date|birth_date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n)|\s+)?\W+([a-zA-Z]+)\W+(\d{1,2})(?: or?\W+\d{1,2})?\W+(\d{1,4})\s*(bc)?",
-                line)
-            if birth_date_match:
-                try:
-                    date = DateExport.from_format(
-                        birth_date_match[2] + " " + birth_date_match[1] + " " + birth_date_match[3],
-                        DateFormat.TXTMONTH_FULL)
-                except:
-                    pass
-                else:
-                    if birth_date_match[4] and "bc" in birth_date_match[4]:
-                        date.BC = True
-                    return True, date
-
-            # another format in infobox: birth-date = {{circa 650}} BC
-            birth_date_match = re.search(
-                r"(?:birth-date|birth_date|birth date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n)|\s+)?\|?(?:c\.|circa\W*)?([0-9]{1,4}).+?\}\}.*?(bc)",
-                line)
-            if birth_date_match:
-                date = DateExport.from_format(birth_date_match[1], DateFormat.YEAR_ONLY)
-                date.BC = True
-                return True, date
-
-            # another format in infobox: birth-date = circa 650 BC
-            birth_date_match = re.search(
-                r"(?:birth-date|birth_date|birth date)\W*(?:c\.|circa\W*) ([0-9]{1,4}) (bc)",
-                line)
-            if birth_date_match:
-                date = DateExport.from_format(birth_date_match[1], DateFormat.YEAR_ONLY)
-                date.BC = True
-                return True, date
-
-            # another format in infobox: birth-date = circa 650
-            birth_date_match = re.search(
-                r"(?:birth-date|birth_date|birth date)\W*(?:c\.|circa\W*) ([0-9]{1,4})[a-zA-Z0-9\W]*?\|",
-                line)
-            if birth_date_match:
-                date = DateExport.from_format(birth_date_match[1], DateFormat.YEAR_ONLY)
-                return True, date
-
-            # another format in infobox: birth-date|c. 1750  or  birth-date|1950
-            birth_date_match = re.search(r"(?:birth-date|birth_date|birth date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n)|\s+)?\|(?:c.\W*)?([0-9]{1,4})", line)
-            if birth_date_match:
-                return True, DateExport.from_format(birth_date_match[1], DateFormat.YEAR_ONLY)
-
-            # another format in infobox: birth-date|May, 1920
-            birth_date_match = re.search(r"(?:birth-date|birth_date|birth date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n))?\|([a-zA-Z]+)(?:\W+|,)([0-9]{1,4})", line)
-            if birth_date_match:
-                return True, DateExport.from_format(birth_date_match[1] + " " + birth_date_match[2], DateFormat.TXTMONTH_AND_YEAR)
-
-            # another format in infobox: birth year and age|1750
-            birth_date_match = re.search(r"birth year and age\W*?\|(\d{1,4})", line)
-            if birth_date_match:
-                return True, DateExport.from_format(birth_date_match[1], DateFormat.YEAR_ONLY)
-
-        return False, None
+        return BIRTH_DATE_EXTRACTOR.extract_fields(fields)
 
     @staticmethod
-    def extract_death_date(line, title):
+    def extract_death_date(fields, title):
         """
-        Matches a death date from line using regex
+        Matches a death date from infobox fields using precompiled infobox formats
 
         :param title:
-        :param line: String with wikipedia text from which death date will be exported, if present
+        :param fields: Dictionary of infobox fields of the page returned by infobox_fields
         """
-        if ("death date" in line or "death_date" in line or "death-date" in line)  and "infobox" in line:
-
-            # another format in infobox: death-date|1875 12 1   -> YYYY MM DD
-            death_date_match = re.search(
-                r"(?:death date|death date and age|death-date|death_date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n)|\s+)?\|([0-9]{1,4})\|([0-9]{1,2})\|([0-9]{1,2})\s*\|",
-                line)
-            if death_date_match:
-                return True, DateExport(int(death_date_match[1]), int(death_date_match[2]), int(death_date_match[3]))
-
-            # another format in infobox: death-date|23 September 1996
-            death_date_match = re.search(
-                r"(?:death date|death-date|death_date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n)|\s+)?\W+(\d{1,2})(?: or?\W+\d{1,2})?\W+([a-zA-Z]+)\W*?(?:ad)?\W*?(\d{1,4})\s*(bc)?",
-                line)
-            if death_date_match:
-                try:
-                    date = DateExport.from_format(
-                        death_date_match[1] + " " + death_date_match[2] + " " + death_date_match[3],
-                        DateFormat.TXTMONTH_FULL)
-                except:
-                    pass
-                else:
-                    if death_date_match[4] and "bc" in death_date_match[4]:
-                        date.BC = True
-
-                    return True, date
-
-            # another format in infobox: birth-date = {{circa 650}} BC
-            death_date_match = re.search(
-                r"(?:death-date|death_date|death date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n)|\s+)?\|?(?:c\.|circa\W*)?([0-9]{1,4}).+?\}\}.*?(bc)",
-                line)
-            if death_date_match:
-                date = DateExport.from_format(death_date_match[1], DateFormat.YEAR_ONLY)
-                date.BC = True
-                return True, date
-
-            # another format in infobox: death-date = circa 650 BC
-            death_date_match = re.search(
-                r"(?:death-date|death_date|death date).*(?:c\.|circa\W*) ([0-9]{1,4}) (bc)",
-                line)
-            if death_date_match:
-                date = DateExport.from_format(death_date_match[1], DateFormat.YEAR_ONLY)
-                date.BC = True
-                return True, date
-
-            # another format in infobox: death-date = circa 650
-            death_date_match = re.search(
-                r"(?:death-date|death_date|death date)\W*(?:c\.|circa\W*) ([0-9]{1,4})[a-zA-Z0-9\W]*?\|",
-                line)
-            if death_date_match:
-                date = DateExport.from_format(death_date_match[1], DateFormat.YEAR_ONLY)
-                return True, date
-
-            # another format in infobox: death-date|September 23, 1996
-            death_date_match = re.search(
-                r"(?:death date|death-date|death_date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n)|\s+)?\W+([a-zA-Z]+)\W+(\d{1,2})(?: or?\W+\d{1,2})?\W+(\d{1,4})\s*(bc)?",
-                line)
-            if death_date_match:
-                try:
-                    date = DateExport.from_format(death_date_match[2] + " " + death_date_match[1] + " " + death_date_match[3],DateFormat.TXTMONTH_FULL)
-                except:
-                    pass
-                else:
-                    if death_date_match[4] and "bc" in death_date_match[4]:
-                        date.BC = True
-                    return True, date
-
-            # another format in infobox: death-date|1940  or  death date|mf=n|904
-            death_date_match = re.search(r"(?:death-date|death_date|death date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n)|\s+)?\|(?:c.\W*)?([0-9]{1,4})", line)
-            if death_date_match:
-                return True, DateExport.from_format(death_date_match[1], DateFormat.YEAR_ONLY)
-
-            # another format in infobox: death-date|May, 1920  or  death_date|mf=yes|January,1205
-            death_date_match = re.search(r"(?:death-date|death_date|death date)\W*(?:\|df=(?:yes|y|no|n)|\|mf=(?:yes|y|no|n))?\|([a-zA-Z]+)(?:\W+|,)([0-9]{1,4})", line)
-            if death_date_match:
-                return True, DateExport.from_format(death_date_match[1] + " " + death_date_match[2], DateFormat.TXTMONTH_AND_YEAR)
-
-            # another format in infobox: birth year and age|1750
-            death_date_match = re.search(r"death year and age\W*?\|(\d{1,4})", line)
-            if death_date_match:
-                return True, DateExport.from_format(death_date_match[1], DateFormat.YEAR_ONLY)
-
-        return False, None
+        return DEATH_DATE_EXTRACTOR.extract_fields(fields)
+
+    @staticmethod
+    def title_positions(line, title):
+        """
+        :return: Generator of positions right after every occurrence of title in line
+        """
+        position = line.find(title)
+        while position != -1:
+            yield position + len(title)
+            position = line.find(title, position + 1)
+
+    @staticmethod
+    def match_after_title(pattern, line, title):
+        """
+        Matches precompiled pattern right after the first occurrence of title it fits. Title is found by plain
+        substring search, so it is never read as regex
+        """
+        for position in MediaWikiDumpReader.title_positions(line, title):
+            match = pattern.match(line, position)
+            if match:
+                return match
+        return None
 
     @staticmethod
     def extract_fulltext_dates(line, title):
         """
-        Matches a death date from line using regex
+        Matches birth and death dates written after the name in lead sentence
 
         :param title:
-        :param line: String with wikipedia text from which dates will be exported, if present
+        :param line: Lowercase lead section of wikipedia page
         """
+        title = title.lower()
+        if title not in line:
+            MediaWikiDumpReader.last_fulltext_rule = None
+            return False, None, False, None
 
-        # Replace special chars so we can reduce amount of cases in regex
-        rep = {"&ndash;": "-", "&nbsp;": " ", "{{snd}}" : "-"}
-        rep = dict((re.escape(k), v) for k, v in rep.items())
-        pattern = re.compile("|".join(rep.keys()))
-        line = pattern.sub(lambda m: rep[re.escape(m.group(0))], line)
+        for old, new in FULLTEXT_REPLACEMENTS:
+            if old in line:
+                line = line.replace(old, new)
 
         # Try to find birth date in text
-        # FORMAT: Name Surname (DD Month YYYY {{snd}} DD Month YYYY)
-        match = re.search(title.lower() + r"\W+\((\d{1,2})\W+([a-zA-Z]+)\W+?(\d+)\W*?(?:-| |to)\W*?(\d{1,2})\W+?([a-zA-Z]+)\W+(\d+).*?\)", line)
-
+        # Invalid date (ValueError), e.g. 30 February, is not a date and next format is tried
+        match = MediaWikiDumpReader.match_after_title(FULLTEXT_DAY_MONTH_YEAR, line, title)
         if match:
-            birth = DateExport(int(match[3]),DateExport.month_to_num(match[2]), int(match[1]))
-            death = DateExport(int(match[6]),DateExport.month_to_num(match[5]), int(match[4]))
-            return True, birth, True, death
-
-        # FORMAT: Name Surname (YYYY-YYYY)
-        match = re.search(title.lower() + r"\W+\(?([0-9]+).*?([0-9]+)\)",line)
+            try:
+                birth = DateExport(int(match[3]),DateExport.month_to_num(match[2]), int(match[1]))
+                death = DateExport(int(match[6]),DateExport.month_to_num(match[5]), int(match[4]))
+                MediaWikiDumpReader.last_fulltext_rule = "day_month_year"
+                return True, birth, True, death
+            except ValueError:
+                pass
+
+        match = MediaWikiDumpReader.match_after_title(FULLTEXT_YEARS, line, title)
         if match:
+            MediaWikiDumpReader.last_fulltext_rule = "years"
             return True, DateExport.from_format(match[1], DateFormat.YEAR_ONLY), True, DateExport.from_format(match[2], DateFormat.YEAR_ONLY)
 
-        # FORMAT: Name Surname (texttext c. YYYY - c. YYYY texttext)
-        match = re.search(title.lower() + r"\W*\(.*(?:c.|circa)\W*(\d+)\W*(?:c.|circa)\W*(\d+)\W+(bc)?.*\)", line)
+        match = MediaWikiDumpReader.match_after_title(FULLTEXT_CIRCA, line, title)
         if match:
-            birth = DateExport.from_format(match[1], DateFormat.YEAR_ONLY)
-            death = DateExport.from_format(match[2], DateFormat.YEAR_ONLY)
+            try:
+                birth = DateExport.from_format(match[1], DateFormat.YEAR_ONLY)
+                death = DateExport.from_format(match[2], DateFormat.YEAR_ONLY)
 
-            if match[3] == "bc":
-                birth.BC = True
-                death.BC = True
+                if match[3] == "bc":
+                    birth.BC = True
+                    death.BC = True
 
-            return True, birth, True, death
+                MediaWikiDumpReader.last_fulltext_rule = "circa"
+                return True, birth, True, death
+            except ValueError:
+                pass
 
+        MediaWikiDumpReader.last_fulltext_rule = None
         return False, None, False, None
\ No newline at end of file
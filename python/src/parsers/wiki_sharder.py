@@ -0,0 +1,262 @@
+from multiprocessing import Pool
+from parsers.wiki_reader import MediaWikiDumpReader
+from parsers.revision_table import RevisionTable
+from parsers.parser_stats import ParserStats
+from parsers.multistream import MultistreamDumpStream, is_bz2_dump, default_index_path, page_stream_ranges
+from utilities import utils
+import os
+import shutil
+import time
+
+
+PAGE_START = b"<page>"
+PAGE_END = b"</page>"
+SCAN_BLOCK_SIZE = 1 << 20
+
+
+class ByteRangeStream:
+
+    def __init__(self, file_path, start, end, prefix=b"<pages>", suffix=b"</pages>"):
+        """
+        File-like object exposing a byte range of a dump wrapped into a single root element,
+        so lxml can parse a shard of pages on its own
+
+        :param file_path: String path to unzipped xml dump file from wikipedia
+        :param start: Offset of the first byte of the range (start of a <page>)
+        :param end: Offset just after the last byte of the range (end of a </page>)
+        :param prefix: Bytes returned before the range
+        :param suffix: Bytes returned after the range
+        """
+        self._file = open(file_path, "rb")
+        self._file.seek(start)
+        self._remaining = end - start
+        self._prefix = prefix
+        self._suffix = suffix
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self._remaining + len(self._prefix) + len(self._suffix)
+
+        data = b""
+        if self._prefix:
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+            size -= len(data)
+
+        if size > 0 and self._remaining > 0:
+            chunk = self._file.read(min(size, self._remaining))
+            self._remaining -= len(chunk)
+            size -= len(chunk)
+            data += chunk
+
+        if size > 0 and self._remaining <= 0 and self._suffix:
+            tail, self._suffix = self._suffix[:size], self._suffix[size:]
+            data += tail
+
+        return data
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def find_forward(file, offset, pattern, limit):
+    """
+    Finds first occurrence of pattern at or after offset
+
+    :return: Offset of the pattern or limit when pattern is not present
+    """
+    file.seek(offset)
+    overlap = b""
+    position = offset
+    while position < limit:
+        block = file.read(SCAN_BLOCK_SIZE)
+        if not block:
+            break
+        data = overlap + block
+        found = data.find(pattern)
+        if found != -1:
+            return position - len(overlap) + found
+        overlap = data[-(len(pattern) - 1):]
+        position += len(block)
+
+    return limit
+
+
+def find_backward(file, offset, pattern):
+    """
+    Finds end (exclusive) of the last occurrence of pattern before offset
+
+    :return: Offset just after the pattern or -1 when pattern is not present
+    """
+    position = offset
+    overlap = b""
+    while position > 0:
+        read_from = max(0, position - SCAN_BLOCK_SIZE)
+        file.seek(read_from)
+        data = file.read(position - read_from) + overlap
+        found = data.rfind(pattern)
+        if found != -1:
+            return read_from + found + len(pattern)
+        overlap = data[:len(pattern) - 1]
+        position = read_from
+
+    return -1
+
+
+def find_page_boundaries(file_path, parts):
+    """
+    Splits dump into byte ranges aligned on <page> boundaries
+
+    :param file_path: String path to unzipped xml dump file from wikipedia
+    :param parts: Requested number of ranges. Less ranges are returned for very small dumps
+    :return: List of (start, end) tuples, where every range contains only whole pages
+    """
+    size = os.path.getsize(file_path)
+
+    with open(file_path, "rb") as file:
+        first_page = find_forward(file, 0, PAGE_START, size)
+        last_page_end = find_backward(file, size, PAGE_END)
+        if first_page >= size or last_page_end <= first_page:
+            return []
+
+        starts = [first_page]
+        for i in range(1, parts):
+            target = first_page + (last_page_end - first_page) * i // parts
+            start = find_forward(file, target, PAGE_START, last_page_end)
+            if start > starts[-1] and start < last_page_end:
+                starts.append(start)
+
+    ends = starts[1:] + [last_page_end]
+    return list(zip(starts, ends))
+
+
+def split_stream_ranges(ranges, parts):
+    """
+    Splits bz2 stream ranges into at most parts contiguous groups of similar size
+    """
+    parts = max(1, min(parts, len(ranges)))
+    groups = []
+    for i in range(parts):
+        group = ranges[len(ranges) * i // parts:len(ranges) * (i + 1) // parts]
+        if group:
+            groups.append(group)
+    return groups
+
+
+def open_shard(file_path, source):
+    """
+    Opens shard of dump as a stream of pages wrapped into a single root element
+
+    :param source: Byte range (start, end) of xml dump or list of stream ranges of bz2 multistream dump
+    """
+    if is_bz2_dump(file_path):
+        return MultistreamDumpStream(file_path, source, prefix=b"<pages>", suffix=b"</pages>", first_stream_only=True)
+    return ByteRangeStream(file_path, source[0], source[1])
+
+
+def _parse_shard(args):
+    """
+    Worker process entry. Parses one shard of dump and exports found persons into its own file
+    """
+    shard_index, file_path, source, output_path = args
+    exported = 0
+
+    with open_shard(file_path, source) as stream:
+        reader = MediaWikiDumpReader(file_path, stream, None, (True, output_path), False, quiet=True)
+        for _ in reader:
+            exported += 1
+
+    return shard_index, output_path, reader.pages_read, exported, reader.prefilter.pages_rejected, reader.stats.to_dict()
+
+
+class MediaWikiDumpSharder:
+
+    def __init__(self, file_path, output_path, workers, verbose=False, index_path=None):
+        """
+        Parses dump in multiple processes. Dump is split into byte ranges aligned on <page> boundaries,
+        every range is parsed in its own process and per-shard exports are merged in shard order,
+        so the output is the same for any number of workers
+
+        :param file_path: String path to unzipped xml dump file from wikipedia
+        :param output_path: String path to final export file
+        :param workers: Number of worker processes
+        :param verbose: Print progress of finished shards
+        :param index_path: Index of bz2 multistream dump. Shards of multistream dump are groups of bz2 streams
+        """
+        self.file_path = file_path
+        self.output_path = output_path
+        self.workers = workers
+        self.verbose = verbose
+        self.index_path = index_path
+        self.size = os.path.getsize(file_path)
+        self.stats = ParserStats()
+
+    def shard_path(self, shard_index):
+        return "{0}.shard{1:04d}".format(self.output_path, shard_index)
+
+    def shard_sources(self, parts):
+        if not is_bz2_dump(self.file_path):
+            return find_page_boundaries(self.file_path, parts)
+
+        index_path = self.index_path or default_index_path(self.file_path)
+        if index_path is None:
+            raise ValueError("Sharded parsing of bz2 dump requires multistream index.")
+        return split_stream_ranges(page_stream_ranges(self.file_path, index_path), parts)
+
+    def run(self):
+        # More shards than workers keeps all processes busy even when some ranges contain more persons
+        sources = self.shard_sources(self.workers * 4)
+        tasks = [(i, self.file_path, source, self.shard_path(i)) for i, source in enumerate(sources)]
+
+        print("Parser started on", utils.get_smart_file_size(self.size), "of data using", self.workers,
+              "workers and", len(tasks), "shards.")
+
+        start_time = time.perf_counter()
+        pages = 0
+        exported = 0
+        rejected = 0
+        shard_outputs = [None] * len(tasks)
+
+        if self.verbose:
+            utils.update_progress(0)
+
+        with Pool(self.workers) as pool:
+            for done, (shard_index, output_path, shard_pages, shard_exported, shard_rejected, shard_stats) in \
+                    enumerate(pool.imap_unordered(_parse_shard, tasks), 1):
+                shard_outputs[shard_index] = output_path
+                self.stats.merge(shard_stats)
+                pages += shard_pages
+                exported += shard_exported
+                rejected += shard_rejected
+                if self.verbose:
+                    utils.update_progress(utils.max_clamp(done / len(tasks), 0.9999))
+
+        self.merge(shard_outputs)
+        elapsed = time.perf_counter() - start_time
+
+        if self.verbose:
+            utils.update_progress(1)
+
+        print("Parsed", pages, "pages and exported", exported, "persons in %.2f s (%.0f pages/s)."
+              % (elapsed, pages / elapsed if elapsed > 0 else 0))
+        print("Pre-filter rejected {0} of {1} pages ({2:.2f}%).".format(rejected, pages, rejected / pages * 100 if pages else 0))
+        if self.verbose:
+            print(self.stats.summary())
+        return exported
+
+    def merge(self, shard_outputs):
+        """
+        Concatenates per-shard exports and their revision side tables in shard order
+        """
+        for output_path, shard_paths in ((self.output_path, shard_outputs),
+                                         (RevisionTable.path_for(self.output_path), [RevisionTable.path_for(path) for path in shard_outputs])):
+            with open(output_path, "wb") as output:
+                for shard_path in shard_paths:
+                    with open(shard_path, "rb") as shard:
+                        shutil.copyfileobj(shard, output)
+                    os.remove(shard_path)
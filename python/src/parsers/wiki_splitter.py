@@ -1,18 +1,30 @@
 from lxml import etree
+from parsers.multistream import open_dump, input_position, is_bz2_dump
+from utilities.progress_tracker import ProgressTracker
 import io
+import os
 
 
 class MediaWikiDumpSplitter:
 
-    def __init__(self, file_in, file_out, size):
+    def __init__(self, file_in, file_out, size, index_path=None, verbose=False):
         self.file_in = file_in
         self.file_out = file_out
         self.goal_size = size
-        self._in_file_stream = open(self.file_in, "rb")
+        self.verbose = verbose
+        self._in_file_stream = open_dump(self.file_in, index_path, os.cpu_count())
         self._out_file_stream = io.open(self.file_out, "w", encoding="utf-8")
         self.context = etree.iterparse(self._in_file_stream, events=("end",), tag=['{*}page'])
 
     def export_chunk(self):
+        progress = None
+        if self.verbose:
+            # Goal size is measured on xml, so it bounds the read part only of uncompressed dump
+            size = os.path.getsize(self.file_in)
+            total = size if is_bz2_dump(self.file_in) else min(size, self.goal_size)
+            progress = ProgressTracker(total, lambda: input_position(self._in_file_stream))
+            progress.tick(0)
+
         self._out_file_stream.write("<pages>")
         current_size = 0
         for event, element in self.context:
@@ -29,7 +41,12 @@ class MediaWikiDumpSplitter:
             while element.getprevious() is not None:
                 del element.getparent()[0]
 
+            if progress is not None:
+                progress.tick()
+
+        if progress is not None:
+            progress.finish()
+
         self._out_file_stream.write("</pages>")
         self._in_file_stream.close()
         self._out_file_stream.close()
-
@@ -0,0 +1,109 @@
+from date_parsing.date_export import DateExport
+from date_parsing.date_ordinal import days_from_civil, PRECISION_YEAR
+from utilities.runtime_constants import RuntimeConstants
+from utilities.string_table import StringTable
+import numpy as np
+import json
+import os
+
+
+FORMAT_VERSION = 1
+
+
+class ColumnarExport:
+
+    def __init__(self, names, birth, birth_precision, death, death_precision, alive):
+        """
+        Binary columnar form of exported persons. Names are stored in StringTable, birth and death dates as
+        signed day ordinals (days since 1970-01-01, BC years are negative) with precision flags. Alive persons
+        have death at the end of RuntimeConstants.CURRENT_YEAR. Every column is a numpy array, which is
+        memory-mapped when export is loaded, so loading takes milliseconds regardless of number of persons
+        """
+        self.names = names
+        self.birth = birth
+        self.birth_precision = birth_precision
+        self.death = death
+        self.death_precision = death_precision
+        self.alive = alive
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        :param records: Iterable of (name, DateExport, DateExport or "alive") tuples
+        """
+        alive_death = days_from_civil(RuntimeConstants.CURRENT_YEAR, 12, 31)
+        names, birth, birth_precision, death, death_precision, alive = [], [], [], [], [], []
+
+        for name, birth_date, death_date in records:
+            names.append(name)
+            birth.append(birth_date.ordinal)
+            birth_precision.append(birth_date.precision)
+
+            if death_date == "alive":
+                death.append(alive_death)
+                death_precision.append(PRECISION_YEAR)
+                alive.append(True)
+            else:
+                death.append(death_date.ordinal)
+                death_precision.append(death_date.precision)
+                alive.append(False)
+
+        return cls(StringTable.from_strings(names),
+                   np.array(birth, dtype=np.int32), np.array(birth_precision, dtype=np.uint8),
+                   np.array(death, dtype=np.int32), np.array(death_precision, dtype=np.uint8),
+                   np.array(alive, dtype=np.bool_))
+
+    @classmethod
+    def from_text_export(cls, export_path):
+        """
+        Converts text export (lines of name,birth,death as written by MediaWikiDumpReader)
+        """
+        def records():
+            with open(export_path, encoding="utf-8") as export:
+                for line in export:
+                    if line.strip():
+                        yield DateExport.parse_export_record(line)
+
+        return cls.from_records(records())
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.names.save(directory, "names")
+        for column in ("birth", "birth_precision", "death", "death_precision", "alive"):
+            np.save(os.path.join(directory, column + ".npy"), getattr(self, column))
+
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as meta:
+            json.dump({"version": FORMAT_VERSION, "count": len(self), "current_year": RuntimeConstants.CURRENT_YEAR}, meta)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as meta:
+            version = json.load(meta)["version"]
+        if version != FORMAT_VERSION:
+            raise ValueError("Unsupported columnar export version {0}.".format(version))
+
+        mode = "r" if mmap else None
+        columns = [np.load(os.path.join(directory, column + ".npy"), mmap_mode=mode)
+                   for column in ("birth", "birth_precision", "death", "death_precision", "alive")]
+        return cls(StringTable.load(directory, "names", mmap), *columns)
+
+    @staticmethod
+    def is_columnar_export(path):
+        return os.path.isdir(path) and os.path.exists(os.path.join(path, "meta.json"))
+
+    def birth_date(self, i):
+        return DateExport.from_ordinal(self.birth[i], self.birth_precision[i])
+
+    def death_date(self, i):
+        if self.alive[i]:
+            return "alive"
+        return DateExport.from_ordinal(self.death[i], self.death_precision[i])
+
+    def record(self, i):
+        """
+        :return: Tuple of name, DateExport and DateExport or "alive", the same as parsed from text export
+        """
+        return self.names[i], self.birth_date(i), self.death_date(i)
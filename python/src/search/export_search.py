@@ -1,15 +1,31 @@
-from elasticsearch import Elasticsearch, helpers
-import json
+from elasticsearch import Elasticsearch, TransportError, helpers
+from multiprocessing.pool import ThreadPool
+from collections import deque
+from utilities.utils import chunks
 import re
+import time
+
 
 class ExportSearch:
 
-    def __init__(self, index_name='people'):
+    # Index settings used while bulk loading, no refreshes and no replicas to copy documents to
+    BULK_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+    # Maximum number of searches in one _msearch request
+    MSEARCH_SIZE = 500
+
+    def __init__(self, index_name='people', hosts=None, cache=None):
+        """
+        :param index_name: Name of Elasticsearch index with persons
+        :param hosts: Optional list of Elasticsearch hosts, local server on port 9200 is used by default
+        :param cache: Optional LookupCache of resolved names
+        """
         # run elasticsearch
         self._es = None
-        self._es = Elasticsearch([{'host': 'localhost', 'port': 9200}])
+        self._es = Elasticsearch(hosts or [{'host': 'localhost', 'port': 9200}])
         self.is_es_prepared = False
         self.index_name = index_name
+        self.cache = cache
 
     def prepare_elasticsearch(self, ):
         if self._es.ping():
@@ -19,33 +35,91 @@ class ExportSearch:
         else:
             print('Elasticsearch could not connect!')
 
-    def insert_data(self, parsed_file, bulk_size):
-        # store data
-        output = ""
-        count = 0
-
-        # creating dictionary
+    def read_actions(self, parsed_file):
+        """
+        Generator of bulk index actions, one for every record of export
+        """
         with open(parsed_file, encoding="utf-8") as fh:
             for line in fh:
-                l1,l2,l3 = self.handle_line_split(line.split("\n")[0])
-                output += "{0} \"name\":\"{1}\",\"birthdate\":\"{2}\",\"deathdate\":\"{3}\" {4}\n".format("{",l1,l2,l3,"}")
-                count += 1
-                data = None
-
-                if count == bulk_size:
-                    count = 0
-
-                    try:
-                        data = [json.loads(l) for l in output.splitlines()]
-                    except Exception as e:
-                        print(e)
-
-                        pass
-
-                    if data:
-                        output = ""
-                        self.store_records(self.index_name, data)
-                        print("Successfully bulked ", bulk_size, " records.")
+                line = line.split("\n")[0]
+                if not line:
+                    continue
+
+                name, birth, death = self.handle_line_split(line)
+                yield {"_index": self.index_name, "_source": {"name": name, "birthdate": birth, "deathdate": death}}
+
+    def insert_data(self, parsed_file, bulk_size, threads=4, max_retries=5, initial_backoff=2):
+        """
+        Streams export into index. Chunks of bulk_size records are sent by a pool of threads, records
+        rejected with 429 are retried with exponential backoff. Refresh and replicas of index are switched
+        off during the load and restored afterwards
+
+        :param parsed_file: Path to text export
+        :param bulk_size: Number of records in one bulk request
+        :param threads: Number of bulk requests sent in parallel
+        :param max_retries: Number of retries of records rejected with 429
+        :param initial_backoff: Seconds to wait before the first retry, doubled with every next retry
+        :return: Tuple of number of indexed and failed records
+        """
+        previous_settings = self.disable_refresh()
+        indexed, failed = 0, 0
+        start = time.time()
+
+        pool = ThreadPool(threads)
+        pending = deque()
+        try:
+            for chunk in chunks(self.read_actions(parsed_file), bulk_size):
+                pending.append(pool.apply_async(self.store_chunk, (chunk, max_retries, initial_backoff)))
+
+                # Only a few chunks are in flight, so export is never held in memory as a whole
+                if len(pending) >= threads * 2:
+                    ok, errors = pending.popleft().get()
+                    indexed, failed = indexed + ok, failed + errors
+                    print("Successfully bulked ", indexed, " records.")
+
+            while pending:
+                ok, errors = pending.popleft().get()
+                indexed, failed = indexed + ok, failed + errors
+                print("Successfully bulked ", indexed, " records.")
+        finally:
+            pool.terminate()
+            self.restore_refresh(previous_settings)
+
+        elapsed = time.time() - start
+        print("Indexed", indexed, "records in", "%.1f" % elapsed, "s (%.0f docs/s)," % (indexed / max(elapsed, 1e-9)),
+              failed, "failed.")
+        return indexed, failed
+
+    def store_chunk(self, chunk, max_retries, initial_backoff):
+        """
+        :return: Tuple of number of indexed and failed records of chunk
+        """
+        ok, errors = 0, 0
+        for success, info in helpers.streaming_bulk(self._es, chunk, chunk_size=len(chunk), max_retries=max_retries,
+                                                    initial_backoff=initial_backoff, raise_on_error=False):
+            if success:
+                ok += 1
+            else:
+                errors += 1
+                print('Error in indexing data')
+                print(str(info))
+        return ok, errors
+
+    def disable_refresh(self):
+        """
+        Applies BULK_SETTINGS to index
+
+        :return: Previous values of changed settings, None for settings which were not set
+        """
+        current = self._es.indices.get_settings(index=self.index_name)[self.index_name]["settings"]["index"]
+        previous = {key: current.get(key) for key in self.BULK_SETTINGS}
+        self._es.indices.put_settings(index=self.index_name, body={"index": self.BULK_SETTINGS})
+        return previous
+
+    def restore_refresh(self, previous_settings):
+        # None resets setting to its default value
+        self._es.indices.put_settings(index=self.index_name, body={"index": previous_settings})
+        self._es.indices.refresh(index=self.index_name)
 
     @staticmethod
     def handle_line_split(line):
@@ -153,7 +227,24 @@ class ExportSearch:
             print('Error in indexing data')
             print(str(ex))
 
+    @staticmethod
+    def exact_match(hits, n1):
+        """
+        :return: Tuple of name, birth date and death date when the best hit is exactly n1, otherwise None
+        """
+        if not hits:
+            return None
+
+        best_match = hits[0]['_source']
+        if best_match['name'] == n1:
+            return best_match['name'], best_match['birthdate'], best_match['deathdate']
+        return None
+
     def find(self, n1):
+        if self.cache is not None:
+            entry = self.cache.get(n1)
+            if entry is not None:
+                return (True,) + entry
 
         query_body={'query':{'match':{'name': n1}}}
 
@@ -169,10 +260,11 @@ class ExportSearch:
             return False, None
 
         # Check if is exact match
-        best_match = data[0]['_source']['name']
-
-        if best_match == n1:
-            return True, best_match, data[0]['_source']['birthdate'], data[0]['_source']['deathdate']
+        entry = self.exact_match(data, n1)
+        if entry is not None:
+            if self.cache is not None:
+                self.cache.put(n1, entry)
+            return (True,) + entry
 
         print("These are the best results. Please specify your query according to this list.")
 
@@ -189,3 +281,43 @@ class ExportSearch:
             print(" - %s" % (doc['_source']['name']))
 
         return False, None
+
+    def find_many(self, names):
+        """
+        Resolves exact names in bulk. Cached names are not searched, the rest is searched with _msearch requests
+        of at most MSEARCH_SIZE names
+
+        :param names: Iterable of names, duplicates are resolved once
+        :return: Dictionary of name to tuple of name, birth date and death date, or None when there is no exact match
+        :raises TransportError: When search of any name failed
+        """
+        resolved = {}
+        missing = []
+        for name in dict.fromkeys(names):
+            entry = self.cache.get(name) if self.cache is not None else None
+            if entry is None:
+                missing.append(name)
+            else:
+                resolved[name] = entry
+
+        for chunk in chunks(missing, self.MSEARCH_SIZE):
+            body = []
+            for name in chunk:
+                body.append({'index': self.index_name})
+                body.append({'query': {'match': {'name': name}}, 'size': 1})
+
+            res = self._es.msearch(body=body)
+            for name, response in zip(chunk, res['responses']):
+                # Failed search of one name (e.g. rejected execution) is raised like error of a single search,
+                # it is not the same as a name without match
+                error = response.get('error')
+                if error is not None:
+                    error_type = error.get('type', str(error)) if isinstance(error, dict) else str(error)
+                    raise TransportError(response.get('status', 'N/A'), error_type, response)
+
+                entry = self.exact_match(response.get('hits', {}).get('hits'), name)
+                resolved[name] = entry
+                if entry is not None and self.cache is not None:
+                    self.cache.put(name, entry)
+
+        return resolved
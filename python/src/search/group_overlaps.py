@@ -0,0 +1,96 @@
+from date_parsing.date_export import DateExport
+import numpy as np
+import csv
+
+
+def overlapping_pairs(starts, ends):
+    """
+    All pairs of overlapping lifetimes found by sweep line over lifetimes sorted by start. Lifetime meets every
+    later one in sweep order which starts before it ends, so pairs of each lifetime are one contiguous range
+    found by binary search and all ranges are expanded with numpy at once. Takes O(N log N + K) for K pairs
+
+    :param starts: numpy array of lifetime starts (day ordinals)
+    :param ends: numpy array of lifetime ends (day ordinals)
+    :return: Tuple of numpy arrays of first index, second index (first < second) and overlapping days,
+             sorted by first and second index
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    order = np.argsort(starts, kind="stable")
+    sorted_starts = starts[order]
+    sorted_ends = ends[order]
+
+    # Lifetimes from position + 1 up to the first lifetime starting at or after the end overlap
+    positions = np.arange(len(order))
+    counts = np.maximum(np.searchsorted(sorted_starts, sorted_ends, side="left") - positions - 1, 0)
+
+    first = np.repeat(positions, counts)
+    second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(counts) - counts, counts)
+    days = np.minimum(sorted_ends[first], sorted_ends[second]) - sorted_starts[second]
+
+    # Empty lifetimes inside the range do not overlap anything
+    mask = days > 0
+    first, second, days = order[first[mask]], order[second[mask]], days[mask]
+    first, second = np.minimum(first, second), np.maximum(first, second)
+
+    pair_order = np.lexsort((second, first))
+    return first[pair_order], second[pair_order], days[pair_order]
+
+
+class GroupOverlaps:
+
+    def __init__(self, search):
+        """
+        Every pair of a group of persons who could meet
+
+        :param search: ExportSearch or LocalSearch, names are resolved by find_many
+        """
+        self.search = search
+        self.names = []
+        self.unknown_names = []
+        self.starts = None
+        self.ends = None
+
+    @staticmethod
+    def read_names(names_path):
+        with open(names_path, encoding="utf-8") as names_file:
+            return [line.strip() for line in names_file if line.strip()]
+
+    def resolve(self, names):
+        """
+        Resolves distinct names, names which are not found are kept in unknown_names
+        """
+        self.names, self.unknown_names, starts, ends = [], [], [], []
+        for name, entry in self.search.find_many(names).items():
+            if entry is None:
+                self.unknown_names.append(name)
+                continue
+
+            self.names.append(name)
+            starts.append(DateExport.interval_ordinal(entry[1]))
+            ends.append(DateExport.interval_ordinal(entry[2]))
+
+        self.starts = np.array(starts, dtype=np.int64)
+        self.ends = np.array(ends, dtype=np.int64)
+
+    def pairs(self):
+        """
+        :return: Tuple of numpy arrays of first and second index into names and overlapping days
+        """
+        return overlapping_pairs(self.starts, self.ends)
+
+    def save(self, path, first, second, days):
+        """
+        Saves sparse overlap matrix. Path ending with .npz is saved as numpy arrays of names, rows, columns
+        and overlapping days in coordinate format, any other path as CSV with a line for every pair
+        """
+        if path.endswith(".npz"):
+            np.savez_compressed(path, names=np.array(self.names, dtype=str), row=first, col=second, overlap_days=days,
+                                shape=np.array([len(self.names), len(self.names)]))
+            return
+
+        with open(path, "w", encoding="utf-8", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["row", "col", "overlap_days", "row_name", "col_name"])
+            for i, j, overlap in zip(first.tolist(), second.tolist(), days.tolist()):
+                writer.writerow([i, j, overlap, self.names[i], self.names[j]])
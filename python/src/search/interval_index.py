@@ -0,0 +1,79 @@
+import numpy as np
+
+
+class LifetimeIndex:
+
+    def __init__(self, buckets):
+        """
+        Index of lifetimes as intervals of day ordinals. Lifetimes are split into buckets by length
+        (powers of two of days) and every bucket is sorted by birth. Lifetime overlapping query interval
+        must start before query end and no sooner than query start minus the longest lifetime in its
+        bucket, so every bucket is searched by two binary searches and almost all candidates between
+        them are real overlaps. Query takes O(B log N + K), where B is the number of buckets (at most 32)
+
+        :param buckets: List of tuples (starts, ends, person_ids, max_span) of numpy arrays sorted by starts
+        """
+        self.buckets = buckets
+
+    @classmethod
+    def build(cls, columns):
+        """
+        Builds index from ColumnarExport, alive persons end at the end of RuntimeConstants.CURRENT_YEAR
+        """
+        return cls.from_intervals(np.asarray(columns.birth), np.asarray(columns.death))
+
+    @classmethod
+    def from_intervals(cls, starts, ends):
+        starts = starts.astype(np.int64)
+        ends = ends.astype(np.int64)
+        spans = np.maximum(ends - starts, 1)
+        bucket_of = np.floor(np.log2(spans)).astype(np.int32)
+
+        buckets = []
+        for bucket in np.unique(bucket_of):
+            person_ids = np.flatnonzero(bucket_of == bucket)
+            person_ids = person_ids[np.argsort(starts[person_ids], kind="stable")]
+            buckets.append((starts[person_ids], ends[person_ids], person_ids.astype(np.int32),
+                            int(spans[person_ids].max())))
+        return cls(buckets)
+
+    def __len__(self):
+        return sum(len(bucket[0]) for bucket in self.buckets)
+
+    def overlaps(self, start, end):
+        """
+        Finds all lifetimes overlapping interval by at least one day, the same condition as DateExport.could_meet
+
+        :param start: Day ordinal of query start
+        :param end: Day ordinal of query end
+        :return: Tuple of numpy arrays of person ids and number of overlapping days, sorted by person id
+        """
+        found_ids, found_days = [], []
+        for starts, ends, person_ids, max_span in self.buckets:
+            lo = np.searchsorted(starts, start - max_span, side="right")
+            hi = np.searchsorted(starts, end, side="left")
+            if lo >= hi:
+                continue
+
+            days = np.minimum(ends[lo:hi], end) - np.maximum(starts[lo:hi], start)
+            mask = days > 0
+            found_ids.append(person_ids[lo:hi][mask])
+            found_days.append(days[mask])
+
+        if not found_ids:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int64)
+
+        found_ids = np.concatenate(found_ids)
+        found_days = np.concatenate(found_days)
+        order = np.argsort(found_ids, kind="stable")
+        return found_ids[order], found_days[order]
+
+    def overlaps_person(self, columns, person_id):
+        """
+        Finds everyone whose lifetime overlapped with given person, the person itself is excluded
+
+        :return: Tuple of numpy arrays of person ids and number of overlapping days
+        """
+        person_ids, days = self.overlaps(int(columns.birth[person_id]), int(columns.death[person_id]))
+        mask = person_ids != person_id
+        return person_ids[mask], days[mask]
@@ -0,0 +1,217 @@
+from search.columnar_export import ColumnarExport
+from utilities.string_table import StringTable, SortedView
+from collections import defaultdict
+import numpy as np
+import json
+import os
+import re
+
+
+TOKEN_REGEX = re.compile(r"\w+")
+
+# The same limit as max_gram of edge_ngram filter in Elasticsearch index
+MAX_PREFIX_LENGTH = 25
+
+
+def tokenize(name):
+    return TOKEN_REGEX.findall(name.lower())
+
+
+def search_date_format(date):
+    """
+    Formats date the same way it is stored in Elasticsearch index, e.g. "14.3.1879 " or "20.7.356 BC"
+    """
+    if date == "alive":
+        return "alive"
+    return date.__repr__().replace("(BC: False)", "").replace("(BC: True)", "BC")
+
+
+class LocalSearch:
+
+    def __init__(self, columns, exact_order, tokens, postings_offsets, postings):
+        """
+        In-process replacement of Elasticsearch person search. Index consists of columnar export, permutation
+        of persons sorted by lowercase name for exact lookups and inverted index of sorted lowercase name
+        tokens. Prefix of a token is found by binary search in sorted tokens, which matches persons the same
+        way as edge_ngram analyzer of Elasticsearch index. Every part is a numpy array, so saved index is
+        memory-mapped and search starts without any server
+
+        :param columns: ColumnarExport with persons
+        :param exact_order: numpy array of person ids sorted by lowercase name
+        :param tokens: StringTable of sorted unique lowercase tokens
+        :param postings_offsets: numpy array of len(tokens) + 1 offsets into postings
+        :param postings: numpy array of person ids grouped by token
+        """
+        self.columns = columns
+        self.exact_order = exact_order
+        self.tokens = tokens
+        self.postings_offsets = postings_offsets
+        self.postings = postings
+        self.name_lengths = np.diff(columns.names.offsets)
+        self._names_view = SortedView(columns.names, memoryview(np.ascontiguousarray(exact_order)), str.lower)
+        self._tokens_view = SortedView(tokens)
+
+    @classmethod
+    def build(cls, columns):
+        """
+        Builds index in memory from ColumnarExport
+        """
+        lower_names = [name.lower() for name in columns.names]
+        exact_order = np.array(sorted(range(len(lower_names)), key=lower_names.__getitem__), dtype=np.int32)
+
+        token_postings = defaultdict(list)
+        for person_id, name in enumerate(lower_names):
+            for token in set(TOKEN_REGEX.findall(name)):
+                token_postings[token].append(person_id)
+
+        tokens = sorted(token_postings)
+        postings_offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum([len(token_postings[token]) for token in tokens], out=postings_offsets[1:])
+        postings = np.fromiter((person_id for token in tokens for person_id in token_postings[token]),
+                               dtype=np.int32, count=int(postings_offsets[-1]))
+
+        return cls(columns, exact_order, StringTable.from_strings(tokens), postings_offsets, postings)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Opens saved index, or builds index from columnar or text export
+
+        :param path: Path to index directory, columnar export directory or text export file
+        """
+        if cls.is_index(path):
+            return cls.load(path)
+        if ColumnarExport.is_columnar_export(path):
+            return cls.build(ColumnarExport.load(path))
+        return cls.build(ColumnarExport.from_text_export(path))
+
+    @staticmethod
+    def is_index(path):
+        return os.path.isdir(path) and os.path.exists(os.path.join(path, "local_index.json"))
+
+    def save(self, directory):
+        self.columns.save(directory)
+        self.tokens.save(directory, "tokens")
+        np.save(os.path.join(directory, "exact_order.npy"), self.exact_order)
+        np.save(os.path.join(directory, "postings.offsets.npy"), self.postings_offsets)
+        np.save(os.path.join(directory, "postings.npy"), self.postings)
+
+        with open(os.path.join(directory, "local_index.json"), "w", encoding="utf-8") as meta:
+            json.dump({"persons": len(self.columns), "tokens": len(self.tokens)}, meta)
+
+    @classmethod
+    def load(cls, directory):
+        return cls(ColumnarExport.load(directory),
+                   np.load(os.path.join(directory, "exact_order.npy"), mmap_mode="r"),
+                   StringTable.load(directory, "tokens"),
+                   np.load(os.path.join(directory, "postings.offsets.npy"), mmap_mode="r"),
+                   np.load(os.path.join(directory, "postings.npy"), mmap_mode="r"))
+
+    def lookup(self, name):
+        """
+        Exact, case sensitive match of name
+
+        :return: Person id or None
+        """
+        lo, hi = self._names_view.equal_range(name.lower())
+        for i in range(lo, hi):
+            person_id = int(self.exact_order[i])
+            if self.columns.names[person_id] == name:
+                return person_id
+        return None
+
+    def prefix_candidates(self, token):
+        """
+        :return: numpy array of ids of persons, whose name has a token starting with given token
+        """
+        if len(token) > MAX_PREFIX_LENGTH:
+            return self.postings[:0]
+
+        lo, hi = self._tokens_view.prefix_range(token)
+        return self.postings[self.postings_offsets[lo]:self.postings_offsets[hi]]
+
+    def suggest(self, query, k=5):
+        """
+        Top-k persons matching query. Person matching more query tokens is better, shorter name wins ties
+
+        :return: List of person ids
+        """
+        candidates = [self.prefix_candidates(token) for token in tokenize(query)]
+        candidates = [c for c in candidates if len(c)]
+        if not candidates:
+            return []
+
+        if len(candidates) == 1:
+            return self._top_shortest(candidates[0], k)
+
+        # Score is the number of query tokens matched by person
+        person_ids, scores = np.unique(np.concatenate([np.unique(c) for c in candidates]), return_counts=True)
+
+        # Sort by score descending and name length ascending, only top k are fully sorted
+        rank = -scores * (int(self.name_lengths.max()) + 1) + self.name_lengths[person_ids]
+        return self._top_ranked(person_ids, rank, k)
+
+    def _top_shortest(self, person_ids, k):
+        """
+        Top-k persons with the shortest names. Person may be in candidates more times (for each token with
+        the same prefix), so only a small slice of best candidates is deduplicated
+        """
+        rank = self.name_lengths[person_ids]
+        window = k * 8
+        if len(person_ids) > window:
+            best = np.argpartition(rank, window)[:window]
+            unique_ids = np.unique(person_ids[best])
+            if len(unique_ids) >= k:
+                return self._top_ranked(unique_ids, self.name_lengths[unique_ids], k)
+
+        unique_ids = np.unique(person_ids)
+        return self._top_ranked(unique_ids, self.name_lengths[unique_ids], k)
+
+    @staticmethod
+    def _top_ranked(person_ids, rank, k):
+        if len(rank) > k:
+            top = np.argpartition(rank, k)[:k]
+        else:
+            top = np.arange(len(rank))
+        top = top[np.lexsort((person_ids[top], rank[top]))]
+        return [int(person_ids[i]) for i in top]
+
+    def person(self, person_id):
+        """
+        :return: Tuple of name, birth date and death date in the same format as Elasticsearch index returns them
+        """
+        name, birth, death = self.columns.record(person_id)
+        return name, search_date_format(birth), search_date_format(death)
+
+    def find(self, n1):
+        """
+        Finds person by exact name. When there is no exact match, best suggestions are printed
+
+        :return: Tuple (True, name, birth, death) or (False, None), the same as ExportSearch.find
+        """
+        person_id = self.lookup(n1)
+        if person_id is not None:
+            return (True,) + self.person(person_id)
+
+        suggestions = self.suggest(n1)
+        if not suggestions:
+            print("There is no person with this name. Try again.")
+            return False, None
+
+        print("These are the best results. Please specify your query according to this list.")
+        for person_id in suggestions:
+            print(" - %s" % (self.columns.names[person_id]))
+
+        return False, None
+
+    def find_many(self, names):
+        """
+        Resolves exact names in bulk, the same as ExportSearch.find_many
+
+        :return: Dictionary of name to tuple of name, birth date and death date, or None when there is no exact match
+        """
+        resolved = {}
+        for name in dict.fromkeys(names):
+            person_id = self.lookup(name)
+            resolved[name] = None if person_id is None else self.person(person_id)
+        return resolved
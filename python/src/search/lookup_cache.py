@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import json
+import os
+import threading
+
+
+class LookupCache:
+
+    def __init__(self, capacity=100000, path=None):
+        """
+        LRU cache of resolved names. Every entry maps searched name to tuple of name, birth date and death date
+        as returned by search. When path is given, cache is loaded from it and can be saved back with save.
+        Cache can be shared by threads
+
+        :param capacity: Maximum number of cached names, the least recently used name is dropped first
+        :param path: Optional path to JSON file with persisted cache
+        """
+        self.capacity = capacity
+        self.path = path
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def get(self, name):
+        """
+        :return: Tuple of name, birth date and death date or None when name is not cached
+        """
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(name)
+            self.hits += 1
+            return entry
+
+    def put(self, name, entry):
+        with self.lock:
+            self.entries[name] = tuple(entry)
+            self.entries.move_to_end(name)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        return "Lookup cache: {0} hits, {1} misses, {2:.1f}% hit rate, {3} names cached.".format(
+            self.hits, self.misses, self.hit_rate() * 100, len(self))
+
+    def load(self, path):
+        with open(path, encoding="utf-8") as file:
+            for name, entry in json.load(file):
+                self.put(name, entry)
+
+    def save(self, path=None):
+        """
+        Saves cache from the least to the most recently used name, so loading keeps the LRU order
+        """
+        path = path or self.path
+        if path is None:
+            return
+
+        # Write aside and replace, so interrupted save never breaks persisted cache
+        temp_path = path + ".tmp"
+        with self.lock:
+            entries = [[name, list(entry)] for name, entry in self.entries.items()]
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(entries, file, ensure_ascii=False)
+        os.replace(temp_path, path)
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+class MeetingChain:
+
+    def __init__(self, starts, ends):
+        """
+        Finds the shortest chain of persons with pairwise overlapping lifetimes without building a graph.
+        Lifetimes are sorted by birth and for every prefix of this order the person with the latest death
+        is remembered. Going forward in time, the best next hop from a person is the one with the latest
+        death among those born before the person died, so every hop is one binary search and the whole
+        chain takes O(H log N) after O(N log N) build, where H is the length of the chain
+
+        :param starts: numpy array of lifetime starts (day ordinals) indexed by person id
+        :param ends: numpy array of lifetime ends (day ordinals) indexed by person id
+        """
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+
+        self.order = np.argsort(self.starts, kind="stable")
+        self.sorted_starts = self.starts[self.order]
+        sorted_ends = self.ends[self.order]
+
+        # Latest death among persons born up to position and position of the person reaching it
+        self.prefix_max_end = np.maximum.accumulate(sorted_ends)
+        positions = np.arange(len(sorted_ends))
+        self.prefix_max_position = np.maximum.accumulate(np.where(sorted_ends == self.prefix_max_end, positions, 0))
+
+    @classmethod
+    def build(cls, columns):
+        """
+        Builds chain search from ColumnarExport, alive persons end at the end of RuntimeConstants.CURRENT_YEAR
+        """
+        return cls(columns.birth, columns.death)
+
+    def overlap(self, first, second):
+        """
+        :return: Number of days lifetimes of two persons overlap
+        """
+        return max(0, int(min(self.ends[first], self.ends[second]) - max(self.starts[first], self.starts[second])))
+
+    def find(self, first, second):
+        """
+        :param first: Person id where chain starts
+        :param second: Person id where chain ends
+        :return: List of person ids from first to second, each of them could meet the next one,
+                 or None when there is no such chain
+        """
+        if first == second:
+            return [first]
+
+        # Chain is searched forward in time and reversed when second person was born first
+        if self.starts[second] < self.starts[first]:
+            chain = self.find(second, first)
+            return None if chain is None else chain[::-1]
+
+        # Empty lifetime does not overlap anything
+        if self.ends[first] <= self.starts[first] or self.ends[second] <= self.starts[second]:
+            return None
+
+        chain = [first]
+        current = first
+        while self.overlap(current, second) == 0:
+            position = np.searchsorted(self.sorted_starts, self.ends[current], side="left") - 1
+            if position < 0 or self.prefix_max_end[position] <= self.ends[current]:
+                return None
+
+            current = int(self.order[self.prefix_max_position[position]])
+            chain.append(current)
+
+        chain.append(second)
+        return chain
+
+    def hops(self, chain):
+        """
+        :return: List of tuples (person id, person id, overlapping days) for consecutive persons of chain
+        """
+        return [(chain[i], chain[i + 1], self.overlap(chain[i], chain[i + 1])) for i in range(len(chain) - 1)]
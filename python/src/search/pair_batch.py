@@ -0,0 +1,93 @@
+from date_parsing.date_export import DateExport
+from date_parsing.date_ordinal import overlap_days
+from utilities.utils import chunks
+import numpy as np
+import time
+
+
+class PairBatch:
+
+    def __init__(self, search, block_size=50000):
+        """
+        Answers could-they-meet questions for pairs of names from a file. Pairs are read in blocks, names
+        which were not seen yet are resolved by one find_many call per block and every block is evaluated
+        with numpy at once. Every name is resolved only once for the whole file
+
+        :param search: ExportSearch or LocalSearch
+        :param block_size: Number of pairs read, evaluated and written at once
+        """
+        self.search = search
+        self.block_size = block_size
+        # Name to tuple of lifetime start and end day ordinals, or None when name was not found
+        self.intervals = {}
+        self.pairs = 0
+        self.unknown_pairs = 0
+
+    @staticmethod
+    def read_pairs(in_tsv):
+        for line in in_tsv:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            names = line.split("\t")
+            if len(names) < 2:
+                print("Skipping line without two tab separated names:", line)
+                continue
+            yield names[0].strip(), names[1].strip()
+
+    def resolve(self, names):
+        missing = [name for name in dict.fromkeys(names) if name not in self.intervals]
+        if not missing:
+            return
+
+        for name, entry in self.search.find_many(missing).items():
+            if entry is None:
+                self.intervals[name] = None
+            else:
+                self.intervals[name] = (DateExport.interval_ordinal(entry[1]), DateExport.interval_ordinal(entry[2]))
+
+    def evaluate(self, block):
+        """
+        :param block: List of pairs of names
+        :return: Tuple of numpy arrays telling whether both names are known, whether they could meet
+                 and how many days their lifetimes overlap
+        """
+        self.resolve(name for pair in block for name in pair)
+
+        unknown = (0, 0)
+        first = [self.intervals[pair[0]] or unknown for pair in block]
+        second = [self.intervals[pair[1]] or unknown for pair in block]
+        known = np.array([self.intervals[pair[0]] is not None and self.intervals[pair[1]] is not None
+                          for pair in block], dtype=np.bool_)
+
+        first = np.array(first, dtype=np.int64).reshape(-1, 2)
+        second = np.array(second, dtype=np.int64).reshape(-1, 2)
+        days = overlap_days(first[:, 0], first[:, 1], second[:, 0], second[:, 1])
+        return known, known & (days > 0), days
+
+    def run(self, input_path, output_path):
+        """
+        Writes tab separated lines of both names, could meet (true, false or unknown when a name was not found)
+        and number of overlapping days
+
+        :return: Number of answered pairs
+        """
+        start = time.time()
+        with open(input_path, encoding="utf-8") as in_tsv, open(output_path, "w", encoding="utf-8") as out_tsv:
+            for block in chunks(self.read_pairs(in_tsv), self.block_size):
+                known, could_meet, days = self.evaluate(block)
+                lines = []
+                for i, (first, second) in enumerate(block):
+                    if known[i]:
+                        lines.append("%s\t%s\t%s\t%d\n" % (first, second, "true" if could_meet[i] else "false", days[i]))
+                    else:
+                        lines.append("%s\t%s\tunknown\t\n" % (first, second))
+                out_tsv.writelines(lines)
+
+                self.pairs += len(block)
+                self.unknown_pairs += len(block) - int(known.sum())
+
+        elapsed = time.time() - start
+        print("Answered", self.pairs, "pairs in", "%.2f" % elapsed, "s (%.0f pairs/s)," % (self.pairs / max(elapsed, 1e-9)),
+              len(self.intervals), "distinct names resolved,", self.unknown_pairs, "pairs with unknown name.")
+        return self.pairs
@@ -0,0 +1,246 @@
+from date_parsing.date_export import DateExport
+from search.interval_index import LifetimeIndex
+from search.local_search import LocalSearch
+from collections import defaultdict
+from functools import lru_cache
+from urllib.parse import parse_qs
+import numpy as np
+import asyncio
+import bisect
+import json
+import time
+
+
+class LatencyHistogram:
+
+    # Upper bounds of buckets in milliseconds, the last bucket has no bound
+    BOUNDS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, milliseconds):
+        self.counts[bisect.bisect_left(self.BOUNDS, milliseconds)] += 1
+        self.count += 1
+        self.total += milliseconds
+
+    def percentile(self, percent):
+        """
+        :return: Upper bound of bucket containing given percentile, None for the last bucket
+        """
+        rank = self.count * percent / 100
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return self.BOUNDS[i] if i < len(self.BOUNDS) else None
+        return None
+
+    def to_dict(self):
+        buckets = {"<=%g ms" % bound: count for bound, count in zip(self.BOUNDS, self.counts)}
+        buckets[">%g ms" % self.BOUNDS[-1]] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "buckets": buckets
+        }
+
+
+class QueryService:
+
+    ROUTES = ("/person", "/could-meet", "/overlaps")
+
+    def __init__(self, search, cache_size=10000, overlaps_limit=20):
+        """
+        HTTP service answering person, could-meet and overlaps queries. Connections are kept alive and handled
+        concurrently by asyncio, responses are cached by path and query. Local search answers in microseconds,
+        so it runs in the event loop, Elasticsearch requests run in the default thread pool.
+        Overlaps are answered only by local search, because they need columns of all persons
+
+        :param search: LocalSearch or ExportSearch
+        :param cache_size: Number of cached responses
+        :param overlaps_limit: Default number of returned overlaps
+        """
+        self.search = search
+        self.overlaps_limit = overlaps_limit
+        self.offload = not isinstance(search, LocalSearch)
+        self.lifetimes = None if self.offload else LifetimeIndex.build(search.columns)
+        self.histograms = defaultdict(LatencyHistogram)
+        self.cached_response = lru_cache(maxsize=cache_size)(self.respond)
+
+    @staticmethod
+    def person_json(entry):
+        return {"name": entry[0], "birth": entry[1], "death": entry[2]}
+
+    @staticmethod
+    def error(status, message, **details):
+        return status, json.dumps(dict(error=message, **details), ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def ok(body):
+        return 200, json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+    def respond(self, path, query):
+        """
+        :return: Tuple of HTTP status and JSON body as bytes
+        """
+        params = {key: values[0] for key, values in parse_qs(query).items()}
+
+        # Only parameters are validated here, errors of search go to dispatch and are not cached
+        required = ("a", "b") if path == "/could-meet" else ("name",)
+        missing = [name for name in required if name not in params]
+        if missing:
+            return self.error(400, "Missing parameter '{0}'.".format(missing[0]))
+
+        if path == "/person":
+            return self.person(params["name"])
+        if path == "/could-meet":
+            return self.could_meet(params["a"], params["b"])
+
+        try:
+            limit = int(params.get("limit", self.overlaps_limit))
+        except ValueError:
+            return self.error(400, "Limit is not in correct format.")
+        return self.overlaps(params["name"], limit)
+
+    def person(self, name):
+        entry = self.search.find_many([name])[name]
+        if entry is None:
+            suggestions = []
+            if isinstance(self.search, LocalSearch):
+                suggestions = [self.search.columns.names[i] for i in self.search.suggest(name)]
+            return self.error(404, "There is no person with this name.", suggestions=suggestions)
+        return self.ok(self.person_json(entry))
+
+    def could_meet(self, first, second):
+        resolved = self.search.find_many([first, second])
+        unknown = [name for name, entry in resolved.items() if entry is None]
+        if unknown:
+            return self.error(404, "There is no person with this name.", unknown=unknown)
+
+        first, second = resolved[first], resolved[second]
+        days = max(0, min(DateExport.interval_ordinal(first[2]), DateExport.interval_ordinal(second[2])) -
+                   max(DateExport.interval_ordinal(first[1]), DateExport.interval_ordinal(second[1])))
+        return self.ok({"a": self.person_json(first), "b": self.person_json(second),
+                        "could_meet": DateExport.could_meet(first[1], first[2], second[1], second[2]),
+                        "overlap_days": days})
+
+    def overlaps(self, name, limit):
+        if self.lifetimes is None:
+            return self.error(501, "Overlaps need local search backend.")
+
+        person_id = self.search.lookup(name)
+        if person_id is None:
+            return self.error(404, "There is no person with this name.")
+
+        person_ids, days = self.lifetimes.overlaps_person(self.search.columns, person_id)
+        overlaps = []
+        for i in np.argsort(-days, kind="stable")[:max(0, limit)]:
+            overlap = self.person_json(self.search.person(person_ids[i]))
+            overlap["overlap_days"] = int(days[i])
+            overlaps.append(overlap)
+
+        return self.ok({"person": self.person_json(self.search.person(person_id)), "count": len(person_ids),
+                        "overlaps": overlaps})
+
+    def stats(self):
+        cache = self.cached_response.cache_info()
+        lookups = cache.hits + cache.misses
+        return self.ok({
+            "latency": {path: histogram.to_dict() for path, histogram in self.histograms.items()},
+            "cache": {"hits": cache.hits, "misses": cache.misses, "size": cache.currsize,
+                      "hit_rate": cache.hits / lookups if lookups else 0.0}
+        })
+
+    async def dispatch(self, method, target):
+        if method != "GET":
+            return self.error(405, "Only GET is supported.")
+
+        path, _, query = target.partition("?")
+        if path == "/stats":
+            return self.stats()
+        if path not in self.ROUTES:
+            return self.error(404, "Unknown path.")
+
+        try:
+            if self.offload:
+                return await asyncio.get_running_loop().run_in_executor(None, self.cached_response, path, query)
+            return self.cached_response(path, query)
+        except Exception as ex:
+            # e.g. Elasticsearch is not available, error responses are not cached
+            return self.error(500, str(ex))
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                # Request body is not used by any endpoint
+                length = int(headers.get("content-length", 0) or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                start = time.perf_counter()
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    status, body = self.error(400, "Malformed request line.")
+                    version, route = "HTTP/1.0", "other"
+                else:
+                    method, target, version = parts
+                    status, body = await self.dispatch(method, target)
+                    route = target.partition("?")[0]
+                    if route not in self.ROUTES and route != "/stats":
+                        route = "other"
+
+                # HTTP/1.1 connections are kept alive unless client closes them
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                writer.write(self.format_response(status, body, keep_alive))
+                await writer.drain()
+
+                self.histograms[route].add((time.perf_counter() - start) * 1000)
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def format_response(status, body, keep_alive):
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                  500: "Internal Server Error", 501: "Not Implemented"}.get(status, "Error")
+        head = "HTTP/1.1 {0} {1}\r\nContent-Type: application/json; charset=utf-8\r\nContent-Length: {2}\r\n" \
+               "Connection: {3}\r\n\r\n".format(status, reason, len(body), "keep-alive" if keep_alive else "close")
+        return head.encode("latin-1") + body
+
+    async def start(self, host, port):
+        """
+        :return: asyncio server, which is already accepting connections
+        """
+        return await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+
+    def serve(self, host, port):
+        async def run():
+            server = await self.start(host, port)
+            print("Serving on http://{0}:{1}".format(*server.sockets[0].getsockname()[:2]))
+            async with server:
+                await server.serve_forever()
+
+        asyncio.run(run())
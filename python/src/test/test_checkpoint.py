@@ -0,0 +1,70 @@
+from unittest import TestCase
+from parsers.wiki_reader import MediaWikiDumpReader as DumpReader
+from parsers.checkpoint import ParseCheckpoint
+from test.test_wiki_sharder import PAGE
+import os
+import tempfile
+
+
+class TestCheckpointResume(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dump_path = os.path.join(self.directory.name, "dump.xml")
+        self.export_path = os.path.join(self.directory.name, "export.txt")
+        self.checkpoint_path = ParseCheckpoint.default_path(self.export_path)
+
+        with open(self.dump_path, "w", encoding="utf-8") as dump:
+            dump.write("<mediawiki>\n")
+            for i in range(20):
+                dump.write(PAGE.format("Person " + str(i), i, 1800 + i, 1850 + i))
+            dump.write("</mediawiki>\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def parse(self, stop=None, resume=False):
+        with open(self.dump_path, "rb") as in_xml:
+            reader = DumpReader(self.dump_path, in_xml, None, (True, self.export_path), False, quiet=True,
+                                checkpoint=self.checkpoint_path, resume=resume)
+            for count, record in enumerate(reader):
+                if count == stop:
+                    break
+
+    def read_export(self):
+        with open(self.export_path, encoding="utf-8") as export:
+            return export.readlines()
+
+    def test_resume_after_interrupt(self):
+        self.parse()
+        expected = self.read_export()
+        self.assertEqual(len(expected), 20)
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+        self.parse(stop=7)
+        state = ParseCheckpoint(self.checkpoint_path).load(self.dump_path)
+        self.assertEqual(state["last_page_id"], "6")
+
+        # Record written after the checkpoint must not be duplicated
+        with open(self.export_path, "a", encoding="utf-8") as export:
+            export.write("Partial record")
+
+        self.parse(resume=True)
+        self.assertEqual(self.read_export(), expected)
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_resume_without_matching_export(self):
+        self.parse()
+        expected = self.read_export()
+
+        self.parse(stop=7)
+        os.remove(self.export_path)
+        self.parse(resume=True)
+        self.assertEqual(self.read_export(), expected)
+
+        # Shorter export was not written by the interrupted run, it is not padded
+        self.parse(stop=7)
+        with open(self.export_path, "w", encoding="utf-8") as export:
+            export.write("Other run\n")
+        self.parse(resume=True)
+        self.assertEqual(self.read_export(), expected)
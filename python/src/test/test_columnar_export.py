@@ -0,0 +1,43 @@
+from unittest import TestCase
+from date_parsing.date_export import DateExport
+from date_parsing.date_ordinal import date_to_ordinal, ordinal_to_date, days_from_civil, PRECISION_DAY, PRECISION_YEAR
+from search.columnar_export import ColumnarExport
+import numpy as np
+import tempfile
+
+
+RECORDS = [
+    "Abraham Lincoln,12.2.1809 (BC: False),15.4.1865 (BC: False)",
+    "Alexander the Great,20.7.356 (BC: True),10.6.323 (BC: True)",
+    "Arne Kaijser,None.None.1950 (BC: False),'alive'",
+    "Smith, John,None.5.1920 (BC: False),None.None.1990 (BC: False)",
+]
+
+
+class TestColumnarExport(TestCase):
+
+    def test_ordinal_matches_numpy(self):
+        self.assertEqual(days_from_civil(1809, 2, 12), np.datetime64("1809-02-12").astype(np.int64))
+        self.assertEqual(days_from_civil(-356, 7, 20), np.datetime64("-0356-07-20").astype(np.int64))
+
+    def test_ordinal_precision(self):
+        self.assertEqual(date_to_ordinal(1950, None, None, False), (days_from_civil(1950, 12, 31), PRECISION_YEAR))
+        with self.assertRaises(ValueError):
+            date_to_ordinal(1900, 2, 29, False)
+        self.assertEqual(ordinal_to_date(*date_to_ordinal(356, 7, 20, True)), (356, 7, 20, True))
+
+    def test_save_and_load(self):
+        columns = ColumnarExport.from_records(DateExport.parse_export_record(line) for line in RECORDS)
+
+        with tempfile.TemporaryDirectory() as directory:
+            columns.save(directory)
+            loaded = ColumnarExport.load(directory)
+
+            self.assertIsInstance(loaded.birth, np.memmap)
+            self.assertEqual(len(loaded), len(RECORDS))
+            for i, line in enumerate(RECORDS):
+                name, birth, death = loaded.record(i)
+                self.assertEqual(name + "," + birth.__repr__() + "," + death.__repr__(), line)
+
+            self.assertEqual(list(loaded.alive), [False, False, True, False])
+            del loaded
@@ -0,0 +1,40 @@
+from unittest import TestCase
+from date_parsing.date_export import DateExport
+from date_parsing.date_ordinal import PRECISION_MONTH
+import numpy as np
+
+
+class TestDateExport(TestCase):
+
+    def test_compact_date(self):
+        date = DateExport(1809, 2, None)
+        self.assertEqual(date.precision, PRECISION_MONTH)
+        self.assertEqual((date.year, date.month, date.day, date.BC), (1809, 2, None, False))
+        self.assertFalse(hasattr(date, "__dict__"))
+
+        date = DateExport(356, "7", "20")
+        date.BC = True
+        self.assertEqual(date.__repr__(), "20.7.356 (BC: True)")
+        self.assertEqual(DateExport.from_ordinal(date.ordinal, date.precision).__repr__(), "20.7.356 (BC: True)")
+
+    def test_invalid_date_is_rejected(self):
+        # Year 0 BC would be stored as year 0 AD and lose its BC flag
+        for year, month, day, bc in ((1809, 2, 30, False), (1809, 13, None, False), (1809, 0, 1, False), (0, None, None, True)):
+            with self.assertRaises(ValueError):
+                DateExport(year, month, day, bc)
+
+        self.assertEqual(DateExport(1808, 2, 29).__repr__(), "29.2.1808 (BC: False)")
+        self.assertEqual(DateExport(1, None, None, True).__repr__(), "None.None.1 (BC: True)")
+
+    def test_could_meet(self):
+        self.assertTrue(DateExport.could_meet("14.3.1879 ", "18.4.1955 ", "29.12.1809 ", "2.4.1891 "))
+        self.assertFalse(DateExport.could_meet("20.7.356 BC", "10.6.323 BC", "None.None.1950 ", "alive"))
+        self.assertTrue(DateExport.could_meet("None.None.42 BC", "None.None.14 ", "1.1.10 ", "alive"))
+        self.assertFalse(DateExport.could_meet(DateExport(1900, 1, 1), DateExport(1950, 1, 1),
+                                               DateExport(1950, 1, 1), "alive"))
+
+    def test_could_meet_many(self):
+        starts = np.array([0, 10, 20])
+        ends = np.array([10, 20, 30])
+        self.assertEqual(DateExport.could_meet_many(starts, ends, 9, 10).tolist(), [True, False, False])
+        self.assertEqual(DateExport.could_meet_many(starts, ends, starts[::-1], ends[::-1]).tolist(), [False, True, False])
@@ -0,0 +1,37 @@
+from unittest import TestCase
+from date_parsing.date_extractor import BIRTH_DATE_EXTRACTOR, DEATH_DATE_EXTRACTOR
+
+
+class TestInfoboxDateExtractor(TestCase):
+
+    def assertExtracted(self, extractor, line, expected, rule):
+        found, date = extractor.extract(line)
+        self.assertTrue(found)
+        self.assertEqual(date.__repr__(), expected)
+        self.assertEqual(extractor.last_rule, rule)
+
+    def test_birth_formats(self):
+        self.assertExtracted(BIRTH_DATE_EXTRACTOR, "{{infobox person | birth_date = {{birth date|1809|2|12}}",
+                             "12.2.1809 (BC: False)", "year_month_day")
+        self.assertExtracted(BIRTH_DATE_EXTRACTOR, "{{infobox royalty | birth_date = 20 july 356 bc",
+                             "20.7.356 (BC: True)", "day_month_year")
+        self.assertExtracted(BIRTH_DATE_EXTRACTOR, "{{infobox person | birth_date = march 5, 1901 |",
+                             "5.3.1901 (BC: False)", "month_day_year")
+        self.assertExtracted(BIRTH_DATE_EXTRACTOR, "{{infobox person | birth_date = circa 650 bc |",
+                             "None.None.650 (BC: True)", "circa_bc")
+
+    def test_death_formats(self):
+        self.assertExtracted(DEATH_DATE_EXTRACTOR, "infobox | death_date = {{death date and age|1865|4|15|1809|2|12}}",
+                             "15.4.1865 (BC: False)", "year_month_day")
+        self.assertExtracted(DEATH_DATE_EXTRACTOR, "infobox | death_date|mf=yes|may, 1920 |",
+                             "None.5.1920 (BC: False)", "month_year")
+
+    def test_invalid_date_tries_next_rule(self):
+        self.assertExtracted(BIRTH_DATE_EXTRACTOR, "{{infobox person | birth_date = {{birth date|1809|2|30}}",
+                             "None.None.1809 (BC: False)", "year")
+        self.assertEqual(BIRTH_DATE_EXTRACTOR.extract("{{infobox person | birth_date = 30 february 1809 |"), (False, None))
+
+    def test_requires_infobox_and_key(self):
+        self.assertEqual(BIRTH_DATE_EXTRACTOR.extract("birth_date = {{birth date|1809|2|12}}"), (False, None))
+        self.assertEqual(DEATH_DATE_EXTRACTOR.extract("infobox | birth_date = 1809"), (False, None))
+        self.assertIsNone(DEATH_DATE_EXTRACTOR.last_rule)
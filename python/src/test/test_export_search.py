@@ -0,0 +1,180 @@
+from unittest import TestCase
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from search.export_search import ExportSearch
+from elasticsearch import TransportError
+from search.lookup_cache import LookupCache
+import json
+import os
+import tempfile
+import threading
+
+
+class StandInElasticsearch(BaseHTTPRequestHandler):
+    """
+    Minimal Elasticsearch 7 HTTP API: info, index settings, refresh, bulk and msearch with exact name match.
+    The first bulk_rejections bulk requests are rejected with 429 for every document
+    """
+
+    def send_json(self, body, status=200):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("X-Elastic-Product", "Elasticsearch")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+
+    def do_GET(self):
+        server = self.server
+        if self.path.split("?")[0] == "/people/_settings":
+            self.send_json({"people": {"settings": {"index": dict(server.settings)}}})
+        else:
+            self.send_json({"version": {"number": "7.17.0", "build_flavor": "default"}, "tagline": "You Know, for Search"})
+
+    def do_PUT(self):
+        server = self.server
+        with server.lock:
+            for key, value in json.loads(self.read_body())["index"].items():
+                if value is None:
+                    server.settings.pop(key, None)
+                else:
+                    server.settings[key] = str(value)
+            server.settings_history.append(dict(server.settings))
+        self.send_json({"acknowledged": True})
+
+    def do_POST(self):
+        server = self.server
+        if "_refresh" in self.path:
+            server.refreshed = True
+            self.send_json({"_shards": {"failed": 0}})
+            return
+
+        if "_msearch" in self.path:
+            self.msearch()
+            return
+
+        lines = self.read_body().splitlines()
+        documents = [json.loads(line) for line in lines[1::2]]
+        with server.lock:
+            reject = server.bulk_rejections > 0
+            server.bulk_rejections -= 1
+            server.bulk_sizes.append(len(documents))
+            if not reject:
+                server.documents.extend(documents)
+                server.settings_during_load.append(dict(server.settings))
+
+        status = 429 if reject else 201
+        items = [{"index": {"_index": "people", "status": status}} for _ in documents]
+        self.send_json({"took": 1, "errors": reject, "items": items})
+
+    def msearch(self):
+        server = self.server
+        queries = [json.loads(line) for line in self.read_body().splitlines()[1::2]]
+        server.msearch_requests += 1
+
+        responses = []
+        for query in queries:
+            name = query["query"]["match"]["name"]
+            if name in server.msearch_errors:
+                responses.append({"error": {"type": "es_rejected_execution_exception", "reason": "rejected"}, "status": 429})
+                continue
+            hits = [{"_source": document} for document in server.documents if document["name"] == name]
+            responses.append({"hits": {"hits": hits[:query.get("size", 10)]}, "status": 200})
+        self.send_json({"took": 1, "responses": responses})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestExportSearch(TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInElasticsearch)
+        self.server.lock = threading.Lock()
+        self.server.settings = {"refresh_interval": "5s", "number_of_replicas": "1"}
+        self.server.settings_history = []
+        self.server.settings_during_load = []
+        self.server.documents = []
+        self.server.bulk_sizes = []
+        self.server.bulk_rejections = 1
+        self.server.refreshed = False
+        self.server.msearch_requests = 0
+        self.server.msearch_errors = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.search = ExportSearch("people", [{'host': '127.0.0.1', 'port': self.server.server_address[1]}])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_insert_data(self):
+        with tempfile.TemporaryDirectory() as directory:
+            export_path = os.path.join(directory, "export.txt")
+            with open(export_path, "w", encoding="utf-8") as export:
+                for i in range(23):
+                    export.write("Person %d,1.1.%d (BC: False),'alive'\n" % (i, 1900 + i))
+                export.write("Smith, John,None.None.356 (BC: True),None.None.300 (BC: True)\n")
+
+            indexed, failed = self.search.insert_data(export_path, 5, threads=3, initial_backoff=0.01)
+
+        # The last partial chunk is sent too and the rejected chunk is retried
+        self.assertEqual((indexed, failed), (24, 0))
+        self.assertEqual(len(self.server.documents), 24)
+        self.assertEqual(sorted(self.server.bulk_sizes)[-1], 5)
+        self.assertIn({"name": "Smith- John", "birthdate": "None.None.356 BC", "deathdate": "None.None.300 BC"},
+                      self.server.documents)
+        self.assertIn({"name": "Person 3", "birthdate": "1.1.1903 ", "deathdate": "alive"}, self.server.documents)
+
+        # Refresh and replicas are off during the load and restored afterwards
+        self.assertTrue(all(settings == {"refresh_interval": "-1", "number_of_replicas": "0"}
+                            for settings in self.server.settings_during_load))
+        self.assertEqual(self.server.settings, {"refresh_interval": "5s", "number_of_replicas": "1"})
+        self.assertTrue(self.server.refreshed)
+
+    def test_find_many_with_cache(self):
+        self.server.documents.extend([
+            {"name": "Albert Einstein", "birthdate": "14.3.1879 ", "deathdate": "18.4.1955 "},
+            {"name": "Buzz Aldrin", "birthdate": "20.1.1930 ", "deathdate": "alive"},
+        ])
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, "cache.json")
+            self.search.cache = LookupCache(path=cache_path)
+
+            resolved = self.search.find_many(["Buzz Aldrin", "Albert Einstein", "Nobody", "Buzz Aldrin"])
+            self.assertEqual(resolved, {"Buzz Aldrin": ("Buzz Aldrin", "20.1.1930 ", "alive"),
+                                        "Albert Einstein": ("Albert Einstein", "14.3.1879 ", "18.4.1955 "),
+                                        "Nobody": None})
+            self.assertEqual(self.server.msearch_requests, 1)
+
+            # Resolved names never reach the server again
+            self.assertEqual(self.search.find("Albert Einstein"), (True, "Albert Einstein", "14.3.1879 ", "18.4.1955 "))
+            self.search.find_many(["Buzz Aldrin", "Albert Einstein"])
+            self.assertEqual(self.server.msearch_requests, 1)
+            self.assertEqual((self.search.cache.hits, self.search.cache.misses), (3, 3))
+
+            self.search.cache.save()
+            self.assertEqual(list(LookupCache(path=cache_path).entries), ["Buzz Aldrin", "Albert Einstein"])
+
+    def test_find_many_error_is_raised(self):
+        self.server.documents.append({"name": "Buzz Aldrin", "birthdate": "20.1.1930 ", "deathdate": "alive"})
+        self.server.msearch_errors.add("Albert Einstein")
+        self.search.cache = LookupCache()
+
+        with self.assertRaises(TransportError) as raised:
+            self.search.find_many(["Buzz Aldrin", "Albert Einstein"])
+        self.assertEqual(raised.exception.status_code, 429)
+        self.assertIsNone(self.search.cache.get("Albert Einstein"))
+
+    def test_cache_eviction(self):
+        cache = LookupCache(capacity=2)
+        cache.put("a", ("a", "1", "2"))
+        cache.put("b", ("b", "1", "2"))
+        cache.get("a")
+        cache.put("c", ("c", "1", "2"))
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertAlmostEqual(cache.hit_rate(), 1.0)
@@ -0,0 +1,51 @@
+from unittest import TestCase
+from date_parsing.date_export import DateExport
+from search.columnar_export import ColumnarExport
+from search.local_search import LocalSearch
+from search.group_overlaps import GroupOverlaps, overlapping_pairs
+import numpy as np
+import os
+import tempfile
+
+
+RECORDS = [
+    "Albert Einstein,14.3.1879 (BC: False),18.4.1955 (BC: False)",
+    "Albert Pike,29.12.1809 (BC: False),2.4.1891 (BC: False)",
+    "Abraham Lincoln,12.2.1809 (BC: False),15.4.1865 (BC: False)",
+    "Alexander the Great,20.7.356 (BC: True),10.6.323 (BC: True)",
+]
+
+
+class TestGroupOverlaps(TestCase):
+
+    def test_matches_all_pairs(self):
+        rng = np.random.default_rng(11)
+        starts = rng.integers(0, 3000, 300)
+        ends = starts + rng.integers(0, 200, 300)
+
+        expected = [(i, j, min(ends[i], ends[j]) - max(starts[i], starts[j]))
+                    for i in range(300) for j in range(i + 1, 300)
+                    if min(ends[i], ends[j]) - max(starts[i], starts[j]) > 0]
+        first, second, days = overlapping_pairs(starts, ends)
+        self.assertEqual(list(zip(first.tolist(), second.tolist(), days.tolist())), expected)
+
+    def test_group(self):
+        columns = ColumnarExport.from_records(DateExport.parse_export_record(line) for line in RECORDS)
+        group = GroupOverlaps(LocalSearch.build(columns))
+        group.resolve(["Alexander the Great", "Albert Einstein", "Nobody", "Albert Pike", "Abraham Lincoln"])
+        self.assertEqual(group.unknown_names, ["Nobody"])
+
+        first, second, days = group.pairs()
+        pairs = [(group.names[i], group.names[j]) for i, j in zip(first, second)]
+        self.assertEqual(pairs, [("Albert Einstein", "Albert Pike"), ("Albert Pike", "Abraham Lincoln")])
+
+        with tempfile.TemporaryDirectory() as directory:
+            group.save(os.path.join(directory, "matrix.npz"), first, second, days)
+            matrix = np.load(os.path.join(directory, "matrix.npz"))
+            self.assertEqual(matrix["overlap_days"].tolist(), days.tolist())
+            self.assertEqual(matrix["shape"].tolist(), [4, 4])
+
+            group.save(os.path.join(directory, "matrix.csv"), first, second, days)
+            with open(os.path.join(directory, "matrix.csv"), encoding="utf-8") as matrix_csv:
+                lines = matrix_csv.read().splitlines()
+            self.assertEqual(lines[1], "1,2,%d,Albert Einstein,Albert Pike" % days[0])
@@ -0,0 +1,52 @@
+from unittest import TestCase
+from parsers.wiki_reader import MediaWikiDumpReader as DumpReader
+from parsers.revision_table import RevisionTable
+from test.test_wiki_sharder import PAGE
+import os
+import tempfile
+
+
+class TestIncrementalExport(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_dump(self, name, death_years):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as dump:
+            dump.write("<mediawiki>\n")
+            for i, death_year in enumerate(death_years):
+                # Revision id of the test page is its page id, so sha1 is used to tell that a page changed
+                dump.write(PAGE.format("Person " + str(i), i, 1800 + i, death_year)
+                           .replace("</revision>", "  <sha1>{0}</sha1>\n    </revision>".format(death_year)))
+            dump.write("</mediawiki>\n")
+        return path
+
+    def parse(self, dump_path, export_name, previous_export=None):
+        export_path = os.path.join(self.directory.name, export_name)
+        previous_revisions = RevisionTable.path_for(previous_export) if previous_export else None
+        with open(dump_path, "rb") as in_xml:
+            reader = DumpReader(dump_path, in_xml, None, (True, export_path), False, quiet=True,
+                                previous_revisions=previous_revisions)
+            records = list(reader)
+        return export_path, reader, records
+
+    def test_only_changed_pages_are_extracted(self):
+        old_dump = self.write_dump("old.xml", [1850, 1851, 1852, 1853])
+        new_dump = self.write_dump("new.xml", [1850, 1861, 1852, 1853, 1854])
+
+        old_export, reader, records = self.parse(old_dump, "old.txt")
+        full_export, reader, records = self.parse(new_dump, "full.txt")
+        incremental_export, reader, records = self.parse(new_dump, "incremental.txt", old_export)
+
+        self.assertEqual(reader.pages_copied, 3)
+        self.assertEqual(reader.pages_extracted, 2)
+        self.assertEqual(records[1]["death_date"].year, 1861)
+
+        for path in (full_export, RevisionTable.path_for(full_export)):
+            with open(path, encoding="utf-8") as full, \
+                    open(path.replace("full.txt", "incremental.txt"), encoding="utf-8") as incremental:
+                self.assertEqual(incremental.read(), full.read())
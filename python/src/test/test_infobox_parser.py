@@ -0,0 +1,56 @@
+from unittest import TestCase
+from parsers.infobox_parser import infobox_fields, template_fields, lead_section
+from parsers.wiki_reader import MediaWikiDumpReader as DumpReader
+import os
+
+
+class TestInfoboxParser(TestCase):
+
+    def test_nested_templates_and_links(self):
+        text = "{{infobox person\n| name = [[john smith|john]]\n| birth_date = {{birth date|1809|2|12}}\n" \
+               "| death_date = {{death date and age|1865|4|15|1809|2|12}}<ref>{{cite web|url=x}}</ref>\n}}\nlead"
+        self.assertEqual(template_fields(text, 0), {
+            "name": "[[john smith|john]]",
+            "birth date": "{{birth date|1809|2|12}}",
+            "death date": "{{death date and age|1865|4|15|1809|2|12}}<ref>{{cite web|url=x}}</ref>"
+        })
+
+    def test_comments_and_unclosed_template(self):
+        fields = template_fields("{{infobox | birth_date = <!-- {{birth date|yyyy|mm|dd}} | -->1901 | death_date = 1950", 0)
+        self.assertEqual(fields, {"birth date": "1901", "death date": "1950"})
+
+    def test_nested_infobox(self):
+        text = "{{infobox officeholder | name = a | module = {{ infobox_military person | birth_date = 1900 }} }}" \
+               "{{infobox person | birth_date = 1800 | death_date = 1950}}"
+        fields = infobox_fields(text)
+        self.assertEqual(fields["birth date"], "1900")
+        self.assertEqual(fields["death date"], "1950")
+        self.assertEqual(infobox_fields("{{birth date|1809|2|12}} no infobox"), {})
+
+    def test_lead_section(self):
+        self.assertEqual(lead_section("'''a''' (1900\n-1950)\nwas.\n== life ==\nb (1800-1850)"), "'''a''' (1900 -1950) was.")
+
+
+class TestExtractPerson(TestCase):
+
+    def setUp(self):
+        self.reader = DumpReader(os.devnull, None, None, (False, ""), quiet=True)
+
+    def extract(self, text):
+        entity = self.reader.extract_person("John Smith", text)
+        return entity and (repr(entity["birth_date"]), repr(entity["death_date"]))
+
+    def test_field_is_not_cut_by_page_length(self):
+        # Old 5000 characters chunks cut infobox behind long introduction
+        text = "x " * 2497 + "{{Infobox person\n| birth_date = {{birth date|1809|2|12}}\n| death_date = " \
+               "{{death date|1865|4|15}}\n}}"
+        self.assertEqual(self.extract(text), self.extract(text[2 * 2497:]))
+        self.assertIsNotNone(self.extract(text))
+
+    def test_date_template_in_other_field(self):
+        text = "{{Infobox person\n| born = {{birth date|1809|2|12}}\n| died = 15 April 1865\n| death_date = 15 April 1865\n}}"
+        self.assertEqual(self.extract(text), ("12.2.1809 (BC: False)", "15.4.1865 (BC: False)"))
+
+    def test_dates_outside_infobox_are_ignored(self):
+        text = "'''John Smith''' was born.\n{{birth date|1809|2|12}}\n{{Infobox person\n| name = John Smith\n}}"
+        self.assertIsNone(self.extract(text))
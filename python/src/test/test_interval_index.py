@@ -0,0 +1,41 @@
+from unittest import TestCase
+from date_parsing.date_export import DateExport
+from search.columnar_export import ColumnarExport
+from search.interval_index import LifetimeIndex
+import numpy as np
+
+
+RECORDS = [
+    "Albert Einstein,14.3.1879 (BC: False),18.4.1955 (BC: False)",
+    "Isaac Newton,4.1.1643 (BC: False),31.3.1727 (BC: False)",
+    "Bertrand Russell,18.5.1872 (BC: False),2.2.1970 (BC: False)",
+    "Alexander the Great,20.7.356 (BC: True),10.6.323 (BC: True)",
+    "Buzz Aldrin,20.1.1930 (BC: False),'alive'",
+    "Some Infant,1.1.1950 (BC: False),5.1.1950 (BC: False)",
+]
+
+
+class TestLifetimeIndex(TestCase):
+
+    def test_person_overlaps(self):
+        columns = ColumnarExport.from_records(DateExport.parse_export_record(line) for line in RECORDS)
+        index = LifetimeIndex.build(columns)
+
+        person_ids, days = index.overlaps_person(columns, 0)
+        self.assertEqual(person_ids.tolist(), [2, 4, 5])
+        self.assertEqual(days.tolist(), [int(columns.death[0] - columns.birth[0]),
+                                         int(columns.death[0] - columns.birth[4]), 4])
+
+        self.assertEqual(index.overlaps_person(columns, 3)[0].tolist(), [])
+
+    def test_matches_full_scan(self):
+        rng = np.random.default_rng(7)
+        starts = rng.integers(-800000, 20000, 2000)
+        ends = starts + rng.integers(0, 40000, 2000)
+        index = LifetimeIndex.from_intervals(starts, ends)
+
+        for start, end in ((-400000, -390000), (0, 1), (19000, 60000), (-900000, -850000)):
+            days = np.minimum(ends, end) - np.maximum(starts, start)
+            person_ids, found_days = index.overlaps(start, end)
+            self.assertEqual(person_ids.tolist(), np.flatnonzero(days > 0).tolist())
+            self.assertEqual(found_days.tolist(), days[days > 0].tolist())
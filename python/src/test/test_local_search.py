@@ -0,0 +1,44 @@
+from unittest import TestCase
+from date_parsing.date_export import DateExport
+from search.columnar_export import ColumnarExport
+from search.local_search import LocalSearch
+import tempfile
+
+
+RECORDS = [
+    "Albert Einstein,14.3.1879 (BC: False),18.4.1955 (BC: False)",
+    "Albert Camus,7.11.1913 (BC: False),4.1.1960 (BC: False)",
+    "Alberto Albert,None.None.1950 (BC: False),'alive'",
+    "Alexander the Great,20.7.356 (BC: True),10.6.323 (BC: True)",
+    "Elsa Einstein,18.1.1876 (BC: False),20.12.1936 (BC: False)",
+]
+
+
+class TestLocalSearch(TestCase):
+
+    def setUp(self):
+        columns = ColumnarExport.from_records(DateExport.parse_export_record(line) for line in RECORDS)
+        self.search = LocalSearch.build(columns)
+
+    def names(self, person_ids):
+        return [self.search.columns.names[i] for i in person_ids]
+
+    def test_exact_lookup(self):
+        self.assertEqual(self.search.find("Albert Einstein"), (True, "Albert Einstein", "14.3.1879 ", "18.4.1955 "))
+        self.assertEqual(self.search.find("Alexander the Great")[2:], ("20.7.356 BC", "10.6.323 BC"))
+        self.assertIsNone(self.search.lookup("albert einstein"))
+        self.assertEqual(self.search.find("Nobody"), (False, None))
+
+    def test_suggest(self):
+        self.assertEqual(self.names(self.search.suggest("einst")), ["Elsa Einstein", "Albert Einstein"])
+        self.assertEqual(self.names(self.search.suggest("Einstein Albert", 2)), ["Albert Einstein", "Albert Camus"])
+        self.assertEqual(self.names(self.search.suggest("alb", 1)), ["Albert Camus"])
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.search.save(directory)
+            self.assertTrue(LocalSearch.is_index(directory))
+
+            loaded = LocalSearch.open(directory)
+            self.assertEqual(loaded.find("Alberto Albert"), (True, "Alberto Albert", "None.None.1950 ", "alive"))
+            self.assertEqual(loaded.suggest("cam"), self.search.suggest("cam"))
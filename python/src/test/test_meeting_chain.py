@@ -0,0 +1,47 @@
+from unittest import TestCase
+from search.meeting_chain import MeetingChain
+import collections
+import numpy as np
+
+
+class TestMeetingChain(TestCase):
+
+    def test_chain(self):
+        # 0 and 4 are linked through 1 and 3, 2 is a shorter lifetime which is not the best hop
+        starts = np.array([0, 50, 60, 90, 130, 500])
+        ends = np.array([60, 100, 70, 140, 200, 600])
+        chain_search = MeetingChain(starts, ends)
+
+        self.assertEqual(chain_search.find(0, 4), [0, 1, 3, 4])
+        self.assertEqual(chain_search.find(4, 0), [4, 3, 1, 0])
+        self.assertEqual(chain_search.find(0, 1), [0, 1])
+        self.assertIsNone(chain_search.find(0, 5))
+        self.assertEqual(chain_search.hops([0, 1, 3]), [(0, 1, 10), (1, 3, 10)])
+
+    def test_shortest_as_breadth_first_search(self):
+        rng = np.random.default_rng(3)
+        starts = rng.integers(0, 2000, 80)
+        ends = starts + rng.integers(1, 150, 80)
+        chain_search = MeetingChain(starts, ends)
+
+        def could_meet(i, j):
+            return min(ends[i], ends[j]) - max(starts[i], starts[j]) > 0
+
+        for first in range(0, 80, 7):
+            distance = {first: 0}
+            queue = collections.deque([first])
+            while queue:
+                person = queue.popleft()
+                for other in range(80):
+                    if other not in distance and could_meet(person, other):
+                        distance[other] = distance[person] + 1
+                        queue.append(other)
+
+            for second in range(80):
+                chain = chain_search.find(first, second)
+                if second not in distance:
+                    self.assertIsNone(chain)
+                    continue
+
+                self.assertEqual(len(chain) - 1, distance[second])
+                self.assertTrue(all(could_meet(chain[i], chain[i + 1]) for i in range(len(chain) - 1)))
@@ -0,0 +1,64 @@
+from unittest import TestCase
+from parsers.mmap_splitter import MmapDumpSplitter
+from parsers.wiki_reader import MediaWikiDumpReader as DumpReader
+from benchmarks.synthetic_dump import SyntheticDump
+from lxml import etree
+import os
+import tempfile
+
+
+class TestMmapDumpSplitter(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dump_path = os.path.join(self.directory.name, "synthetic.xml")
+        self.dump = SyntheticDump(pages=500, person_ratio=0.4, seed=5).write(self.dump_path)
+        self.splitter = MmapDumpSplitter(self.dump_path, os.path.join(self.directory.name, "split.xml"), threads=3)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_shards(self, paths):
+        """
+        :return: Export lines of all shards in shard order
+        """
+        records = []
+        for path in paths:
+            export_path = path + ".txt"
+            with open(path, "rb") as shard:
+                for _ in DumpReader(path, shard, None, (True, export_path), quiet=True):
+                    pass
+            with open(export_path, encoding="utf-8") as export:
+                records.extend(export.read().splitlines())
+        return records
+
+    def page_count(self, path):
+        return sum(1 for _ in etree.parse(path).getroot().iter("{*}page"))
+
+    def test_split_by_count(self):
+        paths = self.splitter.split(parts=4)
+
+        self.assertEqual(len(paths), 4)
+        self.assertEqual(sum(self.page_count(path) for path in paths), 500)
+        self.assertEqual(self.read_shards(paths), self.dump.expected_records)
+
+    def test_split_by_size(self):
+        size = os.path.getsize(self.dump_path) // 10
+        paths = self.splitter.split(size=size)
+
+        with open(self.dump_path, "rb") as dump:
+            header = dump.read().find(b"<page>")
+        self.assertGreaterEqual(len(paths), 10)
+        for path in paths:
+            self.assertLessEqual(os.path.getsize(path), size + header + len("\n</mediawiki>\n"))
+        self.assertEqual(self.read_shards(paths), self.dump.expected_records)
+
+    def test_page_larger_than_size(self):
+        paths = self.splitter.split(size=10)
+        self.assertEqual(len(paths), 500)
+        self.assertEqual(self.page_count(paths[0]), 1)
+
+    def test_more_parts_than_pages(self):
+        SyntheticDump(pages=2, seed=5).write(self.dump_path)
+        paths = self.splitter.split(parts=8)
+        self.assertEqual([self.page_count(path) for path in paths], [1, 1])
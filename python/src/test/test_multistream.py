@@ -0,0 +1,72 @@
+from unittest import TestCase
+from parsers.multistream import MultistreamDumpStream, open_dump, default_index_path, read_stream_offsets
+import bz2
+import os
+import tempfile
+
+
+HEADER = b'<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/">\n  <siteinfo></siteinfo>\n'
+PAGE = b"  <page>\n    <title>Page %d</title>\n    <ns>0</ns>\n    <id>%d</id>\n  </page>\n"
+FOOTER = b"</mediawiki>\n"
+
+
+class TestMultistreamDumpStream(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dump_path = os.path.join(self.directory.name, "wiki-pages-articles-multistream.xml.bz2")
+        index_path = os.path.join(self.directory.name, "wiki-pages-articles-multistream-index.txt.bz2")
+
+        # Header, streams of 3 pages and footer, each compressed as an independent bz2 stream
+        dump = bytearray(bz2.compress(HEADER))
+        index = []
+        self.xml = HEADER
+        for stream in range(5):
+            offset = len(dump)
+            pages = b""
+            for page_id in range(stream * 3, stream * 3 + 3):
+                pages += PAGE % (page_id, page_id)
+                index.append(b"%d:%d:Page %d\n" % (offset, page_id, page_id))
+            dump += bz2.compress(pages)
+            self.xml += pages
+        dump += bz2.compress(FOOTER)
+        self.xml += FOOTER
+
+        with open(self.dump_path, "wb") as file:
+            file.write(dump)
+        with open(index_path, "wb") as file:
+            file.write(bz2.compress(b"".join(index)))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_all(self, stream, size):
+        chunks = []
+        chunk = stream.read(size)
+        while chunk:
+            chunks.append(chunk)
+            chunk = stream.read(size)
+        return b"".join(chunks)
+
+    def test_index(self):
+        index_path = default_index_path(self.dump_path)
+        self.assertIsNotNone(index_path)
+        self.assertEqual(len(read_stream_offsets(index_path)), 5)
+
+    def test_serial_and_parallel_read_whole_document(self):
+        for workers in (0, 3):
+            with open_dump(self.dump_path, workers=workers) as stream:
+                self.assertIsInstance(stream, MultistreamDumpStream)
+                self.assertEqual(self.read_all(stream, 7), self.xml)
+
+    def test_shard_contains_only_pages(self):
+        index_path = default_index_path(self.dump_path)
+        offsets = read_stream_offsets(index_path)
+        ranges = list(zip(offsets, offsets[1:] + [os.path.getsize(self.dump_path)]))
+
+        with MultistreamDumpStream(self.dump_path, ranges[3:], prefix=b"<pages>", suffix=b"</pages>",
+                                   first_stream_only=True) as stream:
+            data = stream.read()
+
+        expected = b"".join(PAGE % (page_id, page_id) for page_id in range(9, 15))
+        self.assertEqual(data, b"<pages>" + expected + b"</pages>")
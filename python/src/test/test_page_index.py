@@ -0,0 +1,55 @@
+from unittest import TestCase
+from parsers.page_index import PageIndex
+from parsers.wiki_reader import MediaWikiDumpReader as DumpReader
+from benchmarks.synthetic_dump import SyntheticDump
+from lxml import etree
+import os
+import tempfile
+
+
+class TestPageIndex(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dump_path = os.path.join(self.directory.name, "synthetic.xml")
+        self.index_path = os.path.join(self.directory.name, "page_index")
+        self.dump = SyntheticDump(pages=300, person_ratio=0.5, seed=11).write(self.dump_path)
+        PageIndex.build(self.dump_path).save(self.index_path)
+        self.index = PageIndex.load(self.index_path)
+
+    def tearDown(self):
+        self.index = None
+        self.directory.cleanup()
+
+    def test_every_page_is_indexed(self):
+        self.assertTrue(PageIndex.is_index(self.index_path))
+        self.assertEqual(len(self.index), 300)
+        self.assertEqual(self.index.entry("Topic 100000"), None)
+
+        with open(self.dump_path, "rb") as dump:
+            data = dump.read()
+        for i in range(len(self.index)):
+            offset, length = int(self.index.offsets[i]), int(self.index.lengths[i])
+            self.assertTrue(data[offset:offset + length].startswith(b"<page>"))
+            self.assertTrue(data[offset:offset + length].endswith(b"</page>"))
+
+    def test_read_page_and_extract_person(self):
+        reader = DumpReader(self.dump_path, None, None, (False, ""), quiet=True)
+        for expected in self.dump.expected_records[:20]:
+            title = expected.split(",")[0]
+            page = etree.fromstring(self.index.read_page(self.dump_path, title))
+            self.assertEqual(page.findtext("{*}title"), title)
+            self.assertEqual(int(page.findtext("{*}id")), self.index.entry(title)[2])
+
+            entity = reader.extract_person(title, page.findtext("{*}revision/{*}text"))
+            self.assertEqual(",".join((entity["name"], repr(entity["birth_date"]), repr(entity["death_date"]))), expected)
+
+    def test_pages_in_dump_order(self):
+        titles = [record.split(",")[0] for record in self.dump.expected_records[:10]]
+        pages = list(self.index.pages(self.dump_path, list(reversed(titles)) + ["Missing title"]))
+        self.assertEqual([title for title, _ in pages], titles)
+
+    def test_other_dump_is_rejected(self):
+        SyntheticDump(pages=10, seed=1).write(self.dump_path)
+        with self.assertRaises(ValueError):
+            self.index.read_page(self.dump_path, "Topic 1")
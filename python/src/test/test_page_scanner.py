@@ -0,0 +1,33 @@
+from unittest import TestCase
+from parsers.page_scanner import RawPageScanner, PagePrefilter
+import io
+
+
+def page(title, text, namespace=0, redirect=False):
+    return ("<page><title>{0}</title><ns>{1}</ns>{2}<revision><text>{3}</text></revision></page>".format(
+        title, namespace, '<redirect title="X" />' if redirect else "", text)).encode()
+
+
+class TestRawPageScanner(TestCase):
+
+    def test_pages_across_blocks(self):
+        pages = [page("Page " + str(i), "x" * (i * 7)) for i in range(30)]
+        data = b"<mediawiki><siteinfo/>\n" + b"\n".join(pages) + b"\n</mediawiki>"
+
+        scanned = list(RawPageScanner(io.BytesIO(data), block_size=16))
+
+        self.assertEqual([raw for offset, raw in scanned], pages)
+        for offset, raw in scanned:
+            self.assertEqual(data[offset:offset + len(raw)], raw)
+
+    def test_prefilter(self):
+        prefilter = PagePrefilter()
+
+        self.assertTrue(prefilter.accept(page("Einstein", "[[Category:1879 births]]")))
+        self.assertFalse(prefilter.accept(page("Prague", "[[Category:Cities]]")))
+        self.assertFalse(prefilter.accept(page("Talk:Einstein", "[[Category:1879 births]]", namespace=1)))
+        self.assertFalse(prefilter.accept(page("Einstein", "[[Category:1879 births]]", redirect=True)))
+        self.assertEqual(prefilter.last_reason, "redirects")
+
+        self.assertEqual(prefilter.pages_seen, 4)
+        self.assertEqual(prefilter.rejection_rate(), 0.75)
@@ -0,0 +1,58 @@
+from unittest import TestCase
+from date_parsing.date_export import DateExport
+from search.columnar_export import ColumnarExport
+from search.local_search import LocalSearch
+from search.pair_batch import PairBatch
+import os
+import tempfile
+
+
+RECORDS = [
+    "Albert Einstein,14.3.1879 (BC: False),18.4.1955 (BC: False)",
+    "Albert Pike,29.12.1809 (BC: False),2.4.1891 (BC: False)",
+    "Alexander the Great,20.7.356 (BC: True),10.6.323 (BC: True)",
+]
+
+
+class CountingSearch:
+    """
+    LocalSearch wrapper counting names passed to find_many
+    """
+
+    def __init__(self, search):
+        self.search = search
+        self.resolved_names = []
+
+    def find_many(self, names):
+        names = list(names)
+        self.resolved_names.extend(names)
+        return self.search.find_many(names)
+
+
+class TestPairBatch(TestCase):
+
+    def test_pairs(self):
+        columns = ColumnarExport.from_records(DateExport.parse_export_record(line) for line in RECORDS)
+        search = CountingSearch(LocalSearch.build(columns))
+
+        with tempfile.TemporaryDirectory() as directory:
+            pairs_path = os.path.join(directory, "pairs.tsv")
+            output_path = os.path.join(directory, "results.tsv")
+            with open(pairs_path, "w", encoding="utf-8") as pairs:
+                pairs.write("Albert Einstein\tAlbert Pike\n")
+                pairs.write("Albert Einstein\tAlexander the Great\n\n")
+                pairs.write("Nobody\tAlbert Pike\n")
+                pairs.write("Albert Pike\tAlbert Einstein\n")
+
+            self.assertEqual(PairBatch(search, block_size=2).run(pairs_path, output_path), 4)
+            with open(output_path, encoding="utf-8") as results:
+                lines = results.read().splitlines()
+
+        overlap = DateExport(1891, 4, 2).ordinal - DateExport(1879, 3, 14).ordinal
+        self.assertEqual(lines, ["Albert Einstein\tAlbert Pike\ttrue\t%d" % overlap,
+                                 "Albert Einstein\tAlexander the Great\tfalse\t0",
+                                 "Nobody\tAlbert Pike\tunknown\t",
+                                 "Albert Pike\tAlbert Einstein\ttrue\t%d" % overlap])
+
+        # Every name is resolved once, even when it is in more blocks
+        self.assertEqual(sorted(search.resolved_names), ["Albert Einstein", "Albert Pike", "Alexander the Great", "Nobody"])
@@ -0,0 +1,107 @@
+from unittest import TestCase
+from parsers.parser_stats import ParserStats
+from parsers.wiki_reader import MediaWikiDumpReader as DumpReader
+from benchmarks.synthetic_dump import SyntheticDump
+import json
+import os
+import tempfile
+import threading
+
+
+class TestParserStats(TestCase):
+
+    def test_merge_and_to_dict(self):
+        first = ParserStats()
+        first.count("pages_seen", 3)
+        first.rule("birth", "circa")
+        first.add_time("lxml", first.start_time)
+
+        second = ParserStats()
+        second.count("pages_seen")
+        second.rule("birth", "circa")
+        second.rule("death", None)
+        second.merge(first.to_dict())
+
+        stats = second.to_dict()
+        self.assertEqual(stats["counters"]["pages_seen"], 4)
+        self.assertEqual(stats["rules"], {"birth": {"circa": 2}, "death": {"None": 1}})
+        self.assertGreater(stats["seconds"]["lxml"], 0)
+        self.assertAlmostEqual(sum(stats["stage_shares"].values()), 1.0)
+
+    def test_threads_update_same_counters(self):
+        stats = ParserStats()
+        shard = ParserStats()
+        shard.count("pages_seen")
+        shard.add_time("write", shard.start_time)
+
+        def update():
+            for _ in range(20000):
+                stats.count("pages_seen")
+                stats.add_time("write", stats.start_time)
+                stats.merge(shard.to_dict())
+
+        threads = [threading.Thread(target=update) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(stats.to_dict()["counters"]["pages_seen"], 4 * 20000 * 2)
+
+    def test_periodic_summary(self):
+        stats = ParserStats()
+        self.assertIsNone(stats.periodic_summary(3600))
+        self.assertTrue(stats.periodic_summary(0).startswith("0 pages"))
+
+
+class TestReaderStats(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dump_path = os.path.join(self.directory.name, "synthetic.xml")
+        self.export_path = os.path.join(self.directory.name, "export.txt")
+        self.dump = SyntheticDump(pages=300, person_ratio=0.5, seed=3).write(self.dump_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self, prefilter):
+        with open(self.dump_path, "rb") as in_xml:
+            reader = DumpReader(self.dump_path, in_xml, None, (True, self.export_path), quiet=True, prefilter=prefilter)
+            for _ in reader:
+                pass
+        return reader.stats
+
+    def test_counters(self):
+        counters = self.read(True).counters
+        persons = len(self.dump.expected_records)
+
+        self.assertEqual(counters["pages_seen"], self.dump.pages)
+        self.assertEqual(counters["persons_exported"], persons)
+        self.assertEqual(counters["prefilter_rejected"], self.dump.pages - persons)
+
+        # Rejected pages are counted by reason, the same way as without pre-filter
+        unfiltered = self.read(False).counters
+        for reason in ("other_namespace", "redirects", "non_persons"):
+            self.assertEqual(counters[reason], unfiltered[reason], reason)
+
+    def test_skipped_pages_without_prefilter(self):
+        stats = self.read(False)
+        counters = stats.counters
+        skipped = counters["other_namespace"] + counters["redirects"] + counters["non_persons"]
+
+        self.assertGreater(counters["other_namespace"], 0)
+        self.assertGreater(counters["redirects"], 0)
+        self.assertEqual(skipped + counters["persons_exported"], self.dump.pages)
+
+        # Every exported person has birth date matched by an infobox rule or by a lead sentence format
+        rules = stats.to_dict()["rules"]
+        matched = sum(rules.get("birth", {}).values()) + sum(rules.get("fulltext", {}).values())
+        self.assertEqual(matched, counters["persons_exported"])
+
+    def test_save(self):
+        stats_path = os.path.join(self.directory.name, "stats.json")
+        self.read(True).save(stats_path)
+
+        with open(stats_path, encoding="utf-8") as stats_file:
+            saved = json.load(stats_file)
+        self.assertEqual(set(saved["seconds"]), set(ParserStats.STAGES))
@@ -0,0 +1,57 @@
+from unittest import TestCase
+from utilities.progress_tracker import ProgressTracker
+from parsers.multistream import input_position, open_dump
+import bz2
+import io
+import os
+import tempfile
+
+
+class TestProgressTracker(TestCase):
+
+    def setUp(self):
+        self.position = 0
+        self.output = io.StringIO()
+
+    def tracker(self, total=1000, interval=3600):
+        return ProgressTracker(total, lambda: self.position, interval=interval, output=self.output)
+
+    def test_redraw_is_rate_limited(self):
+        tracker = self.tracker()
+        for i in range(1000):
+            self.position = i
+            tracker.tick()
+
+        # Only the first tick draws, the rest is within interval
+        self.assertEqual(self.output.getvalue().count("\r"), 1)
+        self.assertEqual(tracker.pages, 1000)
+
+    def test_bar_follows_position(self):
+        tracker = self.tracker(interval=0)
+        tracker.tick(0)
+        self.position = 250
+        tracker.tick()
+
+        last = self.output.getvalue().split("\r")[-1]
+        self.assertIn("[=====               ] 25.00%", last)
+        self.assertIn("ETA", last)
+
+        tracker.finish()
+        self.assertIn("100.00%", self.output.getvalue().split("\r")[-2])
+        self.assertTrue(self.output.getvalue().endswith("\r\n"))
+
+    def test_unknown_position(self):
+        tracker = ProgressTracker(1000, lambda: None, interval=0, output=self.output)
+        tracker.tick()
+        self.assertNotIn("%", self.output.getvalue())
+        self.assertIn("pages/s", self.output.getvalue())
+
+    def test_bz2_position_is_compressed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dump.xml.bz2")
+            with bz2.open(path, "wb") as dump:
+                dump.write(b"<page></page>" * 100000)
+
+            with open_dump(path) as dump:
+                dump.read()
+                self.assertEqual(input_position(dump), os.path.getsize(path))
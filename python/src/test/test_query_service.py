@@ -0,0 +1,102 @@
+from unittest import TestCase
+from date_parsing.date_export import DateExport
+from search.columnar_export import ColumnarExport
+from search.local_search import LocalSearch
+from search.query_service import QueryService, LatencyHistogram
+from urllib.parse import quote
+import asyncio
+import http.client
+import json
+import threading
+
+
+RECORDS = [
+    "Albert Einstein,14.3.1879 (BC: False),18.4.1955 (BC: False)",
+    "Albert Pike,29.12.1809 (BC: False),2.4.1891 (BC: False)",
+    "Abraham Lincoln,12.2.1809 (BC: False),15.4.1865 (BC: False)",
+    "Alexander the Great,20.7.356 (BC: True),10.6.323 (BC: True)",
+]
+
+
+class TestQueryService(TestCase):
+
+    def setUp(self):
+        columns = ColumnarExport.from_records(DateExport.parse_export_record(line) for line in RECORDS)
+        self.service = QueryService(LocalSearch.build(columns))
+
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(self.service.start("127.0.0.1", 0))
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+        # One connection is reused by all requests of a test
+        self.connection = http.client.HTTPConnection("127.0.0.1", self.server.sockets[0].getsockname()[1])
+
+    def tearDown(self):
+        self.connection.close()
+        asyncio.run_coroutine_threadsafe(self.shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    async def shutdown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+        # Handlers of kept alive connections
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get(self, path):
+        self.connection.request("GET", path)
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read())
+
+    def test_endpoints(self):
+        self.assertEqual(self.get("/person?name=" + quote("Albert Einstein")),
+                         (200, {"name": "Albert Einstein", "birth": "14.3.1879 ", "death": "18.4.1955 "}))
+
+        status, body = self.get("/person?name=einst")
+        self.assertEqual((status, body["suggestions"]), (404, ["Albert Einstein"]))
+
+        status, body = self.get("/could-meet?a=" + quote("Albert Einstein") + "&b=" + quote("Albert Pike"))
+        self.assertEqual((status, body["could_meet"]), (200, True))
+        self.assertEqual(body["overlap_days"], DateExport(1891, 4, 2).ordinal - DateExport(1879, 3, 14).ordinal)
+
+        status, body = self.get("/overlaps?name=" + quote("Albert Pike") + "&limit=1")
+        self.assertEqual((status, body["count"], [o["name"] for o in body["overlaps"]]), (200, 2, ["Abraham Lincoln"]))
+
+        self.assertEqual(self.get("/could-meet?a=x")[0], 400)
+        self.assertEqual(self.get("/unknown")[0], 404)
+
+    def test_search_errors_are_not_cached(self):
+        self.assertEqual(self.get("/overlaps?name=x&limit=many")[0], 400)
+
+        find_many = self.service.search.find_many
+        def failing(names):
+            raise ValueError("Stored date is not in correct format.")
+
+        self.service.search.find_many = failing
+        self.assertEqual(self.get("/person?name=" + quote("Albert Pike")),
+                         (500, {"error": "Stored date is not in correct format."}))
+        self.service.search.find_many = find_many
+        self.assertEqual(self.get("/person?name=" + quote("Albert Pike"))[0], 200)
+
+    def test_stats(self):
+        for _ in range(3):
+            self.get("/person?name=" + quote("Albert Pike"))
+
+        status, body = self.get("/stats")
+        self.assertEqual(body["cache"]["hits"], 2)
+        self.assertEqual(body["cache"]["misses"], 1)
+        self.assertEqual(body["latency"]["/person"]["count"], 3)
+
+    def test_histogram(self):
+        histogram = LatencyHistogram()
+        for milliseconds in (0.05, 0.05, 0.3, 2000):
+            histogram.add(milliseconds)
+        self.assertEqual(histogram.percentile(50), 0.1)
+        self.assertIsNone(histogram.percentile(99))
+        self.assertEqual(histogram.to_dict()["buckets"][">1000 ms"], 1)
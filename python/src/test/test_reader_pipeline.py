@@ -0,0 +1,73 @@
+from unittest import TestCase
+from parsers.wiki_reader import MediaWikiDumpReader as DumpReader
+from parsers.checkpoint import ParseCheckpoint
+from parsers.revision_table import RevisionTable
+from benchmarks.synthetic_dump import SyntheticDump
+import os
+import tempfile
+
+
+class TestExtractionPipeline(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dump_path = os.path.join(self.directory.name, "synthetic.xml")
+        self.export_path = os.path.join(self.directory.name, "export.txt")
+        self.dump = SyntheticDump(pages=400, person_ratio=0.5, bc_ratio=0.2, seed=13).write(self.dump_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def parse(self, export_path, stop=None, **kwargs):
+        records = []
+        with open(self.dump_path, "rb") as in_xml:
+            reader = DumpReader(self.dump_path, in_xml, None, (True, export_path), quiet=True, pipeline_workers=2,
+                                queue_depth=2, **kwargs)
+            for record in reader:
+                records.append(record)
+                if len(records) == stop:
+                    break
+        return reader, records
+
+    def read(self, path):
+        with open(path, encoding="utf-8") as export:
+            return export.read()
+
+    def test_export_matches_sequential(self):
+        reader, records = self.parse(self.export_path)
+        self.assertEqual(self.read(self.export_path).splitlines(), self.dump.expected_records)
+        self.assertEqual(len(records), len(self.dump.expected_records))
+        self.assertEqual(reader.stats.counters["pages_seen"], 400)
+        self.assertEqual(reader.stats.counters["persons_exported"], len(self.dump.expected_records))
+
+    def test_resume_after_interrupt(self):
+        checkpoint = ParseCheckpoint.default_path(self.export_path)
+        self.parse(self.export_path, stop=100, checkpoint=checkpoint)
+        self.assertTrue(os.path.exists(checkpoint))
+
+        self.parse(self.export_path, checkpoint=checkpoint, resume=True)
+        self.assertEqual(self.read(self.export_path).splitlines(), self.dump.expected_records)
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_incremental_copies_records(self):
+        self.parse(self.export_path)
+        incremental_path = os.path.join(self.directory.name, "incremental.txt")
+        reader, _ = self.parse(incremental_path, previous_revisions=RevisionTable.path_for(self.export_path))
+
+        self.assertEqual(self.read(incremental_path), self.read(self.export_path))
+        self.assertEqual(reader.stats.counters["pages_extracted"], 0)
+
+    def test_writer_error_reaches_reader(self):
+        def write_record(page_id, revision_id, sha1, record):
+            raise OSError(28, "No space left on device")
+
+        # More batches than fit into queues, so extraction continues after writer died
+        SyntheticDump(pages=3000, person_ratio=0.5, seed=13).write(self.dump_path)
+        with open(self.dump_path, "rb") as in_xml:
+            reader = DumpReader(self.dump_path, in_xml, None, (True, self.export_path), quiet=True,
+                                pipeline_workers=2, queue_depth=2)
+            reader._write_record = write_record
+            with self.assertRaises(OSError) as raised:
+                for _ in reader:
+                    pass
+        self.assertEqual(raised.exception.errno, 28)
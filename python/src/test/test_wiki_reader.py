@@ -1,51 +1,78 @@
 from unittest import TestCase
 from parsers.wiki_reader import MediaWikiDumpReader as DumpReader
+from benchmarks.synthetic_dump import SyntheticDump
 import os
-from pathlib import Path
+import tempfile
 
 
 class TestMediaWikiDumpReader(TestCase):
 
-    def load_gazetteer(self, gazetteer_path):
-        file = open(gazetteer_path, "r")
-        keywords = file.read().lower().split('\n')
-        file.close()
-        return keywords
-
     def setUp(self):
-        current_directory = os.path.dirname(__file__)
-        path = Path(current_directory)
-        parent_directory = path.parent.parent
-
-        firstname_path = os.path.join(parent_directory, 'data', 'firstnames.txt', )
-        surname_path = os.path.join(parent_directory, 'data', 'surnames.txt', )
-        dump_split_path = os.path.join(parent_directory, 'data', 'dump_split.xml')
-        exported_path = os.path.join(parent_directory, 'data', 'dump_export.txt')
-        xml_path = "D:/skola/enwiki/enwiki_dump.xml"
-        gazetteers = {'firstnames': self.load_gazetteer(firstname_path), 'surnames': self.load_gazetteer(surname_path)}
-
-        self.in_xml = open(dump_split_path, 'rb')
-        self.reader = DumpReader(self.in_xml, gazetteers, (True, exported_path))
+        self.directory = tempfile.TemporaryDirectory()
+        self.dump_path = os.path.join(self.directory.name, "synthetic.xml")
+        self.export_path = os.path.join(self.directory.name, "export.txt")
+        self.dump = SyntheticDump(pages=400, person_ratio=0.5, bc_ratio=0.2, seed=7).write(self.dump_path)
+        self.in_xml = open(self.dump_path, 'rb')
 
     def tearDown(self):
         self.in_xml.close()
-        self.reader = None
+        self.directory.cleanup()
+
+    def reader(self, in_xml=None):
+        return DumpReader(self.dump_path, in_xml or self.in_xml, None, (True, self.export_path), quiet=True)
+
+    def read_export(self):
+        with open(self.export_path, encoding="utf-8") as export:
+            return export.read().splitlines()
 
 class TestRead(TestMediaWikiDumpReader):
 
     def test_export_first_lines(self):
-        count = 0
-        for record in self.reader:
-            if count == 0:
-                self.assertEqual(record["name"], "Abraham Lincoln")
-                self.assertEqual(record["birth_date"].__repr__(), "12.2.1809")
-                self.assertEqual(record["death_date"].__repr__(), "15.4.1865")
-            elif count == 1:
-                self.assertEqual(record["name"], "Ayn Rand")
-                self.assertEqual(record["birth_date"].__repr__(), "2.2.1905")
-                self.assertEqual(record["death_date"].__repr__(), "6.3.1982")
-
-            if count > 1:
+        records = []
+        for record in self.reader():
+            records.append(record)
+            if len(records) > 1:
                 break
 
-            count += 1
+        for record, expected in zip(records, self.dump.expected_records):
+            name, birth, death = expected.split(",")
+            self.assertEqual(record["name"], name)
+            self.assertEqual(record["birth_date"].__repr__(), birth)
+            self.assertEqual(record["death_date"].__repr__(), death)
+
+    def test_export_matches_generated_persons(self):
+        persons = sum(1 for _ in self.reader())
+
+        self.assertEqual(persons, len(self.dump.expected_records))
+        self.assertEqual(self.read_export(), self.dump.expected_records)
+
+    def test_every_date_format(self):
+        # Every format alone, so a format which stops being recognized is reported by name
+        formats = [{"infobox_formats": (form,), "fulltext_formats": ()} for form in SyntheticDump(pages=0).infobox_formats] + \
+                  [{"infobox_formats": (), "fulltext_formats": (form,)} for form in SyntheticDump(pages=0).fulltext_formats]
+
+        for options in formats:
+            with self.subTest(**options):
+                dump = SyntheticDump(pages=100, person_ratio=0.8, bc_ratio=0.3, seed=1, **options).write(self.dump_path)
+                with open(self.dump_path, 'rb') as in_xml:
+                    for _ in self.reader(in_xml):
+                        pass
+                self.assertEqual(self.read_export(), dump.expected_records)
+
+
+class TestFulltextDates(TestCase):
+
+    def extract(self, line, title):
+        found, birth, _, death = DumpReader.extract_fulltext_dates(line, title)
+        return found and (repr(birth), repr(death), DumpReader.last_fulltext_rule)
+
+    def test_title_is_not_regex(self):
+        self.assertEqual(self.extract("'''john smith (explorer)''' (1580&ndash;1631) was english.", "John Smith (explorer)"),
+                         ("None.None.1580 (BC: False)", "None.None.1631 (BC: False)", "years"))
+        self.assertFalse(self.extract("'''j r r tolkien''' (1892-1973)", "J. R. R. Tolkien"))
+
+    def test_later_occurrence_of_title(self):
+        self.assertEqual(self.extract("mary jones was a singer. '''mary jones''' (12 march 1850 {{snd}} 3 april 1920)", "Mary Jones"),
+                         ("12.3.1850 (BC: False)", "3.4.1920 (BC: False)", "day_month_year"))
+        self.assertEqual(self.extract("'''plato''' (c. 428 – c. 348 bc) was a philosopher.", "Plato"),
+                         ("None.None.428 (BC: True)", "None.None.348 (BC: True)", "circa"))
@@ -0,0 +1,78 @@
+from unittest import TestCase
+from parsers.wiki_reader import MediaWikiDumpReader as DumpReader
+from parsers.wiki_sharder import MediaWikiDumpSharder, ByteRangeStream, find_page_boundaries
+import os
+import tempfile
+
+
+PAGE = """  <page>
+    <title>{0}</title>
+    <ns>0</ns>
+    <id>{1}</id>
+    <revision>
+      <id>{1}</id>
+      <text xml:space="preserve">{{{{Infobox person
+| birth_date = {{{{birth date|{2}|2|12}}}}
+| death_date = {{{{death date|{3}|4|15}}}}
+}}}}
+[[Category:{2} births]]</text>
+    </revision>
+  </page>
+"""
+
+
+class TestMediaWikiDumpSharder(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dump_path = os.path.join(self.directory.name, "dump.xml")
+        self.export_path = os.path.join(self.directory.name, "export.txt")
+
+        with open(self.dump_path, "w", encoding="utf-8") as dump:
+            dump.write('<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/">\n  <siteinfo></siteinfo>\n')
+            for i in range(40):
+                dump.write(PAGE.format("Person " + str(i), i, 1800 + i, 1850 + i))
+            dump.write("</mediawiki>\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_boundaries_are_pages(self):
+        ranges = find_page_boundaries(self.dump_path, 7)
+        self.assertEqual(len(ranges), 7)
+
+        with open(self.dump_path, "rb") as dump:
+            data = dump.read()
+
+        for start, end in ranges:
+            self.assertTrue(data[start:].startswith(b"<page>"))
+            self.assertTrue(data[start:end].rstrip().endswith(b"</page>"))
+
+        self.assertEqual(sum(data[start:end].count(b"<page>") for start, end in ranges), 40)
+
+    def test_byte_range_stream(self):
+        with ByteRangeStream(self.dump_path, 0, 10, b"<a>", b"</a>") as stream:
+            chunks = []
+            chunk = stream.read(4)
+            while chunk:
+                chunks.append(chunk)
+                chunk = stream.read(4)
+
+        self.assertEqual(b"".join(chunks), b"<a><mediawiki</a>")
+
+    def test_sharded_export_equals_single_process(self):
+        with open(self.dump_path, "rb") as in_xml:
+            for _ in DumpReader(self.dump_path, in_xml, None, (True, self.export_path), False):
+                pass
+
+        with open(self.export_path, encoding="utf-8") as export:
+            expected = export.read()
+
+        sharded_path = os.path.join(self.directory.name, "sharded.txt")
+        exported = MediaWikiDumpSharder(self.dump_path, sharded_path, 3).run()
+
+        with open(sharded_path, encoding="utf-8") as export:
+            self.assertEqual(export.read(), expected)
+
+        self.assertEqual(exported, 40)
+        self.assertEqual(os.listdir(self.directory.name).count("sharded.txt.shard0000"), 0)
@@ -0,0 +1,78 @@
+from utilities.utils import get_smart_file_size
+import datetime
+import sys
+import time
+
+
+class ProgressTracker:
+
+    def __init__(self, total, position, interval=0.5, bar_length=20, output=None):
+        """
+        Progress bar driven by real position in input file. Position is read only when the bar is redrawn,
+        which happens at most once per interval, so tick can be called for every page
+
+        :param total: Number of bytes to process
+        :param position: Function returning current position in bytes, or None when it is not known
+        :param interval: Minimum number of seconds between redraws
+        :param bar_length: Number of characters of the bar
+        :param output: Stream the bar is written to, sys.stdout by default
+        """
+        self.total = total
+        self.position = position
+        self.interval = interval
+        self.bar_length = bar_length
+        self.output = output
+        self.pages = 0
+        self.start_time = time.perf_counter()
+        self.start_position = None
+        self.last_draw = None
+        self.last_length = 0
+
+    def tick(self, pages=1):
+        self.pages += pages
+        now = time.perf_counter()
+        if self.last_draw is None or now - self.last_draw >= self.interval:
+            self.last_draw = now
+            self.draw(now)
+
+    def finish(self):
+        self.draw(time.perf_counter(), done=True)
+
+    def fraction(self, position):
+        if position is None or self.total <= 0:
+            return None
+        return min(1.0, max(0.0, position / self.total))
+
+    def format(self, now, position, done=False):
+        elapsed = now - self.start_time
+        fraction = 1.0 if done else self.fraction(position)
+
+        parts = []
+        if fraction is not None:
+            block = int(round(self.bar_length * fraction))
+            parts.append("[{0}] {1:.2f}%".format("=" * block + " " * (self.bar_length - block), fraction * 100))
+        parts.append("{0:.0f} pages/s".format(self.pages / elapsed if elapsed > 0 else 0))
+
+        if position is not None and self.start_position is not None and elapsed > 0:
+            rate = (position - self.start_position) / elapsed
+            parts.append("{0}/s".format(get_smart_file_size(max(0, int(rate)))))
+            if not done and rate > 0 and fraction is not None:
+                remaining = max(0, self.total - position) / rate
+                parts.append("ETA {0}".format(datetime.timedelta(seconds=int(remaining))))
+
+        # Shorter line is padded, so nothing is left from the previous one
+        line = "Progress: " + " | ".join(parts)
+        padding = " " * max(0, self.last_length - len(line))
+        self.last_length = len(line)
+        return "\r" + line + padding + ("\r\n" if done else "")
+
+    def draw(self, now, done=False):
+        position = self.position()
+        if self.start_position is None:
+            # Parsing may be resumed in the middle of input, rate is measured from the first position
+            self.start_position = position
+            self.start_time = now
+
+        output = self.output or sys.stdout
+        output.write(self.format(now, position, done))
+        output.flush()
@@ -3,3 +3,5 @@ class RuntimeConstants:
     CURRENT_YEAR = 2020
     RUN_SPLIT = False
     SPLIT_SIZE = 2000000000
+    CHECKPOINT_INTERVAL = 60
+    STATS_INTERVAL = 30
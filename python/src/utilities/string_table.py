@@ -0,0 +1,84 @@
+import bisect
+import numpy as np
+import os
+
+
+class StringTable:
+
+    def __init__(self, blob, offsets):
+        """
+        Immutable list of strings stored as one concatenated UTF-8 blob and array of offsets,
+        so it can be saved with numpy and memory-mapped back without parsing
+
+        :param blob: numpy uint8 array with concatenated UTF-8 strings
+        :param offsets: numpy int64 array of len(strings) + 1 offsets into blob
+        """
+        self.blob = blob
+        self.offsets = offsets
+        # Plain memoryviews avoid creation of numpy scalars and arrays on every access
+        self._blob_view = memoryview(np.ascontiguousarray(blob))
+        self._offsets_view = memoryview(np.ascontiguousarray(offsets))
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(string) for string in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        i = int(i)
+        return str(self._blob_view[self._offsets_view[i]:self._offsets_view[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def save(self, directory, name):
+        np.save(os.path.join(directory, name + ".blob.npy"), self.blob)
+        np.save(os.path.join(directory, name + ".offsets.npy"), self.offsets)
+
+    @classmethod
+    def load(cls, directory, name, mmap=True):
+        mode = "r" if mmap else None
+        return cls(np.load(os.path.join(directory, name + ".blob.npy"), mmap_mode=mode),
+                   np.load(os.path.join(directory, name + ".offsets.npy"), mmap_mode=mode))
+
+
+class SortedView:
+
+    def __init__(self, table, order=None, transform=None):
+        """
+        Sequence view of StringTable used with bisect. Strings must be sorted, either in table itself
+        or by order permutation, after applying transform
+
+        :param table: StringTable
+        :param order: Optional numpy array of indices into table in sorted order
+        :param transform: Optional function applied on strings, e.g. str.lower
+        """
+        self.table = table
+        self.order = order
+        self.transform = transform
+
+    def __len__(self):
+        return len(self.table) if self.order is None else len(self.order)
+
+    def __getitem__(self, i):
+        value = self.table[i if self.order is None else self.order[i]]
+        return value if self.transform is None else self.transform(value)
+
+    def equal_range(self, value):
+        """
+        :return: Tuple of positions (lo, hi) of strings equal to value
+        """
+        return bisect.bisect_left(self, value), bisect.bisect_right(self, value)
+
+    def prefix_range(self, prefix):
+        """
+        :return: Tuple of positions (lo, hi) of strings starting with prefix
+        """
+        return bisect.bisect_left(self, prefix), bisect.bisect_left(self, prefix + chr(0x10FFFF))
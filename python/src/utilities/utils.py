@@ -1,5 +1,6 @@
 import sys
 import math
+from itertools import islice
 
 # source: https://stackoverflow.com/questions/3002085/python-to-print-out-status-bar-and-percentage/3002114
 def update_progress(progress):
@@ -37,4 +38,14 @@ def get_smart_file_size(bytes_size):
 def max_clamp(num, max_num):
     if num > max_num:
         return max_num
-    return num
\ No newline at end of file
+    return num
+
+def chunks(iterable, size):
+    """
+    Splits iterable into lists of size items, the last one may be shorter
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))